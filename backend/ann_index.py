@@ -0,0 +1,279 @@
+"""
+ANN Index Factory - Builds FAISS indexes selectable by config
+Supports Flat (exact), IVF, HNSW and IVF-PQ with per-call search overrides
+"""
+import math
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('flat', 'ivf', 'hnsw', 'ivfpq')
+
+# Defaults used when a parameter is not supplied in the index config
+DEFAULT_INDEX_PARAMS: Dict[str, Any] = {
+    'nlist': None,          # IVF/IVF-PQ partitions; None = derived from corpus size
+    'nprobe': 8,            # IVF/IVF-PQ partitions probed per query
+    'hnsw_m': 32,           # HNSW graph degree
+    'ef_construction': 80,  # HNSW build-time beam width
+    'ef_search': 64,        # HNSW query-time beam width
+    'pq_m': 16,             # IVF-PQ sub-quantizers
+    'pq_bits': 8,           # IVF-PQ bits per sub-quantizer code
+}
+
+# FAISS recommends at least this many training points per k-means centroid
+_MIN_POINTS_PER_CENTROID = 39
+# ...and subsamples down to this many, so a larger training buffer is wasted
+_MAX_POINTS_PER_CENTROID = 256
+
+
+def resolve_index_params(index_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merge user-supplied index params over the defaults"""
+    params = dict(DEFAULT_INDEX_PARAMS)
+    for key, value in (index_params or {}).items():
+        if key not in DEFAULT_INDEX_PARAMS:
+            raise ValueError(f"Unknown index parameter: {key}")
+        if value is not None:
+            params[key] = value
+    return params
+
+
+def _default_nlist(n_vectors: int) -> int:
+    """4 * sqrt(N) partitions, capped so each centroid gets enough training points"""
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // _MIN_POINTS_PER_CENTROID))
+
+
+def _pq_subquantizers(dim: int, requested: int) -> int:
+    """Largest divisor of `dim` not exceeding the requested sub-quantizer count"""
+    for m in range(min(requested, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def create_index(
+    faiss_module: Any,
+    dim: int,
+    n_vectors: int,
+    index_type: str = 'flat',
+    index_params: Optional[Dict[str, Any]] = None
+) -> Any:
+    """
+    Create an (untrained) inner-product index of the requested type
+
+    Args:
+        faiss_module: Imported faiss module
+        dim: Embedding dimension
+        n_vectors: Number of vectors that will be added (sizes IVF/PQ)
+        index_type: One of INDEX_TYPES
+        index_params: Overrides for DEFAULT_INDEX_PARAMS
+
+    Returns:
+        FAISS index using METRIC_INNER_PRODUCT
+    """
+    faiss = faiss_module
+    index_type = (index_type or 'flat').lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Choose from {', '.join(INDEX_TYPES)}")
+    params = resolve_index_params(index_params)
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if index_type == 'flat':
+        return faiss.IndexFlatIP(dim)
+
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, int(params['hnsw_m']), metric)
+        index.hnsw.efConstruction = int(params['ef_construction'])
+        index.hnsw.efSearch = int(params['ef_search'])
+        return index
+
+    nlist = int(params['nlist'] or _default_nlist(n_vectors))
+    quantizer = faiss.IndexFlatIP(dim)
+
+    if index_type == 'ivf':
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+    else:
+        pq_m = _pq_subquantizers(dim, int(params['pq_m']))
+        # PQ k-means needs at least 2^bits training points per sub-quantizer
+        pq_bits = max(1, min(int(params['pq_bits']), int(math.log2(max(n_vectors, 2)))))
+        if pq_m != params['pq_m'] or pq_bits != params['pq_bits']:
+            logger.info(f"IVF-PQ adjusted to m={pq_m}, bits={pq_bits} for dim={dim}, n={n_vectors}")
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_bits, metric)
+
+    index.nprobe = min(int(params['nprobe']), nlist)
+    return index
+
+
+def build_index(
+    faiss_module: Any,
+    embeddings: np.ndarray,
+    index_type: str = 'flat',
+    index_params: Optional[Dict[str, Any]] = None,
+    ids: Optional[np.ndarray] = None
+) -> Any:
+    """
+    Create, train (when required) and populate an ID-mapped index
+
+    Args:
+        faiss_module: Imported faiss module
+        embeddings: Normalized float32 matrix
+        index_type: One of INDEX_TYPES
+        index_params: Overrides for DEFAULT_INDEX_PARAMS
+        ids: Stable passage ids, one per row (defaults to row numbers)
+
+    Returns:
+        Populated index keyed by passage id (see id_mapped)
+    """
+    n_vectors, dim = embeddings.shape
+    base = create_index(faiss_module, dim, n_vectors, index_type, index_params)
+    if not base.is_trained:
+        logger.info(f"Training {index_type} index on {n_vectors} vectors...")
+        base.train(embeddings)
+    if ids is None:
+        ids = np.arange(n_vectors, dtype=np.int64)
+    index = id_mapped(faiss_module, base)
+    index.add_with_ids(embeddings, np.asarray(ids, dtype=np.int64))
+    return index
+
+
+def id_mapped(faiss_module: Any, base: Any) -> Any:
+    """
+    Index that takes add_with_ids/remove_ids by passage id
+
+    IVF indexes store ids in their inverted lists and are used directly.
+    IndexIDMap2 translates through sequential internal ids, which IVF does
+    not renumber on removal, so wrapping one would mislabel every vector
+    added after the first remove.
+    """
+    if isinstance(faiss_module.downcast_index(base), faiss_module.IndexIVF):
+        return base
+    return faiss_module.IndexIDMap2(base)
+
+
+class StreamingIndexBuilder:
+    """
+    Populate an ID-mapped index batch by batch
+
+    Flat and HNSW indexes take vectors as they arrive. IVF/IVF-PQ indexes
+    buffer only their training sample (nlist * 256 vectors at most, FAISS's
+    own k-means subsampling limit), train once it is full, and then add the
+    buffer and every later batch directly.
+    """
+
+    def __init__(
+        self,
+        faiss_module: Any,
+        dim: int,
+        expected_vectors: int,
+        index_type: str = 'flat',
+        index_params: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            faiss_module: Imported faiss module
+            dim: Embedding dimension
+            expected_vectors: Approximate final size (sizes IVF/PQ and the training sample)
+            index_type: One of INDEX_TYPES
+            index_params: Overrides for DEFAULT_INDEX_PARAMS
+        """
+        self.faiss = faiss_module
+        self.index_type = index_type
+        self.base = create_index(faiss_module, dim, expected_vectors, index_type, index_params)
+        self.index = id_mapped(faiss_module, self.base)
+        self.count = 0
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending_rows = 0
+        self._train_size = 0
+        if not self.base.is_trained:
+            self._train_size = min(max(expected_vectors, 1), self.base.nlist * _MAX_POINTS_PER_CENTROID)
+
+    def add(self, embeddings: np.ndarray, ids: np.ndarray) -> None:
+        """Add normalized float32 vectors with their stable ids"""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        self.count += len(ids)
+        if self.base.is_trained:
+            self.index.add_with_ids(embeddings, ids)
+            return
+        self._pending.append((embeddings, ids))
+        self._pending_rows += len(ids)
+        if self._pending_rows >= self._train_size:
+            self._train_and_flush()
+
+    def finish(self) -> Any:
+        """The populated id-keyed index (trains on what arrived if the sample never filled)"""
+        if self._pending:
+            self._train_and_flush()
+        return self.index
+
+    def _train_and_flush(self) -> None:
+        sample = np.vstack([e for e, _ in self._pending])
+        logger.info(f"Training {self.index_type} index on {len(sample)} vectors...")
+        self.index.train(sample)
+        del sample
+        for embeddings, ids in self._pending:
+            self.index.add_with_ids(embeddings, ids)
+        self._pending = []
+        self._pending_rows = 0
+
+
+def base_index(faiss_module: Any, index: Any) -> Any:
+    """Unwrap an IndexIDMap to the concrete index doing the search"""
+    base = faiss_module.downcast_index(index)
+    while isinstance(base, faiss_module.IndexIDMap):
+        base = faiss_module.downcast_index(base.index)
+    return base
+
+
+def supports_removal(faiss_module: Any, index: Any) -> bool:
+    """
+    HNSW graphs cannot drop vectors in place, and neither can an IVF saved
+    inside an IndexIDMap by older builds (see id_mapped); everything else can
+    """
+    base = base_index(faiss_module, index)
+    if isinstance(base, faiss_module.IndexHNSW):
+        return False
+    wrapped = isinstance(faiss_module.downcast_index(index), faiss_module.IndexIDMap)
+    return not (wrapped and isinstance(base, faiss_module.IndexIVF))
+
+
+def make_search_params(
+    faiss_module: Any,
+    index: Any,
+    overrides: Optional[Dict[str, Any]] = None,
+    selector: Optional[Any] = None
+) -> Optional[Any]:
+    """
+    Translate per-call overrides and an id filter into FAISS SearchParameters
+
+    Args:
+        faiss_module: Imported faiss module
+        index: Index that will be searched
+        overrides: Dict with 'nprobe' and/or 'ef_search' (None values ignored)
+        selector: Optional faiss.IDSelector restricting the searchable ids
+
+    Returns:
+        SearchParameters for the index type, or None if nothing applies
+    """
+    overrides = {k: v for k, v in (overrides or {}).items() if v is not None}
+    unknown = set(overrides) - {'nprobe', 'ef_search'}
+    if unknown:
+        raise ValueError(f"Unknown search parameter(s): {', '.join(sorted(unknown))}")
+    if not overrides and selector is None:
+        return None
+
+    faiss = faiss_module
+    base = base_index(faiss, index)
+    extra = {'sel': selector} if selector is not None else {}
+
+    # A params object replaces the index's own settings, so carry its defaults over
+    if isinstance(base, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(nprobe=int(overrides.get('nprobe', base.nprobe)), **extra)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=int(overrides.get('ef_search', base.hnsw.efSearch)), **extra)
+    if selector is not None:
+        return faiss.SearchParameters(sel=selector)
+    return None
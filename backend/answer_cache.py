@@ -0,0 +1,183 @@
+"""
+Answer Cache - Semantic cache of generated answers
+A small exact FAISS index over embeddings of already-answered questions lets
+near-duplicate questions ("what is karma yoga" / "explain karma yoga") reuse
+the stored answer instead of making another Gemini call
+"""
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Neighbours inspected per lookup; a closer entry may belong to another scope
+_LOOKUP_NEIGHBOURS = 8
+
+
+def cache_scope(**settings: Any) -> str:
+    """Canonical scope string for the settings that shape an answer"""
+    return json.dumps(settings, sort_keys=True, default=str)
+
+
+class SemanticAnswerCache:
+    """
+    Question-embedding -> answer cache with LRU and TTL eviction
+
+    Entries are tied to the index version they were answered against; the
+    first lookup or store under a different version drops everything. An
+    opaque `scope` string (retrieval mode, filters, top_k, ...) must match
+    too, so a filtered question never reuses an unfiltered answer.
+    """
+
+    def __init__(
+        self,
+        faiss_module: Any,
+        dim: int,
+        threshold: float = 0.95,
+        max_size: int = 512,
+        ttl_seconds: Optional[float] = 86400.0
+    ):
+        """
+        Args:
+            faiss_module: Imported faiss module
+            dim: Question embedding dimension
+            threshold: Minimum cosine similarity for a hit
+            max_size: Maximum cached answers (0 disables caching)
+            ttl_seconds: Entry lifetime (None = no expiry)
+        """
+        self.faiss = faiss_module
+        self.dim = dim
+        self.threshold = threshold
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds
+        self.index = faiss_module.IndexIDMap2(faiss_module.IndexFlatIP(dim))
+        self._entries: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._next_id = 0
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, vector: np.ndarray, scope: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached answer for a question embedding
+
+        Args:
+            vector: Normalized question embedding, shape (1, d)
+            scope: Retrieval/generation settings the answer must share
+            version: Index version currently being served
+
+        Returns:
+            Entry dict ('question', 'answer', 'passages', 'scores', 'similarity') or None
+        """
+        if not self.max_size:
+            return None
+        with self._lock:
+            self._check_version(version)
+            hit = None
+            if self._entries:
+                k = min(_LOOKUP_NEIGHBOURS, len(self._entries))
+                similarities, ids = self.index.search(vector, k)
+                for entry_id, similarity in zip(ids[0], similarities[0]):
+                    if entry_id < 0 or similarity < self.threshold:
+                        break
+                    entry = self._entries.get(int(entry_id))
+                    if entry is None or entry["scope"] != scope:
+                        continue
+                    if self._expired(entry["stored_at"]):
+                        self._remove([int(entry_id)])
+                        continue
+                    self._entries.move_to_end(int(entry_id))
+                    hit = dict(entry, similarity=float(similarity))
+                    break
+            if hit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return hit
+
+    def store(
+        self,
+        vector: np.ndarray,
+        scope: str,
+        version: str,
+        question: str,
+        answer: str,
+        passages: List[str],
+        scores: Optional[List[float]] = None
+    ) -> None:
+        """Cache an answer, evicting least recently used entries when full"""
+        if not self.max_size:
+            return
+        with self._lock:
+            self._check_version(version)
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(
+                np.ascontiguousarray(vector, dtype=np.float32).reshape(1, self.dim),
+                np.array([entry_id], dtype=np.int64)
+            )
+            self._entries[entry_id] = {
+                "question": question,
+                "answer": answer,
+                "passages": list(passages),
+                "scores": list(scores or []),
+                "scope": scope,
+                "stored_at": time.monotonic(),
+            }
+            overflow = len(self._entries) - self.max_size
+            if overflow > 0:
+                oldest = list(self._entries)[:overflow]
+                self._remove(oldest)
+                self.evictions += len(oldest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, threshold and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "index_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _check_version(self, version: str) -> None:
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Index version changed ({self._version} -> {version}); clearing answer cache")
+                self.invalidations += 1
+            self._clear()
+            self._version = version
+
+    def _clear(self) -> None:
+        self.index.reset()
+        self._entries.clear()
+
+    def _remove(self, entry_ids: List[int]) -> None:
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+        self.index.remove_ids(np.array(entry_ids, dtype=np.int64))
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
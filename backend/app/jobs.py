@@ -0,0 +1,131 @@
+"""
+App Jobs Module - Background index-build jobs
+Runs index builds on a worker thread so the event loop keeps serving,
+and tracks per-job progress for the status endpoint
+"""
+import time
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IndexBuildJob:
+    """Progress and outcome of a single index build"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "queued"
+        self.encoded = 0
+        self.total = 0
+        self.documents_indexed = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def update_progress(self, encoded: int, total: int) -> None:
+        """Progress callback handed to the engine"""
+        self.encoded = encoded
+        self.total = total
+
+    def eta_seconds(self) -> Optional[float]:
+        """Linear ETA from the encode rate so far"""
+        if self.status != "running" or not self.started_at or not self.encoded or not self.total:
+            return None
+        elapsed = time.time() - self.started_at
+        rate = self.encoded / elapsed if elapsed > 0 else 0.0
+        if rate <= 0:
+            return None
+        return round((self.total - self.encoded) / rate, 1)
+
+    def passages_per_second(self) -> Optional[float]:
+        """Encode throughput so far (or over the whole build once finished)"""
+        if not self.started_at or not self.encoded:
+            return None
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return round(self.encoded / elapsed, 1) if elapsed > 0 else None
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly view for the API"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "passages_encoded": self.encoded,
+            "passages_total": self.total,
+            "eta_seconds": self.eta_seconds(),
+            "passages_per_second": self.passages_per_second(),
+            "documents_indexed": self.documents_indexed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IndexBuildJobManager:
+    """
+    Single-worker queue for index builds
+
+    Only one build runs at a time; submitting while a build is queued or
+    running returns the existing job instead of starting a second one.
+    """
+
+    def __init__(self, max_jobs: int = 50):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-build")
+        self._jobs: Dict[str, IndexBuildJob] = {}
+        self._lock = threading.Lock()
+        self._max_jobs = max_jobs
+
+    def submit(self, build_fn: Callable[[Callable[[int, int], None]], int]) -> IndexBuildJob:
+        """
+        Queue a build
+
+        Args:
+            build_fn: Called with a progress callback; returns documents indexed
+
+        Returns:
+            The queued (or already active) job
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status in ("queued", "running"):
+                    return job
+
+            job = IndexBuildJob(uuid.uuid4().hex)
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, build_fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[IndexBuildJob]:
+        """Look up a job by id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: IndexBuildJob, build_fn: Callable[[Callable[[int, int], None]], int]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.documents_indexed = build_fn(job.update_progress)
+            job.status = "completed"
+            logger.info(f"Index build {job.job_id} completed: {job.documents_indexed} passages")
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Index build {job.job_id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_jobs"""
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in ("completed", "failed")),
+            key=lambda j: j.created_at
+        )
+        while len(self._jobs) > self._max_jobs and finished:
+            self._jobs.pop(finished.pop(0).job_id, None)
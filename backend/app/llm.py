@@ -4,10 +4,12 @@ Integrates Gemini API with pretrained answers for common questions about human p
 """
 import logging
 import re
-from typing import Optional, Tuple, List
+from typing import TYPE_CHECKING, Optional, Tuple, List
 
 from gemini_llm import get_gemini_client
-from app.pretrained_qa import get_pretrained_answer
+
+if TYPE_CHECKING:
+    from app.router import RouteDecision
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,10 @@ GREETINGS = {
 }
 
 
+# Compiled once at import
+_GREETING_PATTERNS = [(re.compile(pattern, re.IGNORECASE), response) for pattern, response in GREETINGS.items()]
+
+
 def is_greeting(text: str) -> Tuple[bool, Optional[str]]:
     """
     Check if text is a greeting and return predefined response
@@ -33,8 +39,8 @@ def is_greeting(text: str) -> Tuple[bool, Optional[str]]:
         return False, None
     
     t = text.strip().lower()
-    for pattern, resp in GREETINGS.items():
-        if re.search(pattern, t, re.IGNORECASE):
+    for pattern, resp in _GREETING_PATTERNS:
+        if pattern.search(t):
             return True, resp
     return False, None
 
@@ -83,6 +89,7 @@ def generate_answer(
     """
     try:
         client = get_gemini_client(api_key=gemini_api_key)
+        # Circuit breaker state from earlier calls; no test request is sent
         if not client.is_available():
             logger.warning("Gemini not available — returning fallback context")
             return _fallback_answer(context)
@@ -104,10 +111,12 @@ def answer_bhagavad_gita_question(
     max_tokens: int = 512,
     temperature: float = 0.7,
     gemini_api_key: Optional[str] = None,
+    decision: Optional["RouteDecision"] = None,
 ) -> str:
     """
     Compose a Gita-aware prompt and generate an answer via Gemini.
-    First checks for pretrained answers to avoid Gemini calls when possible.
+    Questions the fast-path router can answer (greetings, pretrained
+    topics) never reach Gemini.
     
     Args:
         question: User's question
@@ -115,15 +124,20 @@ def answer_bhagavad_gita_question(
         max_tokens: Maximum tokens
         temperature: Generation temperature
         gemini_api_key: Gemini API key
+        decision: Route the caller already chose for this question; routing
+            (and its route count) happens here only when omitted
         
     Returns:
         Answer from pretrained database or Gemini
     """
-    # First check for pretrained answer - these cover 50 human problems
-    has_pretrained, pretrained_answer = get_pretrained_answer(question)
-    if has_pretrained:
-        logger.info(f"Using pretrained answer for: {question[:50]}")
-        return add_krishna_says(pretrained_answer)
+    routed_here = decision is None
+    if routed_here:
+        # Imported here: the router module imports this one
+        from app.router import ROUTER
+        decision = ROUTER.route(question)
+    if decision.answer is not None:
+        logger.info(f"Using {decision.route} answer for: {question[:50]}")
+        return decision.answer
     
     # Fall back to Gemini + RAG for other questions
     system_instruction = (
@@ -133,13 +147,16 @@ def answer_bhagavad_gita_question(
 
     prompt = f"{system_instruction}\n\nRelevant passages:\n{retrieved_context}\n\nQuestion: {question}\n\nAnswer:"
 
-    return generate_answer(
+    answer = generate_answer(
         prompt=prompt,
         context=retrieved_context,
         max_tokens=max_tokens,
         temperature=temperature,
         gemini_api_key=gemini_api_key,
     )
+    if routed_here:
+        ROUTER.record_rag_outcome('llm_unavailable' if is_fallback_answer(answer, retrieved_context) else 'llm')
+    return answer
 
 
 def chat_with_gita(
@@ -152,7 +169,7 @@ def chat_with_gita(
 ) -> str:
     """
     Simple chat wrapper that formats messages and calls Gemini chat/generate.
-    Checks pretrained answers first for quick responses.
+    Routes the message first, so greetings and pretrained topics are quick.
     
     Args:
         user_message: Current user message
@@ -165,16 +182,19 @@ def chat_with_gita(
     Returns:
         Chat response
     """
-    # First check for pretrained answer - these handle 50 human problems
-    has_pretrained, pretrained_answer = get_pretrained_answer(user_message)
-    if has_pretrained:
-        logger.info(f"Using pretrained answer in chat for: {user_message[:50]}")
-        return add_krishna_says(pretrained_answer)
+    # Greetings and pretrained topics are answered without Gemini
+    from app.router import ROUTER
+    decision = ROUTER.route(user_message)
+    if decision.answer is not None:
+        logger.info(f"Using {decision.route} answer in chat for: {user_message[:50]}")
+        return decision.answer
     
     try:
         client = get_gemini_client(api_key=gemini_api_key)
         if not client.is_available():
+            ROUTER.record_rag_outcome('llm_unavailable')
             return _fallback_answer(retrieved_context)
+        ROUTER.record_rag_outcome('llm')
 
         messages = chat_history or []
         messages.append({"role": "user", "content": user_message})
@@ -228,6 +248,11 @@ def get_llm_status(gemini_api_key: Optional[str] = None) -> dict:
         }
 
 
+def is_fallback_answer(answer: str, context: str = "") -> bool:
+    """True when `answer` is the canned reply used because Gemini was unavailable"""
+    return answer == _fallback_answer(context)
+
+
 def _fallback_answer(context: str) -> str:
     """
     Provide fallback answer when Gemini is unavailable
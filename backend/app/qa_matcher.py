@@ -0,0 +1,490 @@
+"""
+QA Matcher Module - Single-pass keyword matcher for the pretrained Q&A table
+The keyword regexes are compiled once into one trie-shaped regex, so a
+question is scanned a single time no matter how many entries the table holds.
+Misspelled keywords are corrected through a trigram index, and questions
+without a keyword can still reach a topic by embedding similarity
+"""
+import re
+import logging
+import functools
+from collections import Counter
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words as the \b-delimited keyword patterns see them ("don't" -> "don", "t");
+# phrases match across any separator, so "self-centered" hits "self centered"
+_TOKEN = re.compile(r'\w+')
+# Stands for the \W+ between two words of a phrase in the character trie
+_SEPARATOR = '\x00'
+
+# The table's pattern shape: \b(phrase|phrase|...)\b with literal phrases
+_ALTERNATION = re.compile(r'^\\b\((?P<body>[^()\[\]{}*+?.^$]*)\)\\b$')
+
+
+class PretrainedMatch(NamedTuple):
+    """One keyword hit in a question"""
+    entry: int       # position of the entry in the table
+    keyword: str     # the entry's topic keyword
+    phrase: str      # matched question text
+    start: int       # character offsets into the question
+    end: int
+    words: int       # phrase length in words (specificity)
+    typos: int = 0   # misspelled words corrected to match (0 for exact hits)
+
+
+def pattern_phrases(pattern: str) -> Optional[List[str]]:
+    """
+    Literal phrases of a \\b(a|b|c)\\b keyword pattern
+
+    Returns:
+        Lower-cased phrases, or None if the pattern uses other regex syntax
+    """
+    match = _ALTERNATION.match(pattern)
+    if not match:
+        return None
+    phrases = [p.replace("\\'", "'").replace('\\ ', ' ').strip().lower() for p in match.group('body').split('|')]
+    if any(not p or '\\' in p for p in phrases):
+        return None
+    return phrases
+
+
+def entry_phrases(entry: Dict[str, Any]) -> Optional[List[str]]:
+    """An entry's literal keyword phrases ('phrases', or parsed from 'pattern'); None if it needs its regex"""
+    if entry.get('phrases') is not None:
+        return [p.strip().lower() for p in entry['phrases']]
+    return pattern_phrases(entry['pattern'])
+
+
+class PretrainedMatcher:
+    """
+    All keyword hits of a question in one left-to-right pass
+
+    Literal phrases from every entry are merged into a character trie that
+    is compiled into a single regex (shared prefixes become nested groups,
+    so the regex engine never tries entries one by one); a zero-width
+    lookahead reports the longest phrase starting at each word, and a word
+    trie walked along that phrase yields every shorter phrase ending inside
+    it. Matching cost therefore tracks the question length, not the number
+    of entries. A phrase listed under several entries matches all of them.
+    Patterns that are not plain phrase alternations fall back to their own
+    compiled regex.
+
+    The best match is the one from the entry listed first, as with the
+    original first-match loop, so table order stays the priority order;
+    ties within an entry go to the earliest position in the question.
+
+    find_fuzzy() is the typo-tolerant tier: question words that are not in
+    the keyword vocabulary are corrected through a TypoIndex and the
+    corrected question is matched exactly.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], known_words: Iterable[str] = ()):
+        """
+        Args:
+            entries: [{'keyword', 'answer', 'phrases' or 'pattern'}] in priority order
+            known_words: Correctly spelled words that must never be read as typos of a
+                keyword (e.g. "sacred" for "scared")
+        """
+        self.entries = entries
+        # word -> child node; the None key lists (entry, phrase words) ending here
+        self._words: Dict[Any, Any] = {}
+        chars: Dict[Any, Any] = {}
+        self._fallback: List[Tuple[int, Pattern]] = []
+        # word -> entries using it, so typo ties between words of one topic are harmless
+        vocabulary: Dict[str, Set[int]] = {}
+        for position, entry in enumerate(entries):
+            phrases = entry_phrases(entry)
+            if phrases is None:
+                self._fallback.append((position, re.compile(entry['pattern'], re.IGNORECASE)))
+                continue
+            for phrase in phrases:
+                tokens = _TOKEN.findall(phrase)
+                if tokens:
+                    for token in tokens:
+                        vocabulary.setdefault(token, set()).add(position)
+                    self._insert(tokens, (position, len(phrase.split())))
+                    _insert_chars(chars, _SEPARATOR.join(tokens))
+        self._source = r'\b(?=(' + _trie_regex(chars) + r')\b)' if chars else None
+        self._regex = re.compile(self._source) if self._source else None
+        self._regex_ignorecase: Optional[Pattern] = None
+        self.typos = TypoIndex(vocabulary, known_words, groups={w: frozenset(p) for w, p in vocabulary.items()})
+        if self._fallback:
+            logger.info(f"{len(self._fallback)} pretrained pattern(s) matched by regex instead of the trie")
+
+    @classmethod
+    def from_table(cls, table: Dict[str, Dict[str, Any]]) -> 'PretrainedMatcher':
+        """Build from a {pattern: {'keyword', 'answer'}} table (dict order is priority)"""
+        return cls([{'pattern': pattern, **data} for pattern, data in table.items()])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find_all(self, question: str) -> List[PretrainedMatch]:
+        """
+        Every keyword hit, ordered by position in the question
+
+        Args:
+            question: User's question
+
+        Returns:
+            Matches (one per entry and phrase occurrence)
+        """
+        if not question:
+            return []
+        matches: List[PretrainedMatch] = []
+        if self._regex is not None:
+            lowered = question.lower()
+            if len(lowered) == len(question):
+                hits = self._regex.finditer(lowered)
+            else:
+                # Lower-casing changed offsets (rare Unicode); match case-insensitively instead
+                if self._regex_ignorecase is None:
+                    self._regex_ignorecase = re.compile(self._source, re.IGNORECASE)
+                hits = self._regex_ignorecase.finditer(question)
+            for hit in hits:
+                self._expand(hit.start(1), hit.group(1), question, matches)
+        for position, pattern in self._fallback:
+            for m in pattern.finditer(question):
+                words = len(m.group(0).split())
+                matches.append(self._match(position, question, m.start(), m.end(), words))
+        matches.sort(key=lambda m: (m.start, -m.end, m.entry))
+        return matches
+
+    def best(self, question: str) -> Optional[PretrainedMatch]:
+        """Hit from the earliest entry (earliest position on ties), or None"""
+        return self.best_of(self.find_all(question))
+
+    def find_fuzzy(self, question: str) -> List[PretrainedMatch]:
+        """
+        Keyword hits after correcting misspelled words
+
+        Args:
+            question: User's question
+
+        Returns:
+            Matches that needed at least one correction, with offsets into the
+            original question
+        """
+        lowered = question.lower() if question else ''
+        if len(lowered) != len(question or ''):
+            return []
+        pieces: List[str] = []
+        # corrected offset -> original offset, for the token boundaries matches start/end on
+        starts: Dict[int, int] = {}
+        ends: Dict[int, int] = {}
+        corrected_at: List[int] = []
+        last = length = 0
+        for token in _TOKEN.finditer(lowered):
+            gap = lowered[last:token.start()]
+            pieces.append(gap)
+            length += len(gap)
+            correction = self.typos.correct(token.group(0))
+            word = correction[0] if correction else token.group(0)
+            starts[length] = token.start()
+            if correction:
+                corrected_at.append(length)
+            pieces.append(word)
+            length += len(word)
+            ends[length] = token.end()
+            last = token.end()
+        if not corrected_at:
+            return []
+        pieces.append(lowered[last:])
+        matches = []
+        for m in self.find_all(''.join(pieces)):
+            start, end = starts.get(m.start), ends.get(m.end)
+            typos = sum(1 for at in corrected_at if m.start <= at < m.end)
+            if start is None or end is None or not typos:
+                continue
+            matches.append(m._replace(phrase=question[start:end], start=start, end=end, typos=typos))
+        return matches
+
+    @staticmethod
+    def best_of(matches: List[PretrainedMatch]) -> Optional[PretrainedMatch]:
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (m.typos, m.entry, m.start))
+
+    def answer(self, match: PretrainedMatch) -> str:
+        return self.entries[match.entry]['answer']
+
+    def _expand(self, start: int, longest: str, question: str, matches: List[PretrainedMatch]) -> None:
+        """Every phrase that starts at `start` and ends inside the longest one"""
+        node = self._words
+        for token in _TOKEN.finditer(longest):
+            node = node.get(token.group(0).lower())
+            if node is None:
+                return
+            for position, words in node.get(None, ()):
+                matches.append(self._match(position, question, start, start + token.end(), words))
+
+    def _insert(self, tokens: List[str], end: Tuple[int, int]) -> None:
+        node = self._words
+        for token in tokens:
+            node = node.setdefault(token, {})
+        ends = node.setdefault(None, [])
+        if end not in ends:
+            ends.append(end)
+
+    def _match(self, position: int, question: str, start: int, end: int, words: int) -> PretrainedMatch:
+        return PretrainedMatch(position, self.entries[position]['keyword'], question[start:end], start, end, words)
+
+
+class TypoIndex:
+    """
+    Closest keyword word to a misspelled word, by bounded edit distance
+
+    Keyword words are indexed by their padded character trigrams, with
+    posting lists split by first letter (a correction never changes it). A
+    word one edit away shares all but at most 4 of the misspelling's n
+    trigrams (a transposition breaks four), so counting shared trigrams over
+    the misspelling's few short posting lists rules out almost the whole
+    vocabulary; an optimal string alignment distance, banded and skipping
+    the common prefix and suffix, checks the words left. Two edits are only
+    tried on long words and only against words sharing at least half the
+    trigrams, since the exact q-gram bound is too loose there to filter
+    anything. Results are cached, as question words repeat across requests.
+
+    To keep ordinary words from turning into keywords, only words of
+    min_length+ letters are corrected, the first letter must agree, a tie
+    between keyword words of different groups (topics) is ambiguous and
+    ignored, and vocabulary or known words are never corrected.
+    """
+
+    def __init__(
+        self,
+        words: Iterable[str],
+        known_words: Iterable[str] = (),
+        min_length: int = 5,
+        groups: Optional[Dict[str, Any]] = None,
+        cache_size: int = 8192
+    ):
+        """
+        Args:
+            words: Keyword vocabulary (correctly spelled)
+            known_words: Other correctly spelled words that are never corrected
+            min_length: Shortest word that is corrected or corrected to
+            groups: Word -> group label; equally close words of one group are not
+                ambiguous (the alphabetically first is used)
+            cache_size: Looked-up words whose result is remembered
+        """
+        vocabulary = {w.lower() for w in words}
+        self.min_length = min_length
+        self._groups = groups or {}
+        self.words = sorted(w for w in vocabulary if len(w) >= min_length and w.isalpha())
+        self._known = vocabulary | {w.lower() for w in known_words}
+        # (first letter, trigram) -> positions of the words containing it
+        postings: Dict[Tuple[str, str], List[int]] = {}
+        for position, word in enumerate(self.words):
+            for gram in _trigrams(word):
+                postings.setdefault((word[0], gram), []).append(position)
+        self._postings = postings
+        self._gram_counts = [len(_trigrams(w)) for w in self.words]
+        self._lookup = functools.lru_cache(maxsize=cache_size)(self._search)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @staticmethod
+    def max_edits(word: str) -> int:
+        """Edits tolerated for a word: 1, or 2 from eight letters on"""
+        return 2 if len(word) >= 8 else 1
+
+    def correct(self, word: str) -> Optional[Tuple[str, int]]:
+        """
+        Keyword word a misspelling most likely stands for
+
+        Args:
+            word: Lower-case question word
+
+        Returns:
+            (keyword word, edit distance), or None if the word is known, too
+            short, or has no unambiguous keyword within the bound
+        """
+        if len(word) < self.min_length or word in self._known or not word.isalpha():
+            return None
+        return self._lookup(word)
+
+    def _search(self, word: str) -> Optional[Tuple[str, int]]:
+        limit = self.max_edits(word)
+        grams = _trigrams(word)
+        # Trigrams the closest words keep: all but 4 per edit of the longer word's,
+        # and at least half of them when two edits are allowed
+        lost = 4 * limit
+        floor = 1 if limit == 1 else (len(grams) + 1) // 2
+        counts = Counter(chain.from_iterable(
+            self._postings.get((word[0], gram), ()) for gram in grams
+        ))
+        least = max(len(grams) - lost, floor)
+        best: Optional[Tuple[str, int]] = None
+        ambiguous = False
+        for position in sorted(p for p, shared in counts.items() if shared >= least):
+            if counts[position] < self._gram_counts[position] - lost:
+                continue
+            candidate = self.words[position]
+            distance = _osa_distance(word, candidate, limit)
+            if distance is None:
+                continue
+            if best is None or distance < best[1]:
+                best, ambiguous = (candidate, distance), False
+            elif distance == best[1] and self._groups.get(candidate, candidate) != self._groups.get(best[0], best[0]):
+                ambiguous = True
+        return None if ambiguous else best
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"$${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _osa_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Edit distance with adjacent transpositions, or None if it exceeds `limit`
+
+    The common prefix and suffix do not change the distance and are skipped;
+    of what is left, only the band of cells within `limit` of the diagonal
+    can stay under the bound.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return max(len(a), len(b))
+    over = limit + 1
+    before: List[int] = []
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        row = [i if i <= limit else over] + [over] * len(b)
+        char = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if row[j - 1] + 1 < value:
+                value = row[j - 1] + 1
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            row[j] = value if value < over else over
+        # A transposition reaches back two rows, so both must be past the bound
+        if min(row) > limit and min(previous) >= limit:
+            return None
+        before, previous = previous, row
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class IntentMatch(NamedTuple):
+    """Closest pretrained topic by meaning"""
+    entry: int          # position of the entry in the table
+    keyword: str        # the entry's topic keyword
+    similarity: float   # cosine similarity of the question to the topic
+
+
+def intent_texts(entry: Dict[str, Any]) -> List[str]:
+    """Texts describing an entry's topic: its keyword phrases, then its example questions"""
+    phrases = entry_phrases(entry)
+    texts = [f"{entry['keyword']}: {', '.join(phrases)}" if phrases else entry['keyword']]
+    texts.extend(entry.get('examples', ()))
+    return texts
+
+
+class IntentMatcher:
+    """
+    Pretrained topic for a question that shares its meaning but no keyword
+
+    Each entry is described by a few texts (its keyword phrases and example
+    questions) whose embeddings are stacked into one normalized matrix, so
+    scoring a question against every topic is a single matrix-vector
+    product; a topic scores as its closest text. The question vector is the
+    one retrieval uses, so a miss costs no extra encoder pass.
+    """
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        encode: Callable[[List[str]], np.ndarray],
+        threshold: float = 0.6
+    ):
+        """
+        Args:
+            entries: PretrainedMatcher entries, optionally with 'examples' questions
+            encode: Normalized embeddings for a list of texts, shape (n, d)
+            threshold: Cosine similarity a question needs to get a topic's answer
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("intent threshold must be in (0, 1]")
+        self.entries = entries
+        self.threshold = threshold
+        texts: List[str] = []
+        starts: List[int] = []
+        for entry in entries:
+            starts.append(len(texts))
+            texts.extend(intent_texts(entry))
+        self.matrix = np.ascontiguousarray(encode(texts), dtype=np.float32) if texts else np.zeros((0, 0), np.float32)
+        # First matrix row of each entry, for the per-entry max
+        self._starts = np.asarray(starts, dtype=np.intp)
+        logger.info(f"Pretrained intent matrix: {len(texts)} texts for {len(entries)} topics")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        """Similarity of a normalized query vector to every entry, shape (entries,)"""
+        if not len(self.entries):
+            return np.zeros(0, dtype=np.float32)
+        similarities = self.matrix @ np.asarray(vector, dtype=np.float32).reshape(-1)
+        return np.maximum.reduceat(similarities, self._starts)
+
+    def match(self, vector: np.ndarray) -> Optional[IntentMatch]:
+        """
+        Closest topic if it clears the threshold
+
+        Args:
+            vector: Normalized query embedding, shape (d,) or (1, d)
+
+        Returns:
+            IntentMatch (earliest entry on ties), or None
+        """
+        scores = self.scores(vector)
+        if not len(scores):
+            return None
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.threshold:
+            return None
+        return IntentMatch(best, self.entries[best]['keyword'], similarity)
+
+    def answer(self, match: IntentMatch) -> str:
+        return self.entries[match.entry]['answer']
+
+
+def _insert_chars(trie: Dict[Any, Any], text: str) -> None:
+    node = trie
+    for char in text:
+        node = node.setdefault(char, {})
+    node[None] = True
+
+
+def _trie_regex(node: Dict[Any, Any]) -> str:
+    """Regex for a character trie; optional tails are greedy, so the longest phrase wins"""
+    branches = [
+        (r'\W+' if char == _SEPARATOR else re.escape(char)) + _trie_regex(child)
+        for char, child in sorted((k, v) for k, v in node.items() if k is not None)
+    ]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if None in node:
+        return f'(?:{body})?' if len(branches) == 1 else body + '?'
+    return body
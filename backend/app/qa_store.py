@@ -0,0 +1,276 @@
+"""
+QA Store Module - Hot-reloadable pretrained Q&A set
+The Q&A table lives in a JSON data file. Each version is parsed and compiled
+into an immutable PretrainedSet before a single reference swap publishes it,
+so a request always sees one complete version and edits go live without a
+restart
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.qa_matcher import IntentMatcher, PretrainedMatch, PretrainedMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def load_table(path: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Read and validate a Q&A data file
+
+    The file holds {"entries": [...], "known_words": [...]} (or just the
+    entry list). Each entry has a 'keyword', an 'answer', literal 'phrases'
+    or a regex 'pattern', and optional 'examples' questions; list order is
+    match priority. known_words are real words the typo tier must leave
+    alone because they sit one edit away from a keyword.
+
+    Args:
+        path: JSON file
+
+    Returns:
+        ({'entries', 'known_words'}, version) where version is a digest of the
+        file contents
+
+    Raises:
+        ValueError: If the file is not a valid Q&A table
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        raise ValueError(f"{path}: not valid JSON ({e})")
+    entries = data.get('entries') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of entries")
+    for position, entry in enumerate(entries):
+        problem = _entry_problem(entry)
+        if problem:
+            raise ValueError(f"{path}: entry {position}: {problem}")
+    known_words = data.get('known_words', []) if isinstance(data, dict) else []
+    if not isinstance(known_words, list) or not all(isinstance(w, str) for w in known_words):
+        raise ValueError(f"{path}: 'known_words' must be a list of strings")
+    return {'entries': entries, 'known_words': known_words}, hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _entry_problem(entry: Any) -> Optional[str]:
+    if not isinstance(entry, dict):
+        return "not an object"
+    for field in ('keyword', 'answer'):
+        if not isinstance(entry.get(field), str) or not entry[field].strip():
+            return f"'{field}' must be a non-empty string"
+    phrases = entry.get('phrases')
+    if phrases is not None:
+        if not isinstance(phrases, list) or not phrases or not all(isinstance(p, str) and p.strip() for p in phrases):
+            return "'phrases' must be a list of non-empty strings"
+    elif isinstance(entry.get('pattern'), str):
+        try:
+            re.compile(entry['pattern'])
+        except re.error as e:
+            return f"bad 'pattern': {e}"
+    else:
+        return "needs 'phrases' or 'pattern'"
+    examples = entry.get('examples', [])
+    if not isinstance(examples, list) or not all(isinstance(q, str) for q in examples):
+        return "'examples' must be a list of strings"
+    return None
+
+
+class PretrainedSet:
+    """One version of the Q&A table with its compiled matchers (never mutated once published)"""
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        version: str,
+        source: Optional[str] = None,
+        known_words: Iterable[str] = ()
+    ):
+        """
+        Args:
+            entries: Validated entries in priority order
+            version: Content digest identifying this version
+            source: File the entries came from
+            known_words: Real words never corrected into keywords
+        """
+        self.entries = entries
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self.matcher = PretrainedMatcher(entries, known_words)
+        # (encode, threshold) -> matrix; built on first use or by a store preparer
+        self._intents: Optional[Tuple[Tuple[Callable, float], IntentMatcher]] = None
+        self._intents_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PretrainedSet':
+        table, version = load_table(path)
+        return cls(table['entries'], version, path, table['known_words'])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(self, question: str, fuzzy: bool = True) -> Tuple[Optional[PretrainedMatch], List[PretrainedMatch]]:
+        """
+        Keyword matches of a question
+
+        Args:
+            question: User's question
+            fuzzy: Fall back to typo-corrected matching when nothing matches exactly
+
+        Returns:
+            (best match or None, every match with its position)
+        """
+        question = question.strip() if question else ''
+        matches = self.matcher.find_all(question)
+        if not matches and fuzzy:
+            matches = self.matcher.find_fuzzy(question)
+        return self.matcher.best_of(matches), matches
+
+    def answer(self, match: Any) -> str:
+        """Answer of the entry a PretrainedMatch or IntentMatch points at"""
+        return self.entries[match.entry]['answer']
+
+    def keywords(self) -> List[str]:
+        return sorted({entry['keyword'] for entry in self.entries})
+
+    def intent_matcher(self, encode: Callable[[List[str]], np.ndarray], threshold: float) -> IntentMatcher:
+        """
+        Embedding matcher over this version's topics, encoded once
+
+        Args:
+            encode: Normalized embeddings for a list of texts (the query encoder)
+            threshold: Cosine similarity needed to answer from a topic
+        """
+        key = (encode, threshold)
+        with self._intents_lock:
+            if self._intents is None or self._intents[0] != key:
+                self._intents = (key, IntentMatcher(self.entries, encode, threshold))
+            return self._intents[1]
+
+    def summary(self) -> Dict:
+        return {
+            "version": self.version,
+            "entries": len(self.entries),
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class PretrainedStore:
+    """
+    The live PretrainedSet of a data file, swapped when the file changes
+
+    reload() compiles the new version off to the side (and runs the
+    registered preparers on it, e.g. to encode its intent matrix) before
+    publishing it; a file that fails to load leaves the current version
+    serving. A watcher thread can poll the file's mtime, or an admin
+    endpoint can call reload() directly.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: JSON Q&A file (see load_table)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._preparers: List[Callable[[PretrainedSet], None]] = []
+        self._stat = self._file_stat()
+        self._rejected: Optional[Tuple[int, int]] = None
+        self._current = PretrainedSet.from_file(path)
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.reloads = 0
+        logger.info(f"Loaded {len(self._current)} pretrained answers from {path} (version {self._current.version})")
+
+    @property
+    def current(self) -> PretrainedSet:
+        """The live version; callers keep the reference for the whole request"""
+        return self._current
+
+    def add_preparer(self, prepare: Callable[[PretrainedSet], None]) -> None:
+        """Run `prepare` on every new version before it is published"""
+        with self._lock:
+            self._preparers.append(prepare)
+
+    def reload(self, force: bool = False) -> Dict:
+        """
+        Load the data file again and publish it if it changed
+
+        Args:
+            force: Re-read even if the file's mtime and size are unchanged
+
+        Returns:
+            {'status': 'reloaded' | 'unchanged', ...summary of the live version}
+
+        Raises:
+            OSError, ValueError: The file could not be loaded (the current version keeps serving)
+        """
+        with self._lock:
+            stat = self._file_stat()
+            if not force and stat in (self._stat, self._rejected):
+                return {"status": "unchanged", **self._current.summary()}
+            try:
+                table, version = load_table(self.path)
+            except (OSError, ValueError):
+                # Only reported once per file state; a later save is tried again
+                self._rejected = stat
+                raise
+            self._stat = stat
+            if version == self._current.version:
+                return {"status": "unchanged", **self._current.summary()}
+            candidate = PretrainedSet(table['entries'], version, self.path, table['known_words'])
+            for prepare in self._preparers:
+                prepare(candidate)
+            previous = self._current
+            self._current = candidate
+            self.reloads += 1
+        logger.info(
+            f"Pretrained answers reloaded: {previous.version} ({len(previous)} entries) -> "
+            f"{candidate.version} ({len(candidate)} entries)"
+        )
+        return {"status": "reloaded", **candidate.summary()}
+
+    def start_watcher(self, interval: float = 5.0) -> None:
+        """Poll the data file every `interval` seconds and reload it when it changes"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="pretrained-qa-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.path} for pretrained answer changes every {interval}s")
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def stats(self) -> Dict:
+        return {
+            **self._current.summary(),
+            "reloads": self.reloads,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Keeping pretrained answers {self._current.version}; reload failed: {e}")
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -4,12 +4,17 @@ Imports and wraps the enhanced RAG engine
 """
 import sys
 import os
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
 # Add parent directory to path to import local_llm
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rag_engine import BhagavadGitaRAGEngine
+from corpus_reader import CorpusPath, corpus_files
+from app.jobs import IndexBuildJobManager
+from app.qa_matcher import IntentMatch, IntentMatcher
+from app.qa_store import PretrainedSet
+from app.pretrained_qa import QA_STORE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,89 +28,389 @@ class RAGEngine:
     
     def __init__(
         self,
-        corpus_path: str = 'data/corpus/geetha_verses.txt',
+        corpus_path: CorpusPath = 'data/corpus/geetha_verses.txt',
         model_name: str = 'all-MiniLM-L6-v2',
         index_path: str = 'data/faiss_index.faiss',
         gemini_api_key: str = None,
-        use_gemini: bool = True
+        use_gemini: bool = True,
+        index_type: str = 'flat',
+        index_params: Optional[Dict] = None,
+        embedding_cache_path: Optional[str] = None,
+        retrieval_mode: str = 'hybrid',
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 3600.0,
+        answer_cache_size: int = 512,
+        answer_cache_threshold: float = 0.95,
+        answer_cache_ttl: Optional[float] = 86400.0,
+        encoder_batch_size: int = 32,
+        encoder_max_wait_ms: float = 2.0,
+        query_encoder: str = 'fp32',
+        query_max_seq_length: Optional[int] = None,
+        chunking: Optional[Dict] = None,
+        build_workers: int = 1,
+        dedup_threshold: Optional[float] = 0.9,
+        intent_threshold: Optional[float] = 0.6,
+        build_jobs: Optional[IndexBuildJobManager] = None
     ):
         """
         Initialize RAG Engine for app using Gemini API
         
         Args:
-            corpus_path: Path to Gita corpus
+            corpus_path: Corpus file, directory of .txt files, or list of files
             model_name: Embedding model name
             index_path: Path to save/load FAISS index
             gemini_api_key: Google Gemini API key
             use_gemini: Use Gemini API for generation
+            index_type: ANN backend - 'flat', 'ivf', 'hnsw' or 'ivfpq'
+            index_params: Index build/search defaults (nlist, nprobe, ef_search, ...)
+            embedding_cache_path: SQLite file caching passage embeddings across rebuilds
+            retrieval_mode: Default search mode - 'dense', 'lexical' or 'hybrid'
+            query_cache_size: Query embeddings kept in the LRU cache (0 disables it)
+            query_cache_ttl: Seconds a cached query embedding stays valid
+            answer_cache_size: Generated answers kept in the semantic cache (0 disables it)
+            answer_cache_threshold: Question similarity needed to reuse a cached answer
+            answer_cache_ttl: Seconds a cached answer stays valid
+            encoder_batch_size: Most concurrent queries encoded/searched together
+            encoder_max_wait_ms: Micro-batching window in milliseconds (0 disables it)
+            query_encoder: Query embedding backend - 'fp32' or 'int8'
+            query_max_seq_length: Token limit for query encoding
+            chunking: Sentence-window chunking ({'window', 'overlap', 'min_chars'}; None disables)
+            build_workers: Encoder processes for index builds (0 = one per CPU core)
+            dedup_threshold: Similarity at which corpus near-duplicates become aliases (None/0 disables)
+            intent_threshold: Similarity at which a question gets a pretrained topic's answer
+                without sharing its keywords (None/0 disables)
+            build_jobs: Queue that runs the build when no current index is on disk
+                (share the app's so POST /build_index sees that build)
         """
         self.corpus_path = corpus_path
         self.model_name = model_name
         self.index_path = index_path
+        self.intent_threshold = intent_threshold or None
+        self.build_jobs = build_jobs or IndexBuildJobManager()
         
         # Initialize enhanced RAG engine with Gemini
         self.engine = BhagavadGitaRAGEngine(
             corpus_path=corpus_path,
             gemini_api_key=gemini_api_key,
             embeddings_model=model_name,
-            use_gemini=use_gemini
+            use_gemini=use_gemini,
+            index_path=index_path,
+            index_type=index_type,
+            index_params=index_params,
+            embedding_cache_path=embedding_cache_path,
+            retrieval_mode=retrieval_mode,
+            query_cache_size=query_cache_size,
+            query_cache_ttl=query_cache_ttl,
+            answer_cache_size=answer_cache_size,
+            answer_cache_threshold=answer_cache_threshold,
+            answer_cache_ttl=answer_cache_ttl,
+            encoder_batch_size=encoder_batch_size,
+            encoder_max_wait_ms=encoder_max_wait_ms,
+            query_encoder=query_encoder,
+            query_max_seq_length=query_max_seq_length,
+            chunking=chunking,
+            build_workers=build_workers,
+            dedup_threshold=dedup_threshold
         )
         
         # Try to load existing index
         self._load_index()
     
     def _load_index(self) -> bool:
-        """Load existing FAISS index if available"""
+        """
+        Load persisted FAISS index if available and still current
+        
+        A missing or stale index is not rebuilt here, since the wrapper is
+        created inside a request handler: a background build job is queued
+        instead. Requests that need the index before it lands wait for that
+        build rather than starting another (see engine.ensure_index).
+        """
         try:
-            if os.path.exists(self.index_path):
-                self.engine.load_corpus()
-                # The index will be rebuilt if needed in search
-                logger.info(f"Corpus loaded from {self.corpus_path}")
+            if self.engine.load_index():
+                logger.info(f"Index loaded from {self.index_path}")
                 return True
+            corpus_files(self.corpus_path)
+            job = self.build_jobs.submit(self.engine.ensure_index)
+            logger.info(f"No current index at {self.index_path}; build job {job.job_id} is {job.status}")
         except Exception as e:
             logger.warning(f"Could not load index: {e}")
         return False
     
-    def build_index(self) -> int:
+    def build_index(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
         """
         Build FAISS index from corpus
         
+        Args:
+            progress_callback: Called as (passages_encoded, total) during encoding
+        
         Returns:
             Number of documents indexed
         """
         try:
-            count = self.engine.build_embeddings_index()
+            count = self.engine.build_embeddings_index(progress_callback=progress_callback)
             logger.info(f"Index built: {count} documents")
             return count
         except Exception as e:
             logger.error(f"Error building index: {e}")
             raise
     
-    def search(self, question: str, top_k: int = 3) -> List[str]:
+    def add_passages(self, texts: List[str]) -> List[int]:
+        """
+        Add passages to the live index without a rebuild
+        
+        Args:
+            texts: Passage texts
+            
+        Returns:
+            Ids assigned to the new passages
+        """
+        try:
+            return self.engine.add_passages(texts)
+        except Exception as e:
+            logger.error(f"Error adding passages: {e}")
+            raise
+    
+    def remove_passage(self, passage_id: int) -> int:
+        """
+        Remove a passage from the live index
+        
+        Args:
+            passage_id: Id of the passage
+            
+        Returns:
+            Number of passages removed
+        """
+        try:
+            return self.engine.remove_passages([passage_id])
+        except Exception as e:
+            logger.error(f"Error removing passage {passage_id}: {e}")
+            raise
+    
+    def update_passage(self, passage_id: int, text: str) -> int:
+        """
+        Re-embed a single passage in place
+        
+        Args:
+            passage_id: Id of the passage
+            text: New passage text
+            
+        Returns:
+            The passage id
+        """
+        try:
+            return self.engine.update_passage(passage_id, text)
+        except Exception as e:
+            logger.error(f"Error updating passage {passage_id}: {e}")
+            raise
+    
+    def list_snapshots(self) -> List[Dict]:
+        """Index snapshots available for rollback, oldest first"""
+        return self.engine.list_snapshots()
+    
+    def rollback(self, version: str) -> Dict:
+        """
+        Make an earlier index snapshot live
+        
+        Args:
+            version: Snapshot version (e.g. 'v000003')
+            
+        Returns:
+            Summary of the restored snapshot
+        """
+        try:
+            return self.engine.rollback(version).summary()
+        except Exception as e:
+            logger.error(f"Error rolling back to {version}: {e}")
+            raise
+    
+    def passage_count(self) -> int:
+        """Number of passages currently indexed (chunks of one passage count once)"""
+        snapshot = self.engine.snapshot
+        return snapshot.passage_count if snapshot else 0
+    
+    def query_cache_stats(self) -> Dict:
+        """Query-embedding cache size and hit/miss counters"""
+        return self.engine.query_cache.stats()
+    
+    def answer_cache_stats(self) -> Optional[Dict]:
+        """Semantic answer cache size and hit/miss counters (None when disabled)"""
+        cache = self.engine.answer_cache
+        return cache.stats() if cache is not None else None
+    
+    def encoder_stats(self) -> Optional[Dict]:
+        """Micro-batching counters (None when batching is disabled)"""
+        service = self.engine.encoder_service
+        return service.stats() if service is not None else None
+    
+    def cached_answer(self, question: str, scope: str = "") -> Optional[Dict]:
+        """
+        Cached answer for a near-duplicate question
+        
+        Args:
+            question: User question
+            scope: answer_cache.cache_scope() of the request settings
+            
+        Returns:
+            Cache entry with 'answer', 'passages' and 'scores', or None
+        """
+        try:
+            return self.engine.cached_answer(question, scope)
+        except Exception as e:
+            # A cache failure must never fail the query
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+    
+    def store_answer(
+        self,
+        question: str,
+        answer: str,
+        passages: List[str],
+        scores: Optional[List[float]] = None,
+        scope: str = ""
+    ) -> None:
+        """Remember a generated answer for later near-duplicate questions"""
+        try:
+            self.engine.store_answer(question, answer, passages, scores, scope)
+        except Exception as e:
+            logger.warning(f"Answer cache store failed: {e}")
+    
+    def match_intent(self, question: str, pretrained: Optional[PretrainedSet] = None) -> Optional[IntentMatch]:
+        """
+        Pretrained topic closest in meaning to a question
+        
+        Uses the query embedding that retrieval would compute anyway (it is
+        cached, so the search after a miss does not encode again).
+        
+        Args:
+            question: User question
+            pretrained: Q&A version to match against (default: the live one)
+            
+        Returns:
+            IntentMatch above intent_threshold, or None
+        """
+        if not self.intent_threshold:
+            return None
+        try:
+            intents = self._intent_matcher(pretrained or QA_STORE.current)
+            return intents.match(self.engine.embed_query(question))
+        except Exception as e:
+            # Falling through to RAG is always a valid answer
+            logger.warning(f"Pretrained intent match failed: {e}")
+            return None
+    
+    def prepare_pretrained(self, pretrained: PretrainedSet) -> None:
+        """Encode a new Q&A version's topic matrix before it goes live (QA_STORE preparer)"""
+        if not self.intent_threshold:
+            return
+        try:
+            self._intent_matcher(pretrained)
+        except Exception as e:
+            # Built lazily on first use instead
+            logger.warning(f"Could not encode pretrained topics for version {pretrained.version}: {e}")
+    
+    def _intent_matcher(self, pretrained: PretrainedSet) -> IntentMatcher:
+        """Topic matrix of a Q&A version, encoded once per version"""
+        return pretrained.intent_matcher(self.engine.embed_texts, self.intent_threshold)
+    
+    def lookup_verses(self, question: str) -> List[Dict]:
+        """
+        Direct chapter/verse lookup for questions like "what does 2.47 say"
+        
+        Args:
+            question: User question
+            
+        Returns:
+            Passage records for the referenced verses (empty if none)
+        """
+        try:
+            return self.engine.lookup_verses(question)
+        except Exception as e:
+            logger.error(f"Error looking up verses: {e}")
+            raise
+    
+    def search(
+        self,
+        question: str,
+        top_k: int = 3,
+        search_params: Optional[Dict] = None,
+        mode: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        mmr_lambda: Optional[float] = None,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False,
+        expand_parents: bool = True
+    ) -> List[str]:
         """
         Search for relevant passages
         
         Args:
             question: Search query
             top_k: Number of results
+            search_params: Per-call ANN overrides ('nprobe', 'ef_search')
+            mode: 'dense', 'lexical' or 'hybrid' (None = engine default)
+            filters: Metadata filters - chapters, chapter_range, verse_range, speaker
+            mmr_lambda: MMR relevance/diversity trade-off (None disables MMR)
+            min_score: Minimum cosine similarity to keep a passage
+            adaptive_k: Stop at the largest score gap within top_k
+            expand_parents: Return full passages for chunk hits
             
         Returns:
             List of relevant passages
         """
+        return [r["text"] for r in self.search_scored(
+            question, top_k, search_params, mode, filters, mmr_lambda, min_score, adaptive_k, expand_parents
+        )]
+    
+    def search_scored(
+        self,
+        question: str,
+        top_k: int = 3,
+        search_params: Optional[Dict] = None,
+        mode: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        mmr_lambda: Optional[float] = None,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False,
+        expand_parents: bool = True
+    ) -> List[Dict]:
+        """
+        Search returning passage records with a 'score' (see search for args and
+        BhagavadGitaRAGEngine.search_scored for what the score means per mode)
+        
+        Returns:
+            Passage records ('id', 'text', 'score', metadata), best first
+        """
         try:
-            passages = self.engine.search_passages(question, top_k=top_k)
-            return passages
+            return self.engine.search_scored(
+                question,
+                top_k=top_k,
+                search_params=search_params,
+                mode=mode,
+                filters=filters,
+                mmr_lambda=mmr_lambda,
+                min_score=min_score,
+                adaptive_k=adaptive_k,
+                expand_parents=expand_parents
+            )
         except Exception as e:
             logger.error(f"Error searching: {e}")
             raise
     
-    def query(self, question: str, top_k: int = 3) -> Dict:
+    def query(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False
+    ) -> Dict:
         """
         Full RAG query: search + generate
         
         Args:
             question: User question
             top_k: Number of passages to retrieve
+            min_score: Minimum cosine similarity; generation is skipped if nothing passes
+            adaptive_k: Stop at the largest score gap within top_k
             
         Returns:
             Dict with question, retrieved passages, and answer
@@ -115,7 +420,9 @@ class RAGEngine:
                 question,
                 top_k=top_k,
                 max_tokens=512,
-                temperature=0.7
+                temperature=0.7,
+                min_score=min_score,
+                adaptive_k=adaptive_k
             )
             return result
         except Exception as e:
@@ -0,0 +1,154 @@
+"""
+Router Module - Classifies each question once and picks the cheapest route
+Greetings, requests for the text of a verse reference and pretrained topics
+(by keyword, misspelled keyword or, failing those, embedding similarity) are
+answered on the fast path; everything else goes to RAG + Gemini, with any
+verses the question cites as its context. Route counts show how
+much traffic never reaches the LLM
+"""
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.llm import add_krishna_says, is_greeting
+from app.pretrained_qa import QA_STORE, PretrainedMatch, match_pretrained
+from app.qa_matcher import IntentMatch
+from app.qa_store import PretrainedSet
+from verse_refs import is_reference_only, parse_verse_query
+
+logger = logging.getLogger(__name__)
+
+# In the order they are tried
+ROUTES = ('greeting', 'verse_lookup', 'pretrained', 'pretrained_fuzzy', 'pretrained_semantic', 'rag')
+
+# How a RAG-routed request was finally served; only 'llm' reached Gemini
+RAG_OUTCOMES = ('llm', 'llm_unavailable', 'answer_cache', 'no_passages', 'engine_unavailable')
+
+
+class RouteDecision(NamedTuple):
+    """Where a question goes and what the fast path already found"""
+    route: str
+    answer: Optional[str] = None                     # final reply for fast-path routes
+    match: Optional[PretrainedMatch] = None          # best pretrained topic
+    matches: Tuple[PretrainedMatch, ...] = ()        # every pretrained hit, with positions
+    verses: Tuple[Dict, ...] = ()                    # cited verses: the answer, or the LLM's context
+    intent: Optional[IntentMatch] = None             # topic matched by embedding similarity
+
+    @property
+    def needs_llm(self) -> bool:
+        return self.route == 'rag'
+
+
+class QueryRouter:
+    """Fast-path classifier with thread-safe route counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, int] = {route: 0 for route in ROUTES}
+        self._rag_outcomes: Dict[str, int] = {outcome: 0 for outcome in RAG_OUTCOMES}
+
+    def route(
+        self,
+        question: str,
+        lookup_verses: Optional[Callable[[str], List[Dict]]] = None,
+        match_intent: Optional[Callable[[str, PretrainedSet], Optional[IntentMatch]]] = None
+    ) -> RouteDecision:
+        """
+        Classify a question and count the route
+
+        Args:
+            question: User's question
+            lookup_verses: Resolves verse references to passage records (None skips
+                the verse route, e.g. when no index is available)
+            match_intent: Embedding match against the pretrained topics, tried when no
+                keyword matched (None skips the semantic route)
+
+        Returns:
+            RouteDecision; fast-path routes carry the final answer
+        """
+        decision = self._classify(question or "", lookup_verses, match_intent)
+        with self._lock:
+            self._routes[decision.route] += 1
+        logger.debug(f"Routed to {decision.route}: {question[:50] if question else ''}")
+        return decision
+
+    def record_rag_outcome(self, outcome: str) -> None:
+        """Count how a RAG-routed request was served (one of RAG_OUTCOMES)"""
+        if outcome not in self._rag_outcomes:
+            raise ValueError(f"Unknown RAG outcome '{outcome}'")
+        with self._lock:
+            self._rag_outcomes[outcome] += 1
+
+    def stats(self) -> Dict:
+        """Route and RAG outcome counts, and the share of requests that skipped the LLM"""
+        with self._lock:
+            routes = dict(self._routes)
+            outcomes = dict(self._rag_outcomes)
+        total = sum(routes.values())
+        return {
+            "requests": total,
+            "routes": routes,
+            "rag_outcomes": outcomes,
+            "llm_avoided_fraction": round(1 - outcomes['llm'] / total, 4) if total else 0.0,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            for counts in (self._routes, self._rag_outcomes):
+                for key in counts:
+                    counts[key] = 0
+
+    @staticmethod
+    def _classify(
+        question: str,
+        lookup_verses: Optional[Callable[[str], List[Dict]]],
+        match_intent: Optional[Callable[[str, PretrainedSet], Optional[IntentMatch]]]
+    ) -> RouteDecision:
+        greeting, response = is_greeting(question)
+        if greeting:
+            return RouteDecision('greeting', answer=response)
+
+        # Explicit verse references ("2.47", "Chapter 3 Verse 19"): a bare reference gets the
+        # verse text; a question about the verses gets an answer with them as context
+        if lookup_verses is not None and parse_verse_query(question):
+            verses = lookup_verses(question)
+            if verses and is_reference_only(question):
+                answer = "📖 From the Bhagavad Gita:\n\n" + "\n\n".join(v["text"] for v in verses)
+                return RouteDecision('verse_lookup', answer=answer, verses=tuple(verses))
+            if verses:
+                return RouteDecision('rag', verses=tuple(verses))
+
+        # One Q&A version for the whole decision, even if a reload lands meanwhile
+        pretrained = QA_STORE.current
+        best, matches = match_pretrained(question, pretrained)
+        if best is not None:
+            return RouteDecision(
+                'pretrained_fuzzy' if best.typos else 'pretrained',
+                answer=add_krishna_says(pretrained.answer(best)),
+                match=best,
+                matches=tuple(matches)
+            )
+
+        # No keyword: the query embedding (reused by retrieval on a miss) may still land on a topic
+        intent = match_intent(question, pretrained) if match_intent is not None and question.strip() else None
+        if intent is not None:
+            return RouteDecision(
+                'pretrained_semantic',
+                answer=add_krishna_says(pretrained.answer(intent)),
+                intent=intent
+            )
+
+        return RouteDecision('rag')
+
+
+# Process-wide router: one set of counters for every entry point
+ROUTER = QueryRouter()
+
+
+def route_question(
+    question: str,
+    lookup_verses: Optional[Callable[[str], List[Dict]]] = None,
+    match_intent: Optional[Callable[[str, PretrainedSet], Optional[IntentMatch]]] = None
+) -> RouteDecision:
+    """Classify a question with the shared router"""
+    return ROUTER.route(question, lookup_verses, match_intent)
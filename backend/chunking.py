@@ -0,0 +1,112 @@
+"""
+Chunking - Verse-aware sentence-window chunking of corpus passages
+Long commentary passages are split into small overlapping windows of
+sentences that embed precisely; each chunk keeps its verse header and a
+pointer to its parent passage, which is what goes into the LLM context
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from verse_refs import passage_metadata
+
+# Several verses can share one blank-line block in commentary collections
+_VERSE_HEADER = re.compile(r'^\s*Chapter\s+\d+\s*,\s*Verse\s+\d+\s*:', re.IGNORECASE | re.MULTILINE)
+# A sentence runs to . ! ? (plus any closing quote/bracket) followed by whitespace or the end
+_SENTENCE = re.compile(r'\S.*?(?:[.!?]+["\')\]]*(?=\s|$)|$)')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a text, whitespace-normalized"""
+    text = ' '.join(text.split())
+    if not text:
+        return []
+    return [s.strip() for s in _SENTENCE.findall(text) if s.strip()]
+
+
+def split_verses(text: str) -> List[Tuple[str, str]]:
+    """
+    Verse segments of a passage
+
+    Returns:
+        (header, body) pairs; header is "" for text before the first header
+    """
+    starts = [m.start() for m in _VERSE_HEADER.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts = [0] + starts
+    segments = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        segment = text[start:end].strip()
+        if not segment:
+            continue
+        header = _VERSE_HEADER.match(segment)
+        if header:
+            segments.append((header.group(0).strip(), segment[header.end():].strip()))
+        else:
+            segments.append(("", segment))
+    return segments
+
+
+class ChunkingConfig:
+    """Sentence-window chunking settings"""
+
+    def __init__(self, window: int = 3, overlap: int = 1, min_chars: int = 600):
+        """
+        Args:
+            window: Sentences per chunk
+            overlap: Sentences shared by consecutive chunks
+            min_chars: Passages shorter than this are indexed whole
+        """
+        if window < 1 or not 0 <= overlap < window:
+            raise ValueError("chunking needs window >= 1 and 0 <= overlap < window")
+        self.window = int(window)
+        self.overlap = int(overlap)
+        self.min_chars = int(min_chars)
+
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> Optional['ChunkingConfig']:
+        """Build from engine settings; None disables chunking"""
+        if not settings:
+            return None
+        unknown = set(settings) - {'window', 'overlap', 'min_chars'}
+        if unknown:
+            raise ValueError(f"Unknown chunking option(s): {', '.join(sorted(unknown))}")
+        return cls(**settings)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"window": self.window, "overlap": self.overlap, "min_chars": self.min_chars}
+
+    def chunk(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Chunks of one passage
+
+        Each verse segment is windowed separately (chunks never span two
+        verses) and every chunk is prefixed with its verse header, so chunk
+        text and chapter/verse metadata stay self-describing.
+
+        Args:
+            text: Passage text
+
+        Returns:
+            [{'text', chapter/verse/speaker metadata}]; a single entry holding
+            the whole passage when it is short enough
+        """
+        if len(text) < self.min_chars:
+            return [{"text": text, **passage_metadata(text)}]
+
+        chunks = []
+        step = self.window - self.overlap
+        speaker = None
+        for header, body in split_verses(text):
+            # Metadata (notably the speaker) comes from the whole verse, not the window
+            metadata = passage_metadata(f"{header}\n{body}" if header else body)
+            # An unmarked verse continues the speech of the last marked one in this passage
+            if "speaker" in metadata:
+                speaker = metadata["speaker"]
+            elif speaker:
+                metadata["speaker"] = speaker
+            sentences = split_sentences(body)
+            for start in range(0, max(len(sentences) - self.overlap, 1), step):
+                window = ' '.join(sentences[start:start + self.window])
+                if window:
+                    chunks.append({"text": f"{header}\n{window}" if header else window, **metadata})
+        return chunks or [{"text": text, **passage_metadata(text)}]
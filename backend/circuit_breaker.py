@@ -0,0 +1,162 @@
+"""
+Circuit Breaker - Availability of a remote service from real call outcomes
+Callers report how their actual requests went instead of sending a health
+check before each one. After enough consecutive failures the circuit opens
+and a background prober (the only extra traffic, and only while open) tries
+the service until it answers again
+"""
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class CircuitBreaker:
+    """
+    Two-state breaker: closed (calls go through) or open (callers fall back)
+
+    `available` is a plain attribute read, so checking it never blocks on
+    the network. Any successful call closes the circuit, whether it came
+    from a caller or from the prober; the prober backs off exponentially
+    between attempts and exits as soon as the circuit closes.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        name: str = "service",
+        failure_threshold: int = 3,
+        probe_interval: float = 10.0,
+        max_probe_interval: float = 300.0
+    ):
+        """
+        Args:
+            probe: Makes one real request, True when the service answered
+            name: Service name for logs and the prober thread
+            failure_threshold: Consecutive failures that open the circuit
+            probe_interval: First wait between probes while open (seconds)
+            max_probe_interval: Cap for the doubling wait between probes
+        """
+        self.probe = probe
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max(probe_interval, max_probe_interval)
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self.successes = 0
+        self.failures = 0
+        self.trips = 0
+        self.probes = 0
+
+    @property
+    def available(self) -> bool:
+        """Cached availability; never makes a request"""
+        return self.state == CLOSED
+
+    def record_success(self) -> None:
+        """Report a call that reached the service"""
+        with self._lock:
+            self.successes += 1
+            outage = self._close()
+        if outage is not None:
+            logger.info(f"{self.name} circuit closed after {outage:.1f}s")
+
+    def record_failure(self, error: Any = None) -> None:
+        """
+        Report a call that could not reach the service
+
+        Args:
+            error: Exception or message, kept for stats()
+        """
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if error is not None:
+                self._last_error = str(error)
+            if self.state == OPEN or self._consecutive_failures < self.failure_threshold:
+                return
+            self.state = OPEN
+            self._opened_at = time.time()
+            self.trips += 1
+            self._start_prober()
+            failures, last_error = self._consecutive_failures, self._last_error
+        logger.warning(f"{self.name} circuit opened after {failures} consecutive failures: {last_error}")
+
+    def stop(self) -> None:
+        """Stop the prober (the circuit keeps its state)"""
+        self._stop.set()
+        with self._lock:
+            prober, self._prober = self._prober, None
+        if prober is not None:
+            prober.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive_failures,
+                "opened_at": self._opened_at,
+                "last_error": self._last_error,
+                "successes": self.successes,
+                "failures": self.failures,
+                "trips": self.trips,
+                "probes": self.probes,
+                "probing": self._prober is not None,
+            }
+
+    def _close(self) -> Optional[float]:
+        # Called with the lock held; returns how long the circuit was open, if it was
+        self._consecutive_failures = 0
+        if self.state == CLOSED:
+            return None
+        self.state = CLOSED
+        outage = time.time() - self._opened_at
+        self._opened_at = None
+        return outage
+
+    def _start_prober(self) -> None:
+        # Called with the lock held; the prober clears _prober under the same lock when it exits
+        if self._prober is not None:
+            return
+        self._stop.clear()
+        self._prober = threading.Thread(target=self._run_prober, name=f"{self.name}-prober", daemon=True)
+        self._prober.start()
+
+    def _run_prober(self) -> None:
+        wait = self.probe_interval
+        while not self._stop.wait(wait):
+            with self._lock:
+                if self.state != OPEN:
+                    self._prober = None
+                    return
+                self.probes += 1
+            try:
+                answered = self.probe()
+                error = None
+            except Exception as e:
+                answered = False
+                error = e
+            with self._lock:
+                if answered:
+                    self.successes += 1
+                    outage = self._close()
+                    self._prober = None
+                elif error is not None:
+                    self._last_error = str(error)
+            if answered:
+                if outage is not None:
+                    logger.info(f"{self.name} circuit closed by probe after {outage:.1f}s")
+                return
+            wait = min(wait * 2, self.max_probe_interval)
+            logger.info(f"{self.name} still unavailable; next probe in {wait:.0f}s")
@@ -0,0 +1,111 @@
+"""
+Corpus Reader - Streaming access to passage files
+A corpus is one file, a directory of .txt files, or a list of files. Passages
+are blank-line separated and are read line by line, so no file is ever held
+in memory whole
+"""
+import os
+import glob
+import logging
+from typing import Iterable, Iterator, List, Sequence, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+CorpusPath = Union[str, Sequence[str]]
+
+T = TypeVar('T')
+
+
+def corpus_files(corpus_path: CorpusPath) -> List[str]:
+    """
+    Files making up a corpus, in indexing order
+
+    Args:
+        corpus_path: A file, a directory (its *.txt files, sorted by name) or a
+            list of files/directories
+
+    Returns:
+        Paths of the corpus files
+    """
+    paths = [corpus_path] if isinstance(corpus_path, str) else list(corpus_path)
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.txt'))))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"Corpus not found: {path}")
+    if not files:
+        raise FileNotFoundError(f"No corpus files in: {', '.join(paths)}")
+    return files
+
+
+def iter_passages(corpus_path: CorpusPath, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Passages of a corpus, one at a time
+
+    A passage ends at a blank line or at the end of its file; passages never
+    span two files.
+
+    Args:
+        corpus_path: See corpus_files()
+        encoding: Text encoding of the corpus files
+
+    Yields:
+        Stripped passage text
+    """
+    for _, text in iter_sourced_passages(corpus_path, encoding):
+        yield text
+
+
+def iter_sourced_passages(corpus_path: CorpusPath, encoding: str = 'utf-8') -> Iterator[Tuple[str, str]]:
+    """
+    Like iter_passages, paired with where each passage came from
+
+    Yields:
+        ("<file name>:<passage number in file>", passage text)
+    """
+    for path in corpus_files(corpus_path):
+        name = os.path.basename(path)
+        number = 0
+        with open(path, 'r', encoding=encoding) as f:
+            lines: List[str] = []
+            for line in f:
+                if line.strip():
+                    lines.append(line)
+                elif lines:
+                    number += 1
+                    yield f"{name}:{number}", ''.join(lines).strip()
+                    lines = []
+            if lines:
+                number += 1
+                yield f"{name}:{number}", ''.join(lines).strip()
+
+
+def count_passages(corpus_path: CorpusPath, encoding: str = 'utf-8') -> int:
+    """Number of passages in a corpus (a streaming pass that keeps no text)"""
+    count = 0
+    for path in corpus_files(corpus_path):
+        with open(path, 'r', encoding=encoding) as f:
+            in_passage = False
+            for line in f:
+                if line.strip():
+                    if not in_passage:
+                        count += 1
+                    in_passage = True
+                else:
+                    in_passage = False
+    return count
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consecutive lists of up to `size` items"""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
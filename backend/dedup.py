@@ -0,0 +1,143 @@
+"""
+Dedup - Near-duplicate passage detection with MinHash + LSH
+Collections that merge several editions repeat passages with only
+whitespace, punctuation or small wording differences; those copies would
+otherwise crowd each other out of the top-k. Similarity is textual (word
+shingles), so different translations of the same verse are kept apart
+"""
+import re
+import zlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+
+# Odd 64-bit multiplier for hashing a band of signature rows to one bucket key
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _shingles(text: str, size: int) -> np.ndarray:
+    """crc32 hashes of the word n-grams of a text (case and punctuation ignored)"""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    n = min(size, len(words))
+    grams = {' '.join(words[i:i + n]) for i in range(len(words) - n + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) splitting a signature for LSH
+
+    Picks the most selective split whose S-curve midpoint (1/b)^(1/r) is
+    still at or below the threshold, so true duplicates are not missed;
+    candidates are then verified against the threshold exactly.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Streaming near-duplicate detector
+
+    Each text gets a MinHash signature over its word shingles
+    (multiply-shift hashing, vectorized with numpy); LSH buckets turn the
+    signature bands into candidates, and a candidate counts as a duplicate
+    when the fraction of matching signature slots - an estimate of shingle
+    Jaccard similarity - reaches the threshold. Only signatures are kept
+    (num_perm * 4 bytes per text), never the texts themselves.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at which texts are duplicates
+            num_perm: MinHash signature length
+            shingle_size: Words per shingle
+            seed: Hash-family seed (fixed, so builds are reproducible)
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("dedup threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = int(num_perm)
+        self.shingle_size = int(shingle_size)
+        self.bands, self.rows = lsh_bands(self.num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 62, size=(self.num_perm, 1), dtype=np.int64).astype(np.uint64) * 2 + 1
+        self._b = rng.randint(0, 2 ** 62, size=(self.num_perm, 1), dtype=np.int64).astype(np.uint64)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature (uint32, num_perm slots), or None for text without words"""
+        shingles = _shingles(text, self.shingle_size)
+        if not len(shingles):
+            return None
+        # Multiply-shift hashing: the high 32 bits of a*x + b (mod 2^64) per permutation
+        with np.errstate(over='ignore'):
+            hashed = (self._a * shingles[None, :] + self._b) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def find(self, text: str) -> Optional[Tuple[int, float]]:
+        """(key, estimated similarity) of the closest registered duplicate, or None"""
+        signature = self.signature(text)
+        return None if signature is None else self._match(signature)
+
+    def add_or_match(self, key: int, text: str) -> Optional[Tuple[int, float]]:
+        """
+        Register a text unless it duplicates one already registered
+
+        Args:
+            key: Caller's id for the text
+            text: Passage text
+
+        Returns:
+            (canonical key, similarity) when the text is a duplicate, else None
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        match = self._match(signature)
+        if match is not None:
+            self.duplicates += 1
+            return match
+        self._signatures[key] = signature
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            bucket.setdefault(band, []).append(key)
+        return None
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        bands = signature.astype(np.uint64).reshape(self.bands, self.rows)
+        with np.errstate(over='ignore'):
+            mixed = np.zeros(self.bands, dtype=np.uint64)
+            for column in range(self.rows):
+                mixed = mixed * _BAND_MIX + bands[:, column]
+        return mixed.tolist()
+
+    def _match(self, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        candidates = set()
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            candidates.update(bucket.get(band, ()))
+        best: Optional[Tuple[int, float]] = None
+        # Earliest key wins ties, so the first occurrence stays canonical
+        for key in sorted(candidates):
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
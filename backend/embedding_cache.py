@@ -0,0 +1,123 @@
+"""
+Embedding Cache - Content-addressed on-disk cache of passage embeddings
+Keyed by (model name, SHA-256 of the normalized passage text) so index
+rebuilds only encode passages that actually changed
+"""
+import os
+import re
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_passage(text: str) -> str:
+    """Collapse whitespace so formatting-only edits still hit the cache"""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def passage_key(text: str) -> str:
+    """SHA-256 of the normalized passage text"""
+    return hashlib.sha256(normalize_passage(text).encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed store of float32 embedding vectors
+
+    A single SQLite file keeps hundreds of thousands of vectors without the
+    per-file overhead of one .npy per passage, and is safe to read from the
+    background build thread and request handlers alike.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Fetch cached vectors
+
+        Args:
+            model: Embedding model name
+            keys: Passage keys (see passage_key)
+
+        Returns:
+            Dict of key -> float32 vector for the keys that were cached
+        """
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        # Stay well under SQLite's bound-parameter limit
+        step = 500
+        with self._lock:
+            for start in range(0, len(unique), step):
+                chunk = unique[start:start + step]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+        return found
+
+    def put_many(self, model: str, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        Store vectors (row i belongs to keys[i])
+
+        Args:
+            model: Embedding model name
+            keys: Passage keys
+            vectors: float32 matrix, one row per key
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = [
+            (model, key, int(vec.shape[0]), vec.tobytes())
+            for key, vec in zip(keys, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        """Number of cached vectors (optionally for one model)"""
+        with self._lock:
+            if model is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,211 @@
+"""
+Encoder Service - Dynamic micro-batching of concurrent query encodes and searches
+Requests that arrive within a few milliseconds of each other are encoded with
+one SentenceTransformer call and searched with one FAISS call, then the
+results are fanned back out to the waiting callers
+"""
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    """One caller's query, optionally with a search to run after encoding"""
+
+    __slots__ = ('query', 'vector', 'index', 'k', 'params', 'group_key', 'future')
+
+    def __init__(
+        self,
+        query: str,
+        vector: Optional[np.ndarray],
+        index: Any,
+        k: int,
+        params: Any,
+        group_key: Optional[Hashable]
+    ):
+        self.query = query
+        self.vector = vector
+        self.index = index
+        self.k = k
+        self.params = params
+        self.group_key = group_key
+        self.future: Future = Future()
+
+
+class MicroBatchEncoder:
+    """
+    Collects concurrent requests for up to `max_wait_ms` (or `max_batch`
+    requests) on a single worker thread
+
+    Stage 1 encodes every request that has no vector yet in one batch.
+    Stage 2 stacks the vectors of requests that share an index and search
+    parameters (`group_key`) and runs a single `index.search` for them at
+    the largest k requested; requests with a per-request IDSelector pass
+    group_key=None and are searched individually.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch: int = 32,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Args:
+            encode_fn: Texts -> normalized float32 matrix (one row per text)
+            max_batch: Most requests handled per batch
+            max_wait_ms: How long the first request of a batch waits for company
+        """
+        self.encode_fn = encode_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: 'queue.Queue[Optional[_Request]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+
+    def encode(self, query: str) -> np.ndarray:
+        """Normalized query embedding, shape (1, d), encoded alongside concurrent queries"""
+        vector, _, _ = self._submit(_Request(query, None, None, 0, None, None))
+        return vector
+
+    def search(
+        self,
+        query: str,
+        index: Any,
+        k: int,
+        params: Any = None,
+        group_key: Optional[Hashable] = None,
+        vector: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Encode (unless `vector` is given) and search, batched with concurrent callers
+
+        Args:
+            query: Query text
+            index: FAISS index to search
+            k: Results wanted
+            params: FAISS SearchParameters for this request
+            group_key: Requests with equal keys on the same index share one search
+                call (None = search alone, e.g. when params carry an IDSelector)
+            vector: Precomputed normalized embedding, shape (1, d)
+
+        Returns:
+            (query vector (1, d), distances (1, k), ids (1, k))
+        """
+        return self._submit(_Request(query, vector, index, k, params, group_key))
+
+    def close(self) -> None:
+        """Stop the worker after the requests already queued"""
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters"""
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _submit(self, request: _Request) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._closed:
+            raise RuntimeError("Encoder service is closed")
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._process(batch)
+                    return
+                batch.append(request)
+            self._process(batch)
+
+    def _process(self, batch: List[_Request]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        try:
+            self._encode_batch(batch)
+        except Exception as e:
+            logger.error(f"Batched encode failed: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        groups: Dict[Hashable, List[_Request]] = {}
+        for request in batch:
+            if request.index is None:
+                request.future.set_result((request.vector, None, None))
+            elif request.group_key is None:
+                self._search_group([request])
+            else:
+                groups.setdefault((id(request.index), request.group_key), []).append(request)
+        for group in groups.values():
+            self._search_group(group)
+
+    def _encode_batch(self, batch: List[_Request]) -> None:
+        pending = [r for r in batch if r.vector is None]
+        if not pending:
+            return
+        # Identical concurrent questions are encoded once
+        texts = list(dict.fromkeys(r.query for r in pending))
+        vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+        rows = {text: row for row, text in enumerate(texts)}
+        for request in pending:
+            request.vector = vectors[rows[request.query]:rows[request.query] + 1]
+
+    @staticmethod
+    def _search_group(group: List[_Request]) -> None:
+        try:
+            k = max(r.k for r in group)
+            queries = np.ascontiguousarray(np.vstack([r.vector for r in group]), dtype=np.float32)
+            distances, ids = group[0].index.search(queries, k, params=group[0].params)
+        except Exception as e:
+            logger.error(f"Batched search failed: {e}")
+            for request in group:
+                request.future.set_exception(e)
+            return
+        for row, request in enumerate(group):
+            request.future.set_result((
+                request.vector,
+                distances[row:row + 1, :request.k],
+                ids[row:row + 1, :request.k],
+            ))
@@ -0,0 +1,193 @@
+"""
+Query Encoders - Pluggable backends for turning questions into embeddings
+'fp32' is the stock SentenceTransformer; 'int8' applies torch dynamic
+quantization to its Linear layers for faster CPU inference. Passages are
+always encoded in fp32, so switching the query backend never invalidates
+the index or the embedding cache.
+
+Compare backends against fp32 (latency and top-k overlap) with:
+    python encoders.py --backends fp32 int8 --max-seq-length 128
+"""
+import io
+import os
+import copy
+import json
+import time
+import logging
+import argparse
+import contextlib
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _load_fp32(base_model: Any) -> Any:
+    return base_model
+
+
+def _load_int8(base_model: Any) -> Any:
+    import torch
+
+    # Dynamic quantization is CPU-only; quantize a copy so passage encoding stays fp32
+    model = copy.deepcopy(base_model).to('cpu')
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+# backend name -> loader(base fp32 SentenceTransformer) -> model with .encode()
+ENCODER_BACKENDS: Dict[str, Callable[[Any], Any]] = {
+    'fp32': _load_fp32,
+    'int8': _load_int8,
+}
+
+
+def register_encoder_backend(name: str, loader: Callable[[Any], Any]) -> None:
+    """Add a query encoder backend (e.g. an ONNX Runtime session wrapper)"""
+    ENCODER_BACKENDS[name.lower()] = loader
+
+
+def load_query_encoder(backend: str, base_model: Any, max_seq_length: Optional[int] = None) -> Any:
+    """
+    Query encoder for a backend
+
+    Args:
+        backend: Name in ENCODER_BACKENDS ('fp32', 'int8', ...)
+        base_model: The engine's fp32 SentenceTransformer
+        max_seq_length: Token limit for queries (None keeps the model's)
+
+    Returns:
+        Model exposing SentenceTransformer.encode
+    """
+    backend = backend.lower()
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Choose from {', '.join(ENCODER_BACKENDS)}")
+
+    model = ENCODER_BACKENDS[backend](base_model)
+    if max_seq_length and max_seq_length != getattr(model, 'max_seq_length', None):
+        if model is base_model:
+            # Don't truncate passages along with queries
+            model = copy.deepcopy(base_model)
+        model.max_seq_length = max_seq_length
+    logger.info(f"Query encoder: {backend} (max_seq_length={getattr(model, 'max_seq_length', None)})")
+    return model
+
+
+def _encode_normalized(model: Any, texts: Sequence[str]) -> np.ndarray:
+    vectors = np.asarray(model.encode(list(texts), convert_to_numpy=True), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def compare_encoders(
+    engine: Any,
+    queries: Sequence[str],
+    backends: Sequence[str] = ('fp32', 'int8'),
+    max_seq_length: Optional[int] = None,
+    top_k: int = 5,
+    repeats: int = 3
+) -> Dict[str, Any]:
+    """
+    Latency and retrieval agreement of query backends relative to fp32
+
+    Each query is encoded one at a time (as in serving) `repeats` times;
+    retrieval overlap is |top_k(backend) & top_k(fp32)| / top_k on the
+    engine's live index.
+
+    Args:
+        engine: BhagavadGitaRAGEngine with an index
+        queries: Sample questions
+        backends: Backends to measure
+        max_seq_length: Query token limit applied to every backend
+        top_k: Results compared per query
+        repeats: Timed passes over the queries
+
+    Returns:
+        {'queries', 'top_k', 'backends': {name: latency/overlap stats}}
+    """
+    engine.ensure_index()
+    snapshot = engine.snapshot
+    baseline = _encode_normalized(engine.embeddings, queries)
+    _, baseline_ids = snapshot.index.search(baseline, top_k)
+
+    report: Dict[str, Any] = {"queries": len(queries), "top_k": top_k, "backends": {}}
+    for backend in backends:
+        model = load_query_encoder(backend, engine.embeddings, max_seq_length)
+        _encode_normalized(model, queries[:1])  # warm-up
+
+        timings: List[float] = []
+        for _ in range(repeats):
+            for query in queries:
+                start = time.perf_counter()
+                model.encode([query], convert_to_numpy=True)
+                timings.append((time.perf_counter() - start) * 1000.0)
+
+        vectors = _encode_normalized(model, queries)
+        _, ids = snapshot.index.search(vectors, top_k)
+        overlap = [
+            len(set(row[row >= 0]) & set(base[base >= 0])) / top_k
+            for row, base in zip(ids, baseline_ids)
+        ]
+        report["backends"][backend] = {
+            "latency_ms_mean": round(float(np.mean(timings)), 3),
+            "latency_ms_p50": round(float(np.percentile(timings, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(timings, 95)), 3),
+            "overlap_at_k": round(float(np.mean(overlap)), 4),
+            "exact_top1": round(float(np.mean(ids[:, 0] == baseline_ids[:, 0])), 4),
+            "cosine_to_fp32": round(float(np.mean(np.sum(vectors * baseline, axis=1))), 4),
+        }
+    return report
+
+
+def _sample_queries() -> List[str]:
+    """The *_EXAMPLE questions from PRETRAINED_TEST_EXAMPLES"""
+    # The examples module prints its docstring on import; keep stdout clean for the JSON report
+    with contextlib.redirect_stdout(io.StringIO()):
+        import PRETRAINED_TEST_EXAMPLES as examples
+    return [v for k, v in vars(examples).items() if k.endswith('_EXAMPLE') and isinstance(v, str)]
+
+
+def main() -> None:
+    from rag_engine import BhagavadGitaRAGEngine
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Compare query encoder backends against fp32")
+    parser.add_argument('--backends', nargs='+', default=['fp32', 'int8'])
+    parser.add_argument('--max-seq-length', type=int, default=None)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--queries-file', help="One question per line (default: PRETRAINED_TEST_EXAMPLES)")
+    parser.add_argument('--corpus', default=os.path.join(backend_dir, "data", "corpus", "geetha_verses.txt"))
+    parser.add_argument('--index', default=os.path.join(backend_dir, "data", "faiss_index.faiss"),
+                        help="Persisted index to read (never written)")
+    args = parser.parse_args()
+
+    if args.queries_file:
+        with open(args.queries_file, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = _sample_queries()
+
+    def make_engine(index_path: Optional[str]) -> 'BhagavadGitaRAGEngine':
+        return BhagavadGitaRAGEngine(
+            corpus_path=args.corpus,
+            gemini_api_key=None,
+            use_gemini=False,
+            index_path=index_path,
+            encoder_max_wait_ms=0
+        )
+
+    # The server's persisted index is only ever read: on a miss the benchmark builds
+    # in memory, since publishing would move the server's CURRENT snapshot
+    engine = make_engine(args.index)
+    if not engine.load_index():
+        engine = make_engine(None)
+        engine.build_embeddings_index()
+
+    report = compare_encoders(engine, queries, args.backends, args.max_seq_length, args.top_k, args.repeats)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
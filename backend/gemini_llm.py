@@ -6,9 +6,22 @@ import os
 import logging
 from typing import Optional, Dict, Any
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+# Errors that mean Gemini is unreachable or overloaded and count toward opening the
+# circuit. Anything else (bad request, blocked prompt, invalid key) is an answer from
+# a working service and is raised to the caller without touching the breaker
+OUTAGE_ERRORS = (
+    google_exceptions.ServerError,        # 5xx, including deadline exceeded
+    google_exceptions.TooManyRequests,    # 429 / resource exhausted
+    google_exceptions.RetryError,         # the client's retries ran out
+    OSError,                              # connection failures and timeouts
+)
+
 
 class GeminiLLMClient:
     """Client for interacting with Google Gemini API"""
@@ -17,7 +30,9 @@ class GeminiLLMClient:
         self,
         model_name: str = "gemini-2.0-flash",
         api_key: str = None,
-        timeout: int = 60
+        timeout: int = 60,
+        failure_threshold: int = 3,
+        probe_interval: float = 10.0
     ):
         """
         Initialize Gemini LLM Client
@@ -26,6 +41,8 @@ class GeminiLLMClient:
             model_name: Name of the Gemini model (e.g., 'gemini-pro', 'gemini-1.5-pro')
             api_key: Google Gemini API key
             timeout: Request timeout in seconds (not used for Gemini but kept for compatibility)
+            failure_threshold: Consecutive failed calls before Gemini is reported unavailable
+            probe_interval: First wait (seconds) between background probes while unavailable
         """
         self.model_name = model_name
         self.api_key = api_key or os.environ.get('GEMINI_API_KEY')
@@ -72,9 +89,42 @@ class GeminiLLMClient:
             except Exception as e2:
                 logger.error(f"Failed to find any working Gemini model: {e2}")
                 raise
+        
+        # Availability comes from real calls; only an open circuit sends probe requests
+        self.breaker = CircuitBreaker(
+            self._probe,
+            name="gemini",
+            failure_threshold=failure_threshold,
+            probe_interval=probe_interval
+        )
     
     def is_available(self) -> bool:
-        """Check if Gemini API is available"""
+        """Whether recent Gemini calls succeeded (cached; makes no request)"""
+        return self.breaker.available
+    
+    def check(self) -> bool:
+        """Send a test request now; outages and successes go to the circuit breaker"""
+        try:
+            available = self._probe()
+        except OUTAGE_ERRORS as e:
+            self.breaker.record_failure(e)
+            return False
+        except Exception:
+            return False
+        if available:
+            self.breaker.record_success()
+        return available
+    
+    def breaker_stats(self) -> Dict[str, Any]:
+        return self.breaker.stats()
+    
+    def _probe(self) -> bool:
+        """
+        Send a test request, switching to a listed model if the current one fails
+        
+        Raises the test request's error when no listed model answers either, so
+        callers can tell an outage from a refused request.
+        """
         try:
             # Test with a simple request
             test_response = self.model.generate_content("Hello", stream=False)
@@ -99,7 +149,7 @@ class GeminiLLMClient:
                         return True
             except Exception as e2:
                 logger.error(f"Failed to list or switch models: {e2}")
-            return False
+            raise
     
     def list_models(self) -> list:
         """List available models (Gemini has limited public models)"""
@@ -153,11 +203,7 @@ class GeminiLLMClient:
             )
             
             # Generate response
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config,
-                stream=False
-            )
+            response = self._generate_content(prompt, generation_config)
             
             if response and response.text:
                 return response.text.strip()
@@ -196,11 +242,7 @@ class GeminiLLMClient:
                 top_p=top_p
             )
             
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config,
-                stream=False
-            )
+            response = self._generate_content(prompt, generation_config)
             
             if response and response.text:
                 return response.text.strip()
@@ -210,6 +252,20 @@ class GeminiLLMClient:
             logger.error(f"Chat error: {e}")
             raise
     
+    def _generate_content(self, prompt: str, generation_config: Any) -> Any:
+        """Call the model and report outages and successes to the circuit breaker"""
+        try:
+            response = self.model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=False
+            )
+        except OUTAGE_ERRORS as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return response
+    
     def _format_messages_to_prompt(self, messages: list) -> str:
         """Convert message list to prompt format"""
         prompt_parts = []
@@ -226,12 +282,13 @@ _gemini_client: Optional[GeminiLLMClient] = None
 
 def get_gemini_client(
     model_name: str = "gemini-2.0-flash",
-    api_key: str = None
+    api_key: str = None,
+    **kwargs: Any
 ) -> GeminiLLMClient:
-    """Get or create Gemini client"""
+    """Get or create Gemini client (extra keyword arguments only apply on creation)"""
     global _gemini_client
     if _gemini_client is None:
-        _gemini_client = GeminiLLMClient(model_name=model_name, api_key=api_key)
+        _gemini_client = GeminiLLMClient(model_name=model_name, api_key=api_key, **kwargs)
     return _gemini_client
 
 
@@ -240,7 +297,7 @@ def test_gemini_connection(api_key: str = None) -> Dict[str, Any]:
     try:
         client = get_gemini_client(api_key=api_key)
         return {
-            "available": client.is_available(),
+            "available": client.check(),
             "model": client.model_name,
             "status": "Connected to Gemini API"
         }
@@ -0,0 +1,659 @@
+"""
+Index Store - Versioned, immutable snapshots of the FAISS index
+A full snapshot (index + embedding matrix + passage store + parent passages +
+BM25 index + manifest) lives in its own directory next to FAISS_INDEX_PATH;
+incremental edits are appended to a journal as deltas on top of one, so an
+edit writes only what it changed. A CURRENT pointer file names the live
+version. Snapshots are memory-mapped back at startup so the corpus is not
+re-encoded, and older versions can be rolled back to
+"""
+import os
+import re
+import json
+import time
+import base64
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from corpus_reader import CorpusPath, corpus_files
+from lexical_index import BM25Index
+from passage_filters import PassageFilter, metadata_columns
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 8
+
+_VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+def corpus_fingerprint(corpus_path: CorpusPath, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of the corpus contents, read in fixed-size chunks
+
+    Args:
+        corpus_path: Corpus file, directory or list of files (see corpus_reader)
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest of the corpus contents (a single file hashes to the digest
+        of its bytes; multi-file corpora also hash each file name)
+    """
+    files = corpus_files(corpus_path)
+    digest = hashlib.sha256()
+    for path in files:
+        if len(files) > 1:
+            digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexSnapshot:
+    """
+    One immutable version of the searchable state
+
+    Readers grab the engine's current snapshot once and use only that
+    object for the whole request, so a concurrent swap can never pair an
+    index with another version's passages. Writers never mutate a snapshot
+    that has been published; they build a new one and flip the pointer.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        index: Any,
+        embeddings: np.ndarray,
+        passages: List[Dict[str, Any]],
+        manifest: Dict[str, Any],
+        lexical: Optional[BM25Index] = None,
+        parents: Optional[Dict[int, Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            version: Snapshot version name (e.g. 'v000003')
+            index: FAISS IndexIDMap2 over the passages
+            embeddings: Normalized float32 matrix, row-aligned with `passages`
+            passages: Indexed records ({'id', 'text', optional 'chapter'/'verse'/'speaker'}) in
+                row order; chunks of a split passage also carry 'parent', and passages
+                that absorbed corpus near-duplicates carry 'aliases'
+            manifest: Fingerprint and bookkeeping fields
+            lexical: BM25 index over the same passages (built if omitted)
+            parents: parent id -> full passage record, for passages indexed as chunks
+        """
+        self.version = version
+        self.index = index
+        self.embeddings = embeddings
+        self.passages = passages
+        self.manifest = manifest
+        self.ids = np.array([p["id"] for p in passages], dtype=np.int64)
+        self.id_to_row: Dict[int, int] = {p["id"]: row for row, p in enumerate(passages)}
+        self.id_to_text: Dict[int, str] = {p["id"]: p["text"] for p in passages}
+        self.next_passage_id = int(manifest.get("next_passage_id", len(passages)))
+        self.lexical = lexical if lexical is not None else BM25Index.build(passages)
+        self.parents: Dict[int, Dict[str, Any]] = parents or {}
+        # parent id -> ids of its chunks
+        self.children: Dict[int, List[int]] = {}
+        for p in passages:
+            if "parent" in p:
+                self.children.setdefault(p["parent"], []).append(p["id"])
+        # (chapter, verse) -> first row in `passages`, for O(1) reference lookups
+        self.verse_index: Dict[Tuple[int, int], int] = {}
+        for row, p in enumerate(passages):
+            if "chapter" in p and "verse" in p:
+                self.verse_index.setdefault((p["chapter"], p["verse"]), row)
+        # Row-aligned chapter/verse/speaker columns for vectorized filtering
+        self.metadata = metadata_columns(passages)
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    @property
+    def passage_count(self) -> int:
+        """Passages (not chunks) in the snapshot"""
+        return len(self.passages) - sum(len(c) for c in self.children.values()) + len(self.parents)
+
+    def has_passage(self, passage_id: int) -> bool:
+        """True for a passage id (chunk ids are internal and do not count)"""
+        if passage_id in self.parents:
+            return True
+        row = self.id_to_row.get(passage_id)
+        return row is not None and "parent" not in self.passages[row]
+
+    def record_ids(self, passage_ids: List[int]) -> List[int]:
+        """Indexed ids (the chunks, or the passage itself) behind passage ids"""
+        ids: List[int] = []
+        for pid in passage_ids:
+            ids.extend(self.children.get(pid, [pid]))
+        return ids
+
+    def parent_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Full passage a record belongs to (the record itself when unchunked)"""
+        parent = record.get("parent")
+        return self.parents[parent] if parent is not None else record
+
+    def filter_ids(self, passage_filter: PassageFilter) -> np.ndarray:
+        """Passage ids matching a metadata filter"""
+        return self.ids[passage_filter.mask(self.metadata)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Manifest fields useful to an operator"""
+        return {
+            "version": self.version,
+            "count": len(self),
+            "passage_count": self.passage_count,
+            "created_at": self.manifest.get("created_at"),
+            "reason": self.manifest.get("reason"),
+            "index_type": self.manifest.get("index_type"),
+            "model_name": self.manifest.get("model_name"),
+            "build": self.manifest.get("build"),
+        }
+
+
+class SnapshotDelta(NamedTuple):
+    """
+    One incremental edit (add, remove or update) on top of a snapshot
+
+    An indexed record whose id is in `removed_ids` is replaced in place by
+    the record in `records` with the same id, or dropped when there is none;
+    the other records are appended in order. Live edits and journal replay
+    both go through apply_deltas, so they produce the same row order.
+    """
+    reason: str
+    records: Tuple[Dict[str, Any], ...] = ()         # indexed records added or replacing a removed id
+    embeddings: Optional[np.ndarray] = None          # one normalized row per record
+    removed_ids: Tuple[int, ...] = ()                # indexed record ids dropped or replaced
+    parents: Tuple[Dict[str, Any], ...] = ()         # parent passages added or replaced
+    removed_parents: Tuple[int, ...] = ()            # parent passage ids dropped
+    next_passage_id: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form; embeddings travel as base64 float32"""
+        vectors = None
+        if self.records:
+            matrix = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+            vectors = {"dim": int(matrix.shape[1]), "data": base64.b64encode(matrix.tobytes()).decode('ascii')}
+        return {
+            "reason": self.reason,
+            "records": list(self.records),
+            "embeddings": vectors,
+            "removed_ids": list(self.removed_ids),
+            "parents": list(self.parents),
+            "removed_parents": list(self.removed_parents),
+            "next_passage_id": self.next_passage_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SnapshotDelta':
+        vectors = data.get("embeddings")
+        embeddings = None
+        if vectors:
+            embeddings = np.frombuffer(base64.b64decode(vectors["data"]), dtype=np.float32).reshape(-1, vectors["dim"])
+        return cls(
+            data["reason"],
+            tuple(data.get("records", ())),
+            embeddings,
+            tuple(data.get("removed_ids", ())),
+            tuple(data.get("parents", ())),
+            tuple(data.get("removed_parents", ())),
+            data.get("next_passage_id")
+        )
+
+
+class AppliedDeltas(NamedTuple):
+    """A snapshot's state after a run of deltas, and how it differs from the snapshot"""
+    passages: List[Dict[str, Any]]
+    embeddings: np.ndarray
+    parents: Dict[int, Dict[str, Any]]
+    next_passage_id: int
+    added: List[Dict[str, Any]]                      # records the snapshot does not have, in row order
+    added_embeddings: np.ndarray
+    removed: List[Dict[str, Any]]                    # snapshot records that are gone or were replaced
+
+
+def apply_deltas(snapshot: IndexSnapshot, deltas: Iterable[SnapshotDelta]) -> AppliedDeltas:
+    """
+    Passages, embeddings and parents of a snapshot after a run of deltas
+
+    Edits are applied by id and the matrix is assembled once at the end, so
+    replaying a journal costs one pass over the snapshot however many
+    deltas it holds.
+    """
+    # id -> (record, row in the snapshot or -1, embedding of a new record)
+    rows: Dict[int, Tuple[Dict[str, Any], int, Optional[np.ndarray]]] = {
+        p["id"]: (p, row, None) for row, p in enumerate(snapshot.passages)
+    }
+    parents = dict(snapshot.parents)
+    next_passage_id = snapshot.next_passage_id
+    for delta in deltas:
+        vectors = delta.embeddings if delta.records else ()
+        incoming = {r["id"]: (r, -1, v) for r, v in zip(delta.records, vectors)}
+        for record_id in delta.removed_ids:
+            if record_id in incoming:
+                rows[record_id] = incoming.pop(record_id)
+            else:
+                rows.pop(record_id, None)
+        rows.update(incoming)
+        for pid in delta.removed_parents:
+            parents.pop(pid, None)
+        parents.update((p["id"], p) for p in delta.parents)
+        if delta.next_passage_id is not None:
+            next_passage_id = delta.next_passage_id
+
+    entries = list(rows.values())
+    passages = [record for record, _, _ in entries]
+    base_rows = np.fromiter((row for _, row, _ in entries), dtype=np.int64, count=len(entries))
+    is_new = base_rows < 0
+    embeddings = np.empty((len(entries), snapshot.embeddings.shape[1]), dtype=np.float32)
+    embeddings[~is_new] = snapshot.embeddings[base_rows[~is_new]]
+    added_at = np.flatnonzero(is_new)
+    added = [passages[position] for position in added_at]
+    if len(added_at):
+        embeddings[added_at] = np.vstack([entries[position][2] for position in added_at])
+    present = np.zeros(len(snapshot.passages), dtype=bool)
+    present[base_rows[~is_new]] = True
+    removed = [p for p, keep in zip(snapshot.passages, present) if not keep]
+    return AppliedDeltas(
+        passages, embeddings, parents, next_passage_id,
+        added, embeddings[added_at], removed
+    )
+
+
+class EmbeddingSpool:
+    """
+    Append-only float32 matrix in a temporary file, for index builds
+
+    Batches are written to disk as they are encoded, so a build keeps one
+    batch of embeddings in memory however large the corpus is; finish()
+    maps the file back read-only as the (rows x dim) matrix. The file is
+    anonymous (deleted on close, or at once on POSIX) and lives as long as
+    the returned mapping.
+    """
+
+    def __init__(self, dim: int, directory: Optional[str] = None):
+        """
+        Args:
+            dim: Embedding dimension
+            directory: Where to create the file (the system temp dir by default)
+        """
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.rows = 0
+        self._file = tempfile.TemporaryFile(prefix=".build-", suffix=".f32", dir=directory)
+
+    def __enter__(self) -> 'EmbeddingSpool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+
+    def append(self, embeddings: np.ndarray) -> None:
+        np.ascontiguousarray(embeddings, dtype=np.float32).tofile(self._file)
+        self.rows += len(embeddings)
+
+    def finish(self) -> np.ndarray:
+        """Read-only memory map of every row appended so far"""
+        self._file.flush()
+        return np.memmap(self._file, dtype=np.float32, mode='r', shape=(self.rows, self.dim))
+
+
+def format_version(number: int) -> str:
+    return f"v{number:06d}"
+
+
+def parse_version(version: str) -> Optional[int]:
+    match = _VERSION_PATTERN.match(version or "")
+    return int(match.group(1)) if match else None
+
+
+def _atomic_write_text(path: str, text: str) -> None:
+    """Write to a temp file next to `path` and rename it into place"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _mmap_flags(faiss_module: Any) -> int:
+    """Best available read-only mmap flags for this faiss build"""
+    flag = getattr(faiss_module, 'IO_FLAG_MMAP_IFC', None)
+    if flag is None:
+        flag = faiss_module.IO_FLAG_MMAP
+    return flag | faiss_module.IO_FLAG_READ_ONLY
+
+
+class SnapshotStore:
+    """
+    On-disk snapshot directories, the delta journal and the CURRENT pointer
+
+    A version is either a full snapshot directory or a journal line holding
+    a SnapshotDelta on top of its parent version; resolve() walks a journaled
+    version back to the full snapshot it is replayed from. The journal is
+    append-only between prunes, which rewrite it without the versions they
+    drop.
+    """
+
+    INDEX_FILE = "index.faiss"
+    EMBEDDINGS_FILE = "embeddings.npy"
+    PASSAGES_FILE = "passages.json"
+    LEXICAL_FILE = "bm25.json"
+    PARENTS_FILE = "parents.json"
+    MANIFEST_FILE = "manifest.json"
+    CURRENT_FILE = "CURRENT"
+    JOURNAL_FILE = "journal.jsonl"
+
+    def __init__(self, index_path: str, keep: int = 5):
+        """
+        Args:
+            index_path: Configured FAISS index path; snapshots go in '<stem>_snapshots/'
+            keep: Number of snapshots retained on disk (the current one is never pruned)
+        """
+        stem, _ = os.path.splitext(index_path)
+        self.root = f"{stem}_snapshots"
+        self.keep = max(1, keep)
+        # Guards the journal (and its in-memory copy) against concurrent appends and prunes
+        self._lock = threading.RLock()
+        self._journal: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.root, self.JOURNAL_FILE)
+
+    def is_full(self, version: str) -> bool:
+        """True when `version` is stored as a full snapshot directory"""
+        return os.path.exists(os.path.join(self._dir(version), self.MANIFEST_FILE))
+
+    def full_versions(self) -> List[str]:
+        """Versions stored as full snapshot directories, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = [name for name in os.listdir(self.root) if parse_version(name) is not None and self.is_full(name)]
+        return sorted(found, key=parse_version)
+
+    def versions(self) -> List[str]:
+        """Snapshot versions on disk (full or journaled), oldest first"""
+        found = set(self.full_versions())
+        with self._lock:
+            found.update(self._entries())
+        return sorted(found, key=parse_version)
+
+    def next_version(self, floor: int = 0) -> str:
+        """Next unused version number (never below `floor`)"""
+        numbers = [parse_version(v) for v in self.versions()]
+        return format_version(max(numbers + [floor]) + 1)
+
+    def current_version(self) -> Optional[str]:
+        path = os.path.join(self.root, self.CURRENT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+        return version if parse_version(version) is not None else None
+
+    def set_current(self, version: str) -> None:
+        """Point CURRENT at `version` with a single atomic rename"""
+        os.makedirs(self.root, exist_ok=True)
+        _atomic_write_text(os.path.join(self.root, self.CURRENT_FILE), version)
+
+    def read_manifest(self, version: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self._dir(version), self.MANIFEST_FILE)
+        if not os.path.exists(path):
+            with self._lock:
+                entry = self._entries().get(version)
+            if entry is not None:
+                return entry["manifest"]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read snapshot manifest {path}: {e}")
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Manifests of all snapshots on disk, oldest first"""
+        current = self.current_version()
+        listed = []
+        for version in self.versions():
+            manifest = self.read_manifest(version) or {}
+            listed.append({
+                "version": version,
+                "count": manifest.get("count"),
+                "passage_count": manifest.get("passage_count"),
+                "created_at": manifest.get("created_at"),
+                "reason": manifest.get("reason"),
+                "index_type": manifest.get("index_type"),
+                "model_name": manifest.get("model_name"),
+                "build": manifest.get("build"),
+                "current": version == current,
+            })
+        return listed
+
+    def append_delta(self, version: str, parent: str, manifest: Dict[str, Any], delta: SnapshotDelta) -> None:
+        """
+        Record `version` as `delta` on top of `parent` (one appended journal line)
+
+        Nothing already on disk is rewritten, so the cost is that of the
+        edit, not of the corpus.
+        """
+        entry = {
+            "version": version,
+            "parent": parent,
+            "manifest": {"manifest_version": MANIFEST_VERSION, **manifest},
+            "delta": delta.to_dict(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            entries = self._entries()
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._journal_path(), 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            entries[version] = entry
+
+    def resolve(self, version: str) -> Optional[Tuple[str, List[Tuple[str, Dict[str, Any], SnapshotDelta]]]]:
+        """
+        Full snapshot a version is replayed from, and the deltas leading to it
+
+        Returns:
+            (base version, [(version, manifest, delta), ...] oldest first), or
+            None when the version or a link of its chain is missing
+        """
+        chain = []
+        with self._lock:
+            entries = self._entries()
+            while not self.is_full(version):
+                entry = entries.get(version)
+                if entry is None:
+                    return None
+                chain.append(entry)
+                version = entry["parent"]
+        return version, [
+            (e["version"], e["manifest"], SnapshotDelta.from_dict(e["delta"])) for e in reversed(chain)
+        ]
+
+    def delta_depth(self, version: str) -> int:
+        """Journaled deltas between `version` and the full snapshot it is replayed from"""
+        depth = 0
+        with self._lock:
+            entries = self._entries()
+            while version in entries and not self.is_full(version):
+                depth += 1
+                version = entries[version]["parent"]
+        return depth
+
+    def save(self, faiss_module: Any, snapshot: IndexSnapshot) -> None:
+        """
+        Write a snapshot into its own directory
+
+        Files go to a temp directory that is renamed into place, so a crash
+        mid-save never leaves a half-written version behind.
+        """
+        final_dir = self._dir(snapshot.version)
+        tmp_dir = os.path.join(self.root, f".tmp-{snapshot.version}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        faiss_module.write_index(snapshot.index, os.path.join(tmp_dir, self.INDEX_FILE))
+        with open(os.path.join(tmp_dir, self.EMBEDDINGS_FILE), 'wb') as f:
+            np.save(f, np.ascontiguousarray(snapshot.embeddings, dtype=np.float32))
+        with open(os.path.join(tmp_dir, self.PASSAGES_FILE), 'w', encoding='utf-8') as f:
+            json.dump(snapshot.passages, f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, self.LEXICAL_FILE), 'w', encoding='utf-8') as f:
+            json.dump(snapshot.lexical.to_dict(), f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, self.PARENTS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(list(snapshot.parents.values()), f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, self.MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"manifest_version": MANIFEST_VERSION, **snapshot.manifest}, f, indent=2)
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+        logger.info(f"Saved index snapshot {snapshot.version} ({len(snapshot)} passages)")
+
+    def load(
+        self,
+        faiss_module: Any,
+        version: str,
+        expected: Optional[Dict[str, Any]] = None
+    ) -> Optional[IndexSnapshot]:
+        """
+        Memory-map a snapshot if its manifest matches `expected`
+
+        Args:
+            faiss_module: Imported faiss module
+            version: Snapshot version to load
+            expected: Fingerprint fields that must match the stored manifest
+
+        Returns:
+            IndexSnapshot, or None when missing or stale
+        """
+        directory = self._dir(version)
+        if parse_version(version) is None or not os.path.isdir(directory):
+            return None
+        manifest = self.read_manifest(version)
+        files = [self.INDEX_FILE, self.EMBEDDINGS_FILE, self.PASSAGES_FILE, self.LEXICAL_FILE, self.PARENTS_FILE]
+        if manifest is None or not all(os.path.exists(os.path.join(directory, f)) for f in files):
+            return None
+        if manifest.get("manifest_version") != MANIFEST_VERSION:
+            logger.info(f"Snapshot {version} uses an older layout; rebuild required")
+            return None
+
+        for key, value in (expected or {}).items():
+            if manifest.get(key) != value:
+                logger.info(f"Snapshot {version} is stale ({key} changed); rebuild required")
+                return None
+
+        index_file = os.path.join(directory, self.INDEX_FILE)
+        try:
+            index = faiss_module.read_index(index_file, _mmap_flags(faiss_module))
+        except RuntimeError as e:
+            logger.warning(f"mmap read of {index_file} failed ({e}); reading into memory")
+            index = faiss_module.read_index(index_file)
+
+        embeddings = np.load(os.path.join(directory, self.EMBEDDINGS_FILE), mmap_mode='r')
+        with open(os.path.join(directory, self.PASSAGES_FILE), 'r', encoding='utf-8') as f:
+            passages = json.load(f)
+        with open(os.path.join(directory, self.LEXICAL_FILE), 'r', encoding='utf-8') as f:
+            lexical = BM25Index.from_dict(json.load(f))
+        with open(os.path.join(directory, self.PARENTS_FILE), 'r', encoding='utf-8') as f:
+            parents = {p["id"]: p for p in json.load(f)}
+
+        if not (index.ntotal == manifest.get("count") == embeddings.shape[0] == len(passages)):
+            logger.warning(f"Snapshot {version} index, embeddings and passages disagree on size")
+            return None
+
+        logger.info(f"Loaded index snapshot {version} with {index.ntotal} vectors")
+        return IndexSnapshot(version, index, embeddings, passages, manifest, lexical, parents)
+
+    def prune(self, reserve: int = 0) -> None:
+        """
+        Delete the oldest versions beyond `keep`, never the current one
+
+        A retained journaled version keeps every version it is replayed from.
+
+        Args:
+            reserve: Versions about to be written; pruning first for them keeps
+                a full save from ever having keep + 1 snapshots on disk
+        """
+        with self._lock:
+            current = self.current_version()
+            others = [v for v in self.versions() if v != current]
+            retained = others[max(0, len(others) - max(0, self.keep - 1 - reserve)):]
+            if current:
+                retained.append(current)
+
+            entries = self._entries()
+            needed = set()
+            for version in retained:
+                while version is not None and version not in needed:
+                    needed.add(version)
+                    entry = None if self.is_full(version) else entries.get(version)
+                    version = entry["parent"] if entry else None
+
+            for version in self.full_versions():
+                if version in needed:
+                    continue
+                try:
+                    shutil.rmtree(self._dir(version))
+                except OSError as e:
+                    # e.g. still memory-mapped on Windows; try again next prune
+                    logger.warning(f"Could not prune snapshot {version}: {e}")
+
+            # Journal lines are dropped once unreachable or superseded by a full copy
+            live = {v: e for v, e in entries.items() if v in needed and not self.is_full(v)}
+            if len(live) < len(entries):
+                self._rewrite_journal(live)
+
+    def _entries(self) -> Dict[str, Dict[str, Any]]:
+        """Journaled versions by name, read from disk once (call with the lock held)"""
+        if self._journal is None:
+            self._journal = self._read_journal()
+        return self._journal
+
+    def _read_journal(self) -> Dict[str, Dict[str, Any]]:
+        path = self._journal_path()
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return {}
+        complete = raw[:raw.rfind(b'\n') + 1]
+        if len(complete) < len(raw):
+            # A crash mid-append left a partial line; cut it so later appends start on a fresh line
+            logger.warning(f"Dropping an incomplete entry at the end of {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(len(complete))
+        entries: Dict[str, Dict[str, Any]] = {}
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line.decode('utf-8'))
+            except ValueError as e:
+                logger.warning(f"Skipping unreadable journal entry in {path}: {e}")
+                continue
+            entries[entry["version"]] = entry
+        return entries
+
+    def _rewrite_journal(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the journal with `entries` in one rename (call with the lock held)"""
+        path = self._journal_path()
+        if entries:
+            _atomic_write_text(path, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries.values()))
+        elif os.path.exists(path):
+            os.remove(path)
+        self._journal = dict(entries)
+
+
+def new_manifest(**fields) -> Dict[str, Any]:
+    """Manifest dict stamped with a creation time"""
+    return {"created_at": time.time(), **fields}
@@ -0,0 +1,179 @@
+"""
+Lexical Index - In-process BM25 inverted index over the passage store
+Catches exact-term queries ("Kurukshetra", "Govinda", "three modes") that
+dense retrieval can miss, at a fraction of the cost of a transformer pass
+"""
+import re
+import math
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Kept deliberately small: Gita vocabulary like "self", "one", "me" carries meaning
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'what', 'which', 'with', 'does', 'do', 'say', 'says', 'about', 'how',
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords removed"""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over passage ids
+
+    Postings are stored per term as {passage_id: term_frequency}. The index is
+    treated as immutable once published with a snapshot: `updated()` returns
+    a new index that shares every posting list it did not touch.
+    """
+
+    def __init__(
+        self,
+        postings: Optional[Dict[str, Dict[int, int]]] = None,
+        doc_lengths: Optional[Dict[int, int]] = None,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        self.postings: Dict[str, Dict[int, int]] = postings or {}
+        self.doc_lengths: Dict[int, int] = doc_lengths or {}
+        self.k1 = k1
+        self.b = b
+        self._total_length = sum(self.doc_lengths.values())
+
+    @classmethod
+    def build(cls, passages: Iterable[Dict[str, Any]], **kwargs) -> 'BM25Index':
+        """
+        Build from passage records
+
+        Args:
+            passages: Records with 'id' and 'text'
+
+        Returns:
+            New BM25Index
+        """
+        index = cls(**kwargs)
+        for passage in passages:
+            index._add(int(passage["id"]), passage["text"], copy_on_write=False)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self._total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def _add(self, doc_id: int, text: str, copy_on_write: bool, touched: Optional[set] = None) -> None:
+        counts = Counter(tokenize(text))
+        self.doc_lengths[doc_id] = sum(counts.values())
+        self._total_length += self.doc_lengths[doc_id]
+        for term, tf in counts.items():
+            if copy_on_write and term not in touched:
+                self.postings[term] = dict(self.postings.get(term, {}))
+                touched.add(term)
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def _remove(self, doc_id: int, text: str, touched: set) -> None:
+        for term in set(tokenize(text)):
+            if term not in self.postings:
+                continue
+            if term not in touched:
+                self.postings[term] = dict(self.postings[term])
+                touched.add(term)
+            self.postings[term].pop(doc_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+        self._total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def updated(
+        self,
+        added: Iterable[Dict[str, Any]] = (),
+        removed: Iterable[Dict[str, Any]] = ()
+    ) -> 'BM25Index':
+        """
+        New index with passages added/removed; this one is left untouched
+
+        Args:
+            added: Records ('id', 'text') to index
+            removed: Records ('id', 'text') to drop (text is needed to find postings)
+
+        Returns:
+            Updated BM25Index
+        """
+        new = BM25Index(dict(self.postings), dict(self.doc_lengths), self.k1, self.b)
+        touched: set = set()
+        for passage in removed:
+            new._remove(int(passage["id"]), passage["text"], touched)
+        for passage in added:
+            new._add(int(passage["id"]), passage["text"], copy_on_write=True, touched=touched)
+        return new
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        allowed: Optional[Set[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank passages by BM25
+
+        Args:
+            query: Query text
+            top_k: Number of results
+            allowed: Restrict scoring to these passage ids (metadata filters)
+
+        Returns:
+            (passage_id, score) pairs, best first; only passages sharing a term
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avgdl = self.avg_doc_length or 1.0
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form for snapshot persistence"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": {str(k): v for k, v in self.doc_lengths.items()},
+            "postings": {
+                term: {str(k): v for k, v in posting.items()}
+                for term, posting in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BM25Index':
+        return cls(
+            postings={
+                term: {int(k): v for k, v in posting.items()}
+                for term, posting in data["postings"].items()
+            },
+            doc_lengths={int(k): v for k, v in data["doc_lengths"].items()},
+            k1=data.get("k1", 1.5),
+            b=data.get("b", 0.75),
+        )
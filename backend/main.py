@@ -7,14 +7,20 @@ from fastapi import FastAPI, HTTPException
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 import logging
+import threading
 
 from app.rag import RAGEngine
-from app.llm import generate_answer, answer_bhagavad_gita_question, get_llm_status, is_greeting, add_krishna_says
-from app.pretrained_qa import get_pretrained_answer
-from gemini_llm import get_gemini_client, test_gemini_connection
+from app.jobs import IndexBuildJobManager
+from app.llm import answer_bhagavad_gita_question, is_fallback_answer
+from app.qa_matcher import IntentMatch
+from app.qa_store import PretrainedSet
+from app.pretrained_qa import QA_STORE
+from app.router import ROUTER
+from gemini_llm import get_gemini_client
+from answer_cache import cache_scope
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -28,11 +34,16 @@ async def lifespan(app: FastAPI):
     logger.info("GitaRAG Backend Starting with Gemini API")
     logger.info("=" * 50)
     
-    # Check Gemini connection
+    # Check Gemini connection (the one test request; afterwards real calls drive availability)
     global engine
+    client = None
     try:
-        client = get_gemini_client(api_key=GEMINI_API_KEY)
-        if client.is_available():
+        client = get_gemini_client(
+            api_key=GEMINI_API_KEY,
+            failure_threshold=GEMINI_FAILURE_THRESHOLD,
+            probe_interval=GEMINI_PROBE_SECONDS
+        )
+        if client.check():
             logger.info(f"✓ Gemini API Connected: {client.model_name}")
             logger.info(f"  Available models: {client.list_models()}")
         else:
@@ -43,9 +54,16 @@ async def lifespan(app: FastAPI):
     
     logger.info("=" * 50)
     
+    # Edits to the pretrained Q&A file go live without a restart
+    if PRETRAINED_QA_RELOAD_SECONDS > 0:
+        QA_STORE.start_watcher(PRETRAINED_QA_RELOAD_SECONDS)
+    
     yield  # Application runs here
     
     # Shutdown
+    QA_STORE.stop_watcher()
+    if client is not None:
+        client.breaker.stop()
     logger.info("GitaRAG Backend Shutting Down")
 
 # Initialize FastAPI
@@ -72,33 +90,118 @@ if not GEMINI_API_KEY:
 
 # Get absolute paths
 BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
-CORPUS_PATH = os.path.join(BACKEND_DIR, "data", "corpus", "geetha_verses.txt")
+# Corpus files and/or directories of .txt files, os.pathsep-separated
+CORPUS_PATH = os.environ.get(
+    'CORPUS_PATH', os.path.join(BACKEND_DIR, "data", "corpus", "geetha_verses.txt")
+).split(os.pathsep)
 FAISS_INDEX_PATH = os.path.join(BACKEND_DIR, "data", "faiss_index.faiss")
+EMBEDDING_CACHE_PATH = os.path.join(BACKEND_DIR, "data", "embedding_cache.sqlite")
+
+# Retrieval: dense (FAISS only), lexical (BM25 only) or hybrid (both, fused with RRF)
+RETRIEVAL_MODE = os.environ.get('RETRIEVAL_MODE', 'hybrid')
+
+# ANN backend: flat (exact), ivf, hnsw or ivfpq
+FAISS_INDEX_TYPE = os.environ.get('FAISS_INDEX_TYPE', 'flat')
+FAISS_INDEX_PARAMS = {
+    'nlist': int(os.environ['FAISS_NLIST']) if os.environ.get('FAISS_NLIST') else None,
+    'nprobe': int(os.environ.get('FAISS_NPROBE', 8)),
+    'ef_search': int(os.environ.get('FAISS_EF_SEARCH', 64)),
+}
+
+# Query-embedding LRU: entries (0 disables) and lifetime in seconds
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', 1024))
+QUERY_CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', 3600))
+
+# Semantic answer cache: near-duplicate questions reuse a generated answer
+ANSWER_CACHE_SIZE = int(os.environ.get('ANSWER_CACHE_SIZE', 512))
+ANSWER_CACHE_THRESHOLD = float(os.environ.get('ANSWER_CACHE_THRESHOLD', 0.95))
+ANSWER_CACHE_TTL = float(os.environ.get('ANSWER_CACHE_TTL', 86400))
+
+# Micro-batching of concurrent query encodes/searches (wait 0 disables it)
+ENCODER_BATCH_SIZE = int(os.environ.get('ENCODER_BATCH_SIZE', 32))
+ENCODER_MAX_WAIT_MS = float(os.environ.get('ENCODER_MAX_WAIT_MS', 2))
+
+# Query embedding backend: fp32 or int8 (dynamic quantization); compare with `python encoders.py`
+QUERY_ENCODER = os.environ.get('QUERY_ENCODER', 'fp32')
+QUERY_MAX_SEQ_LENGTH = int(os.environ['QUERY_MAX_SEQ_LENGTH']) if os.environ.get('QUERY_MAX_SEQ_LENGTH') else None
+
+# Sentence-window chunking of long passages (CHUNK_WINDOW=0 indexes passages whole)
+CHUNK_WINDOW = int(os.environ.get('CHUNK_WINDOW', 3))
+CHUNKING = {
+    'window': CHUNK_WINDOW,
+    'overlap': int(os.environ.get('CHUNK_OVERLAP', 1)),
+    'min_chars': int(os.environ.get('CHUNK_MIN_CHARS', 600)),
+} if CHUNK_WINDOW > 0 else None
+
+# Encoder processes for index builds (0 = one per CPU core)
+BUILD_WORKERS = int(os.environ.get('BUILD_WORKERS', 1))
+
+# Corpus near-duplicates (MinHash shingle similarity) are folded into aliases at build time (0 disables)
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.9))
+
+# Questions this similar (cosine) to a pretrained topic's keywords/examples get its answer (0 disables)
+PRETRAINED_INTENT_THRESHOLD = float(os.environ.get('PRETRAINED_INTENT_THRESHOLD', 0.6))
+
+# Seconds between checks of the pretrained Q&A file for edits (0 = reload only via the admin endpoint)
+PRETRAINED_QA_RELOAD_SECONDS = float(os.environ.get('PRETRAINED_QA_RELOAD_SECONDS', 5))
+
+# Consecutive failed Gemini calls before answers fall back without calling it, and the
+# first wait between background probes (doubling up to 5 minutes) until it answers again
+GEMINI_FAILURE_THRESHOLD = int(os.environ.get('GEMINI_FAILURE_THRESHOLD', 3))
+GEMINI_PROBE_SECONDS = float(os.environ.get('GEMINI_PROBE_SECONDS', 10))
 
 logger.info(f"Using corpus path: {CORPUS_PATH}")
-logger.info(f"Corpus exists: {os.path.exists(CORPUS_PATH)}")
+logger.info(f"Corpus exists: {all(os.path.exists(p) for p in CORPUS_PATH)}")
 
 # Initialize RAG Engine lazily (on first use) to avoid startup delays
 engine = None
 engine_initialized = False
+# Endpoints run on the threadpool; two first requests must not both build an engine
+_engine_lock = threading.Lock()
+
+# Index builds run on a worker thread so queries keep being served meanwhile
+build_jobs = IndexBuildJobManager()
 
 def get_rag_engine():
     """Lazy initialization of RAG engine"""
     global engine, engine_initialized
-    if not engine and not engine_initialized:
-        try:
-            logger.info("Initializing RAG Engine on first use...")
-            engine = RAGEngine(
-                corpus_path=CORPUS_PATH,
-                index_path=FAISS_INDEX_PATH,
-                gemini_api_key=GEMINI_API_KEY,
-                use_gemini=True
-            )
-            engine_initialized = True
-            logger.info("RAG Engine initialized successfully with Gemini API")
-        except Exception as e:
-            logger.warning(f"Failed to initialize RAG Engine: {e}")
-            engine_initialized = True
+    if engine_initialized:
+        return engine
+    with _engine_lock:
+        if not engine and not engine_initialized:
+            try:
+                logger.info("Initializing RAG Engine on first use...")
+                engine = RAGEngine(
+                    corpus_path=CORPUS_PATH,
+                    index_path=FAISS_INDEX_PATH,
+                    gemini_api_key=GEMINI_API_KEY,
+                    use_gemini=True,
+                    index_type=FAISS_INDEX_TYPE,
+                    index_params=FAISS_INDEX_PARAMS,
+                    embedding_cache_path=EMBEDDING_CACHE_PATH,
+                    retrieval_mode=RETRIEVAL_MODE,
+                    query_cache_size=QUERY_CACHE_SIZE,
+                    query_cache_ttl=QUERY_CACHE_TTL,
+                    answer_cache_size=ANSWER_CACHE_SIZE,
+                    answer_cache_threshold=ANSWER_CACHE_THRESHOLD,
+                    answer_cache_ttl=ANSWER_CACHE_TTL,
+                    encoder_batch_size=ENCODER_BATCH_SIZE,
+                    encoder_max_wait_ms=ENCODER_MAX_WAIT_MS,
+                    query_encoder=QUERY_ENCODER,
+                    query_max_seq_length=QUERY_MAX_SEQ_LENGTH,
+                    chunking=CHUNKING,
+                    build_workers=BUILD_WORKERS,
+                    dedup_threshold=DEDUP_THRESHOLD,
+                    intent_threshold=PRETRAINED_INTENT_THRESHOLD,
+                    build_jobs=build_jobs
+                )
+                # New Q&A versions get their topic matrix encoded before they go live
+                QA_STORE.add_preparer(engine.prepare_pretrained)
+                engine_initialized = True
+                logger.info("RAG Engine initialized successfully with Gemini API")
+            except Exception as e:
+                logger.warning(f"Failed to initialize RAG Engine: {e}")
+                engine_initialized = True
     return engine
 
 
@@ -108,6 +211,44 @@ class QueryRequest(BaseModel):
     top_k: int = 3
     temperature: float = 0.7
     max_tokens: int = 512
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
+    mode: Optional[str] = None
+    chapters: Optional[List[int]] = None
+    chapter_range: Optional[List[int]] = None
+    verse_range: Optional[List[int]] = None
+    speaker: Optional[str] = None
+    mmr_lambda: Optional[float] = None
+    min_score: Optional[float] = None
+    adaptive_k: bool = False
+    expand_parents: bool = True
+
+    def search_params(self) -> dict:
+        """Per-request ANN overrides for the RAG engine"""
+        return {'nprobe': self.nprobe, 'ef_search': self.ef_search}
+
+    def filters(self) -> Optional[dict]:
+        """Metadata filters for the RAG engine (None when unfiltered)"""
+        filters = {
+            'chapters': self.chapters,
+            'chapter_range': self.chapter_range,
+            'verse_range': self.verse_range,
+            'speaker': self.speaker,
+        }
+        return {k: v for k, v in filters.items() if v} or None
+
+    def cache_scope(self) -> str:
+        """Settings a cached answer must share with this request"""
+        return cache_scope(
+            top_k=self.top_k,
+            max_tokens=self.max_tokens,
+            mode=self.mode,
+            filters=self.filters(),
+            mmr_lambda=self.mmr_lambda,
+            min_score=self.min_score,
+            adaptive_k=self.adaptive_k,
+            expand_parents=self.expand_parents,
+        )
 
 
 class QueryResponse(BaseModel):
@@ -115,12 +256,29 @@ class QueryResponse(BaseModel):
     answer: str
     retrieved: List[str]
     passage_count: int
+    scores: List[float] = []
+    cached: bool = False
 
 
 class BuildIndexResponse(BaseModel):
     status: str
     documents_indexed: int
     message: str
+    job_id: Optional[str] = None
+
+
+class PassageRequest(BaseModel):
+    texts: List[str]
+
+
+class PassageUpdateRequest(BaseModel):
+    text: str
+
+
+class PassageResponse(BaseModel):
+    status: str
+    ids: List[int]
+    documents_indexed: int
 
 
 class LLMStatusResponse(BaseModel):
@@ -129,6 +287,7 @@ class LLMStatusResponse(BaseModel):
     llm_model: str
     available_models: List[str]
     rag_engine_ready: bool
+    llm_circuit: Optional[Dict] = None
 
 
 # Health Check Endpoint
@@ -143,33 +302,209 @@ async def health():
 
 
 # Build Index Endpoint
-@app.post('/build_index', response_model=BuildIndexResponse)
+@app.post('/build_index', response_model=BuildIndexResponse, status_code=202)
 async def build_index():
     """
-    Build FAISS index from Bhagavad Gita corpus
+    Start a background build of the FAISS index from the Bhagavad Gita corpus
+    
+    The current index keeps serving until the new one is swapped in.
+    Poll GET /build_index/{job_id} for progress.
+    
+    Returns:
+        Job id and current document count
+    """
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    
+    job = build_jobs.submit(rag_engine.build_index)
+    return BuildIndexResponse(
+        status=job.status,
+        documents_indexed=rag_engine.passage_count(),
+        message=f"Index build {job.status}; poll /build_index/{job.job_id} for progress",
+        job_id=job.job_id
+    )
+
+
+@app.get('/build_index/{job_id}')
+async def build_index_status(job_id: str):
+    """
+    Report progress of a background index build
+    
+    Args:
+        job_id: Id returned by POST /build_index
+        
+    Returns:
+        Job status, passages encoded, ETA and outcome
+    """
+    job = build_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Build job {job_id} not found")
+    return job.to_dict()
+
+
+# Incremental Passage Endpoints
+# Sync, so the encode and index write run on the threadpool instead of the event loop
+@app.post('/passages', response_model=PassageResponse)
+def add_passages(req: PassageRequest):
+    """
+    Encode and add passages to the live index (no full rebuild)
     
+    Args:
+        req: Passage texts to add
+        
     Returns:
-        Build status and document count
+        Ids assigned to the new passages
     """
     rag_engine = get_rag_engine()
     if not rag_engine:
         raise HTTPException(status_code=500, detail="RAG Engine not initialized")
     
     try:
-        count = rag_engine.build_index()
-        return BuildIndexResponse(
-            status="index_built",
-            documents_indexed=count,
-            message=f"Successfully indexed {count} passages from Bhagavad Gita"
-        )
+        ids = rag_engine.add_passages(req.texts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Adding passages failed: {str(e)}")
+    
+    return PassageResponse(status="added", ids=ids, documents_indexed=rag_engine.passage_count())
+
+
+@app.put('/passages/{passage_id}', response_model=PassageResponse)
+def update_passage(passage_id: int, req: PassageUpdateRequest):
+    """
+    Replace the text of a single passage, keeping its id
+    
+    Args:
+        passage_id: Id of the passage to edit
+        req: New passage text
+        
+    Returns:
+        The updated passage id
+    """
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    
+    try:
+        rag_engine.update_passage(passage_id, req.text)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Passage {passage_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Updating passage failed: {str(e)}")
+    
+    return PassageResponse(status="updated", ids=[passage_id], documents_indexed=rag_engine.passage_count())
+
+
+@app.delete('/passages/{passage_id}', response_model=PassageResponse)
+def delete_passage(passage_id: int):
+    """
+    Remove a passage from the live index
+    
+    Args:
+        passage_id: Id of the passage to remove
+        
+    Returns:
+        The removed passage id
+    """
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    
+    try:
+        rag_engine.remove_passage(passage_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Passage {passage_id} not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Removing passage failed: {str(e)}")
+    
+    return PassageResponse(status="removed", ids=[passage_id], documents_indexed=rag_engine.passage_count())
+
+
+# Index Snapshot Admin Endpoints
+@app.get('/admin/snapshots')
+async def list_snapshots():
+    """List index snapshots (oldest first) and which one is live"""
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    return {"snapshots": rag_engine.list_snapshots()}
+
+
+@app.get('/admin/cache/stats')
+async def cache_stats():
+    """Query-embedding/answer cache counters and encoder micro-batching stats"""
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    return {
+        "query_embeddings": rag_engine.query_cache_stats(),
+        "answers": rag_engine.answer_cache_stats(),
+        "encoder": rag_engine.encoder_stats(),
+    }
+
+
+@app.get('/admin/routes/stats')
+async def route_stats():
+    """How requests split across fast-path routes and RAG, and how many avoided the LLM"""
+    return ROUTER.stats()
+
+
+@app.get('/admin/pretrained')
+async def pretrained_status():
+    """Version, size and reload count of the live pretrained Q&A set"""
+    return QA_STORE.stats()
+
+
+@app.post('/admin/pretrained/reload')
+def reload_pretrained():
+    """
+    Load the pretrained Q&A file again and swap it in atomically
+    
+    Returns:
+        'reloaded' or 'unchanged', with the live version's summary
+    """
+    try:
+        return QA_STORE.reload(force=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Could not read {QA_STORE.path}: {e}")
+
+
+# Sync, since rolling back to a journaled version replays its edits from disk
+@app.post('/admin/snapshots/{version}/rollback')
+def rollback_snapshot(version: str):
+    """
+    Atomically switch serving back to an earlier index snapshot
+    
+    Args:
+        version: Snapshot version from GET /admin/snapshots
+        
+    Returns:
+        Summary of the now-live snapshot
+    """
+    rag_engine = get_rag_engine()
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG Engine not initialized")
+    
+    try:
+        snapshot = rag_engine.rollback(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Snapshot {version} not found")
     except Exception as e:
-        logger.error(f"Error building index: {e}")
-        raise HTTPException(status_code=500, detail=f"Index build failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Rollback failed: {str(e)}")
+    
+    return {"status": "rolled_back", "snapshot": snapshot}
 
 
 # Query Endpoint (Simple Retrieval)
+# Retrieval endpoints are sync so FastAPI runs them on its threadpool; that is what
+# lets concurrent requests meet in the encoder's micro-batches
 @app.post('/search')
-async def search(req: QueryRequest):
+def search(req: QueryRequest):
     """
     Search for relevant passages without generation
     
@@ -187,20 +522,45 @@ async def search(req: QueryRequest):
         raise HTTPException(status_code=400, detail="Question cannot be empty")
     
     try:
-        docs = rag_engine.search(req.question, top_k=req.top_k)
+        results = rag_engine.search_scored(
+            req.question,
+            top_k=req.top_k,
+            search_params=req.search_params(),
+            mode=req.mode,
+            filters=req.filters(),
+            mmr_lambda=req.mmr_lambda,
+            min_score=req.min_score,
+            adaptive_k=req.adaptive_k,
+            expand_parents=req.expand_parents
+        )
         return {
             "question": req.question,
-            "retrieved": docs,
-            "passage_count": len(docs)
+            "retrieved": [r["text"] for r in results],
+            "scores": [r["score"] for r in results],
+            "passage_count": len(results)
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Query Endpoint (Full RAG Pipeline)
+def _lookup_verses(question: str) -> List[Dict]:
+    """Verse records for the router (empty when the engine is unavailable)"""
+    rag_engine = get_rag_engine()
+    return rag_engine.lookup_verses(question) if rag_engine else []
+
+
+def _match_intent(question: str, pretrained: PretrainedSet) -> Optional[IntentMatch]:
+    """Semantic pretrained match for the router (None when the engine is unavailable)"""
+    rag_engine = get_rag_engine()
+    return rag_engine.match_intent(question, pretrained) if rag_engine else None
+
+
 @app.post('/query', response_model=QueryResponse)
-async def query(req: QueryRequest):
+def query(req: QueryRequest):
     """
     Full RAG pipeline: retrieve relevant passages + generate answer with local LLM
     Falls back to predefined answers if LLM unavailable
@@ -214,29 +574,21 @@ async def query(req: QueryRequest):
     if not req.question or req.question.strip() == "":
         raise HTTPException(status_code=400, detail="Question cannot be empty")
     
-    # Check for greetings first
-    is_greeting_query, greeting_response = is_greeting(req.question)
-    if is_greeting_query:
+    # One classification per request: greeting, verse lookup, pretrained topic or RAG
+    decision = ROUTER.route(req.question, lookup_verses=_lookup_verses, match_intent=_match_intent)
+    if not decision.needs_llm:
+        docs = [v["text"] for v in decision.verses]
         return QueryResponse(
             question=req.question,
-            answer=greeting_response,
-            retrieved=[],
-            passage_count=0
-        )
-    
-    # Check for pretrained answers from 50 human problems database (works without Gemini!)
-    has_pretrained, pretrained_answer = get_pretrained_answer(req.question)
-    if has_pretrained:
-        return QueryResponse(
-            question=req.question,
-            answer=add_krishna_says(pretrained_answer),
-            retrieved=[],
-            passage_count=0
+            answer=decision.answer,
+            retrieved=docs,
+            passage_count=len(docs)
         )
     
     # If no predefined answer, try RAG + LLM
     rag_engine = get_rag_engine()
     if not rag_engine:
+        ROUTER.record_rag_outcome('engine_unavailable')
         return QueryResponse(
             question=req.question,
             answer="🙏 Krishna says: I apologize, but the RAG engine is not initialized. Please try asking about yoga, dharma, karma, moksha, or other Bhagavad Gita concepts which have predefined answers.",
@@ -245,10 +597,40 @@ async def query(req: QueryRequest):
         )
     
     try:
-        # Search for relevant passages
-        docs = rag_engine.search(req.question, top_k=req.top_k)
+        # A near-duplicate question answered against the same index version
+        scope = req.cache_scope()
+        cached = rag_engine.cached_answer(req.question, scope)
+        if cached:
+            ROUTER.record_rag_outcome('answer_cache')
+            return QueryResponse(
+                question=req.question,
+                answer=cached["answer"],
+                retrieved=cached["passages"],
+                passage_count=len(cached["passages"]),
+                scores=cached["scores"],
+                cached=True
+            )
         
+        if decision.verses:
+            # The question is about verses it cites: they are the context, no search needed
+            results = [dict(v, score=1.0) for v in decision.verses]
+        else:
+            results = rag_engine.search_scored(
+                req.question,
+                top_k=req.top_k,
+                search_params=req.search_params(),
+                mode=req.mode,
+                filters=req.filters(),
+                mmr_lambda=req.mmr_lambda,
+                min_score=req.min_score,
+                adaptive_k=req.adaptive_k,
+                expand_parents=req.expand_parents
+            )
+        docs = [r["text"] for r in results]
+        
+        # Nothing cleared min_score: answer without calling Gemini
         if not docs:
+            ROUTER.record_rag_outcome('no_passages')
             return QueryResponse(
                 question=req.question,
                 answer="No relevant passages found in the Bhagavad Gita corpus for your question.",
@@ -259,20 +641,28 @@ async def query(req: QueryRequest):
         # Build context from retrieved passages
         context_text = "\n\n---\n\n".join(docs)
         
-        # Generate answer using answer_bhagavad_gita_question which handles pretrained answers
+        # Already routed: generate straight away without re-checking the fast path
         answer = answer_bhagavad_gita_question(
             question=req.question,
             retrieved_context=context_text,
             max_tokens=req.max_tokens,
             temperature=req.temperature,
-            gemini_api_key=GEMINI_API_KEY
+            gemini_api_key=GEMINI_API_KEY,
+            decision=decision
         )
+        scores = [r["score"] for r in results]
+        if is_fallback_answer(answer, context_text):
+            ROUTER.record_rag_outcome('llm_unavailable')
+        else:
+            ROUTER.record_rag_outcome('llm')
+            rag_engine.store_answer(req.question, answer, docs, scores, scope)
         
         return QueryResponse(
             question=req.question,
             answer=answer,
             retrieved=docs,
-            passage_count=len(docs)
+            passage_count=len(docs),
+            scores=scores
         )
     
     except Exception as e:
@@ -293,7 +683,8 @@ async def llm_status():
             llm_api_url="https://generativelanguage.googleapis.com/",
             llm_model="gemini-pro",
             available_models=client.list_models(),
-            rag_engine_ready=engine is not None
+            rag_engine_ready=engine is not None,
+            llm_circuit=client.breaker_stats()
         )
     except Exception as e:
         logger.error(f"Error checking Gemini status: {e}")
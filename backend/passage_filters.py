@@ -0,0 +1,102 @@
+"""
+Passage Filters - Metadata filters (chapter, speaker, ranges) for search
+Filters resolve to an id set with one vectorized pass over the snapshot's
+metadata columns and are pushed into FAISS as an IDSelector, so top_k is
+filled from matching passages rather than post-filtered away
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from verse_refs import normalize_speaker
+
+FILTER_FIELDS = ('chapters', 'chapter_range', 'verse_range', 'speaker')
+
+
+class PassageFilter:
+    """Conjunction of metadata conditions; unset fields match everything"""
+
+    def __init__(
+        self,
+        chapters: Optional[Sequence[int]] = None,
+        chapter_range: Optional[Sequence[int]] = None,
+        verse_range: Optional[Sequence[int]] = None,
+        speaker: Optional[str] = None
+    ):
+        """
+        Args:
+            chapters: Allowed chapter numbers
+            chapter_range: Inclusive [first, last] chapter
+            verse_range: Inclusive [first, last] verse number
+            speaker: Speaker name ("Arjuna", "Krishna", ...; epithets normalized)
+        """
+        self.chapters = sorted({int(c) for c in chapters}) if chapters else None
+        self.chapter_range = self._range(chapter_range, 'chapter_range')
+        self.verse_range = self._range(verse_range, 'verse_range')
+        self.speaker = normalize_speaker(speaker) if speaker and speaker.strip() else None
+
+    @staticmethod
+    def _range(bounds: Optional[Sequence[int]], name: str) -> Optional[tuple]:
+        if not bounds:
+            return None
+        if len(bounds) != 2 or int(bounds[0]) > int(bounds[1]):
+            raise ValueError(f"{name} must be [first, last] with first <= last")
+        return int(bounds[0]), int(bounds[1])
+
+    @classmethod
+    def from_dict(cls, filters: Optional[Dict[str, Any]]) -> Optional['PassageFilter']:
+        """Build from a request dict; None when no condition is set"""
+        if not filters:
+            return None
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        passage_filter = cls(**filters)
+        return passage_filter if passage_filter.is_active() else None
+
+    def is_active(self) -> bool:
+        return any(v is not None for v in (self.chapters, self.chapter_range, self.verse_range, self.speaker))
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """Test a single passage record"""
+        chapter, verse = record.get("chapter"), record.get("verse")
+        if self.chapters is not None and chapter not in self.chapters:
+            return False
+        if self.chapter_range and (chapter is None or not self.chapter_range[0] <= chapter <= self.chapter_range[1]):
+            return False
+        if self.verse_range and (verse is None or not self.verse_range[0] <= verse <= self.verse_range[1]):
+            return False
+        if self.speaker and record.get("speaker") != self.speaker:
+            return False
+        return True
+
+    def mask(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Vectorized match over metadata columns
+
+        Args:
+            columns: Row-aligned 'chapter', 'verse' (0 = unknown) and 'speaker' arrays
+
+        Returns:
+            Boolean mask, one entry per passage row
+        """
+        chapter, verse, speaker = columns["chapter"], columns["verse"], columns["speaker"]
+        mask = np.ones(chapter.shape[0], dtype=bool)
+        if self.chapters is not None:
+            mask &= np.isin(chapter, self.chapters)
+        if self.chapter_range:
+            mask &= (chapter >= self.chapter_range[0]) & (chapter <= self.chapter_range[1])
+        if self.verse_range:
+            mask &= (verse >= self.verse_range[0]) & (verse <= self.verse_range[1])
+        if self.speaker:
+            mask &= speaker == self.speaker
+        return mask
+
+
+def metadata_columns(passages: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Row-aligned metadata arrays used by PassageFilter.mask"""
+    return {
+        "chapter": np.array([p.get("chapter") or 0 for p in passages], dtype=np.int32),
+        "verse": np.array([p.get("verse") or 0 for p in passages], dtype=np.int32),
+        "speaker": np.array([p.get("speaker") or "" for p in passages], dtype=object),
+    }
@@ -0,0 +1,107 @@
+"""
+Query Cache - In-memory LRU cache of query embeddings
+Repeated questions skip the SentenceTransformer forward pass entirely
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key"""
+    return ' '.join(query.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU of normalized float32 query vectors with optional TTL
+
+    Keys are normalized query text, so "What is Karma?" and "what is  karma?"
+    share an entry. Vectors are stored read-only and handed out as copies,
+    so callers can never corrupt a cached entry in place.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Args:
+            max_size: Maximum cached queries (0 disables caching)
+            ttl_seconds: Entry lifetime (None = no expiry)
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[float, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Cached vector for a query, or None (counts a hit or miss)"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].copy()
+
+    def put(self, query: str, vector: np.ndarray) -> None:
+        """Store a normalized vector, evicting the least recently used entry if full"""
+        if not self.max_size:
+            return
+        stored = np.array(vector, dtype=np.float32)
+        stored.setflags(write=False)
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, query: str, compute: Callable[[str], np.ndarray]) -> np.ndarray:
+        """
+        Cached vector, or compute, store and return it
+
+        The encoder runs outside the lock so concurrent misses do not serialize.
+        """
+        vector = self.get(query)
+        if vector is None:
+            vector = compute(query)
+            self.put(query, vector)
+        return vector
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
@@ -3,13 +3,39 @@ Enhanced RAG Engine for Bhagavad Gita
 Integrates with Google Gemini API for context-aware answers
 """
 import os
-import json
-from typing import List, Dict, Optional, Tuple
+import math
+import time
+import contextlib
+import threading
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Iterator, List, Dict, Optional, Tuple
 import logging
+
+import numpy as np
 from gemini_llm import get_gemini_client
+import index_store
+from index_store import AppliedDeltas, EmbeddingSpool, IndexSnapshot, SnapshotDelta, SnapshotStore
+import ann_index
+import corpus_reader
+from corpus_reader import CorpusPath
+from embedding_cache import EmbeddingCache, passage_key
+from query_cache import QueryEmbeddingCache
+from answer_cache import SemanticAnswerCache, cache_scope
+from encoder_service import MicroBatchEncoder
+from encoders import ENCODER_BACKENDS, load_query_encoder
+from lexical_index import BM25Index
+from ranking import mmr_select, reciprocal_rank_fusion, score_cutoff
+from verse_refs import parse_verse_query, passage_metadata
+from passage_filters import PassageFilter
+from chunking import ChunkingConfig
+from dedup import NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ('dense', 'lexical', 'hybrid')
+
+NO_RELEVANT_PASSAGES = "No relevant passages found in the Bhagavad Gita corpus for your question."
+
 
 class BhagavadGitaRAGEngine:
     """RAG Engine optimized for Bhagavad Gita Q&A"""
@@ -36,24 +62,98 @@ Please provide a thoughtful answer based on the Gita teachings:"""
 
     def __init__(
         self,
-        corpus_path: str = 'data/corpus/geetha_verses.txt',
+        corpus_path: CorpusPath = 'data/corpus/geetha_verses.txt',
         gemini_api_key: str = None,
         embeddings_model: str = 'all-MiniLM-L6-v2',
-        use_gemini: bool = True
+        use_gemini: bool = True,
+        index_path: Optional[str] = None,
+        index_type: str = 'flat',
+        index_params: Optional[Dict] = None,
+        embedding_cache_path: Optional[str] = None,
+        keep_snapshots: int = 5,
+        compact_after_edits: int = 50,
+        retrieval_mode: str = 'hybrid',
+        lexical_decisive_ratio: float = 2.0,
+        lexical_decisive_score: Optional[float] = None,
+        rrf_k: int = 60,
+        mmr_fetch_factor: int = 4,
+        adaptive_min_gap: float = 0.05,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 3600.0,
+        answer_cache_size: int = 512,
+        answer_cache_threshold: float = 0.95,
+        answer_cache_ttl: Optional[float] = 86400.0,
+        encoder_batch_size: int = 32,
+        encoder_max_wait_ms: float = 2.0,
+        query_encoder: str = 'fp32',
+        query_max_seq_length: Optional[int] = None,
+        chunking: Optional[Dict] = None,
+        chunk_fetch_factor: int = 3,
+        build_workers: int = 1,
+        dedup_threshold: Optional[float] = 0.9
     ):
         """
         Initialize Bhagavad Gita RAG Engine with Gemini API
         
         Args:
-            corpus_path: Path to Gita verses corpus
+            corpus_path: Corpus file, directory of .txt files, or list of files
             gemini_api_key: Google Gemini API key
             embeddings_model: Model for generating embeddings
             use_gemini: Whether to use Gemini API
+            index_path: Where to persist the FAISS index (None disables persistence)
+            index_type: ANN backend - 'flat', 'ivf', 'hnsw' or 'ivfpq'
+            index_params: Overrides for ann_index.DEFAULT_INDEX_PARAMS (nlist, nprobe, ef_search, ...)
+            embedding_cache_path: SQLite file for cached passage embeddings (None disables it)
+            keep_snapshots: Index snapshots retained for rollback
+            compact_after_edits: Journaled edits on top of a full snapshot before the live
+                version is written out in full (in the background), which bounds replay
+                work at load
+            retrieval_mode: Default search mode - 'dense', 'lexical' or 'hybrid'
+            lexical_decisive_ratio: Hybrid mode skips the dense pass when the k-th BM25
+                score is at least this multiple of the next one (0 disables)
+            lexical_decisive_score: BM25 score at which the k-th hit is decisive when no
+                other passage matched (None: the dense pass always runs then)
+            rrf_k: Reciprocal-rank-fusion damping constant
+            mmr_fetch_factor: Candidate pool size (x top_k) for MMR diversification
+            adaptive_min_gap: Smallest score drop adaptive-k will cut at
+            query_cache_size: Query embeddings kept in the LRU cache (0 disables it)
+            query_cache_ttl: Seconds a cached query embedding stays valid (None = forever)
+            answer_cache_size: Generated answers kept in the semantic cache (0 disables it)
+            answer_cache_threshold: Question similarity needed to reuse a cached answer
+            answer_cache_ttl: Seconds a cached answer stays valid (None = forever)
+            encoder_batch_size: Most concurrent queries encoded/searched together
+            encoder_max_wait_ms: How long a query waits for others to batch with (0 disables batching)
+            query_encoder: Query embedding backend - 'fp32' or 'int8' (passages are always fp32)
+            query_max_seq_length: Token limit for query encoding (None keeps the model default)
+            chunking: Sentence-window chunking ({'window', 'overlap', 'min_chars'}; None disables)
+            chunk_fetch_factor: Chunk over-fetch (x top_k) so enough distinct parents remain
+            build_workers: Encoder processes used by build_embeddings_index (0 = one per CPU core)
+            dedup_threshold: Shingle similarity at which a corpus passage is folded into an
+                earlier near-duplicate as an alias during builds (None/0 disables)
         """
         self.corpus_path = corpus_path
         self.gemini_api_key = gemini_api_key
         self.embeddings_model = embeddings_model
         self.use_gemini = use_gemini
+        self.index_path = index_path
+        self.index_type = index_type.lower()
+        self.retrieval_mode = retrieval_mode.lower()
+        self.lexical_decisive_ratio = lexical_decisive_ratio
+        self.lexical_decisive_score = lexical_decisive_score
+        self.rrf_k = rrf_k
+        self.mmr_fetch_factor = max(1, mmr_fetch_factor)
+        self.adaptive_min_gap = adaptive_min_gap
+        self.chunking = ChunkingConfig.from_dict(chunking)
+        self.chunk_fetch_factor = max(1, chunk_fetch_factor)
+        self.build_workers = build_workers if build_workers > 0 else (os.cpu_count() or 1)
+        self.dedup_threshold = dedup_threshold or None
+        self.index_params = ann_index.resolve_index_params(index_params)
+        if self.index_type not in ann_index.INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'")
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}'")
+        if query_encoder.lower() not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown query encoder '{query_encoder}'")
         
         # Import here to avoid hard dependency
         try:
@@ -69,6 +169,38 @@ Please provide a thoughtful answer based on the Gita teachings:"""
         # Initialize embeddings model
         if self.embeddings_available:
             self.embeddings = self.SentenceTransformer(embeddings_model)
+            self.query_encoder = load_query_encoder(query_encoder, self.embeddings, query_max_seq_length)
+        
+        # Content-addressed passage embedding cache, so rebuilds only encode changed text
+        self.embedding_cache = None
+        if embedding_cache_path and self.embeddings_available:
+            try:
+                self.embedding_cache = EmbeddingCache(embedding_cache_path)
+            except Exception as e:
+                logger.warning(f"Could not open embedding cache {embedding_cache_path}: {e}")
+        
+        # Repeat questions reuse their query vector instead of re-running the encoder
+        self.query_cache = QueryEmbeddingCache(query_cache_size, query_cache_ttl)
+        
+        # Concurrent queries share one encoder forward pass and one FAISS search call
+        self.encoder_service = None
+        if self.embeddings_available and encoder_max_wait_ms > 0 and encoder_batch_size > 1:
+            self.encoder_service = MicroBatchEncoder(
+                self._encode_texts,
+                max_batch=encoder_batch_size,
+                max_wait_ms=encoder_max_wait_ms
+            )
+        
+        # Near-duplicate questions reuse a generated answer (cleared on index version change)
+        self.answer_cache = None
+        if self.embeddings_available:
+            self.answer_cache = SemanticAnswerCache(
+                self.faiss,
+                self.embeddings.get_sentence_embedding_dimension(),
+                threshold=answer_cache_threshold,
+                max_size=answer_cache_size,
+                ttl_seconds=answer_cache_ttl
+            )
         
         # Initialize Gemini client
         self.gemini_client = None
@@ -81,106 +213,1210 @@ Please provide a thoughtful answer based on the Gita teachings:"""
                 self.gemini_client = None
         
         self.corpus: List[str] = []
-        self.index = None
-        self.id_to_text: Dict[int, str] = {}
+        
+        # Live state is one immutable snapshot; writers publish a new one under the lock
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._history: Deque[IndexSnapshot] = deque(maxlen=max(1, keep_snapshots - 1))
+        self._latest_version = 0
+        self._write_lock = threading.RLock()
+        self._build_lock = threading.RLock()
+        self.snapshot_store = SnapshotStore(index_path, keep=keep_snapshots) if index_path else None
+        self.compact_after_edits = max(1, compact_after_edits)
+        self._compact_lock = threading.Lock()
+        self._compact_requested = False
+        self._compactor: Optional[threading.Thread] = None
         self.verses_metadata: Dict[int, Dict] = {}
     
+    def iter_corpus(self) -> Iterator[str]:
+        """Stream the corpus passages in indexing order (nothing is held in memory)"""
+        return corpus_reader.iter_passages(self.corpus_path)
+    
     def load_corpus(self) -> int:
         """
-        Load Bhagavad Gita corpus from file
+        Load the whole Bhagavad Gita corpus into self.corpus
+        
+        Indexing streams the corpus and does not need this; it remains for
+        callers that want the passages as a list.
         
         Returns:
             Number of verses/passages loaded
         """
-        if not os.path.exists(self.corpus_path):
-            raise FileNotFoundError(f"Corpus not found: {self.corpus_path}")
-        
-        with open(self.corpus_path, 'r', encoding='utf-8') as f:
-            raw = f.read().strip()
-        
-        # Split by blank lines to get individual verses/passages
-        passages = [p.strip() for p in raw.split('\n\n') if p.strip()]
+        passages = list(self.iter_corpus())
         
         self.corpus = passages
+        self.verses_metadata = {i: passage_metadata(p) for i, p in enumerate(passages)}
         logger.info(f"Loaded {len(passages)} passages from Bhagavad Gita")
         
         return len(passages)
     
-    def build_embeddings_index(self) -> int:
+    def build_embeddings_index(
+        self,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        batch_size: int = 256,
+        workers: Optional[int] = None
+    ) -> int:
         """
         Build FAISS index for semantic search
         
+        Rebuilds from the corpus files, so passages added through
+        add_passages() are dropped and ids are reassigned in corpus order.
+        Passages are streamed from disk, chunked, encoded and added to the
+        index `batch_size` (per worker) at a time, and each batch's
+        embeddings are appended to a file-backed spool instead of kept in
+        memory. Besides the index and the passage records (which near-
+        duplicate aliases are attached to as later batches arrive) only one
+        batch is in flight however large the corpus is. The result is
+        published as a new snapshot over the memory-mapped matrix; the
+        previous one keeps serving until the pointer flips.
+        
+        With more than one worker, each batch is sharded across a pool of
+        encoder processes. Shards come back in input order and ids are
+        assigned in corpus order, so the index is the same as a
+        single-process build. Throughput (passages/second) is recorded under
+        'build' in the snapshot manifest.
+        
+        Near-duplicate passages (dedup_threshold) are not indexed; each is
+        listed under 'aliases' (source file:passage number and similarity)
+        on the first copy, and the count is reported as duplicates_removed.
+        
+        Args:
+            progress_callback: Called as (passages_encoded, total) after each batch
+            batch_size: Passages read and encoded per batch (per worker)
+            workers: Encoder processes (defaults to build_workers; 0 = one per CPU core)
+        
         Returns:
-            Number of verses indexed
+            Number of verses indexed (duplicates excluded)
         """
+        # One build at a time; ensure_index() waits here for a build already under way
+        with self._build_lock:
+            return self._build_embeddings_index(progress_callback, batch_size, workers)
+    
+    def _build_embeddings_index(
+        self,
+        progress_callback: Optional[Callable[[int, int], None]],
+        batch_size: int,
+        workers: Optional[int]
+    ) -> int:
         if not self.embeddings_available:
             raise RuntimeError("sentence_transformers/faiss not available")
         
-        if not self.corpus:
-            self.load_corpus()
+        workers = self.build_workers if workers is None else (workers if workers > 0 else (os.cpu_count() or 1))
+        started = time.perf_counter()
         
-        logger.info(f"Building embeddings for {len(self.corpus)} passages...")
+        # Cheap counting pass: sizes IVF partitions and gives progress a denominator
+        total = corpus_reader.count_passages(self.corpus_path)
+        if not total:
+            raise ValueError(f"Corpus has no passages: {self.corpus_path}")
+        logger.info(f"Building embeddings for {total} passages ({workers} worker(s), batches of {batch_size})...")
+        if progress_callback:
+            progress_callback(0, total)
         
-        # Generate embeddings
-        embeddings = self.embeddings.encode(
-            self.corpus,
-            show_progress_bar=True,
-            convert_to_numpy=True
+        dim = self.embeddings.get_sentence_embedding_dimension()
+        builder = ann_index.StreamingIndexBuilder(
+            self.faiss,
+            dim,
+            total,
+            index_type=self.index_type,
+            index_params=self.index_params
+        )
+        # Embeddings go to disk batch by batch; the published matrix is a read-only map of that file
+        spool = EmbeddingSpool(dim, self.snapshot_store.root if self.snapshot_store else None)
+        passages: List[Dict] = []
+        parents: Dict[int, Dict] = {}
+        next_id = done = 0
+        
+        # Near-duplicates fold into the first copy seen; `canonical` holds the
+        # passage-level record for each dedup key so later copies can attach aliases
+        deduper = NearDuplicateIndex(self.dedup_threshold) if self.dedup_threshold else None
+        canonical: List[Dict] = []
+        
+        with spool, self._encoder_pool(workers) as pool:
+            sourced = corpus_reader.iter_sourced_passages(self.corpus_path)
+            for batch in corpus_reader.batched(sourced, batch_size * workers):
+                done += len(batch)
+                if deduper is not None:
+                    texts, pending_aliases = self._drop_duplicates(batch, deduper, canonical)
+                else:
+                    texts, pending_aliases = [text for _, text in batch], {}
+                
+                if texts:
+                    plan = self._plan_chunks(texts)
+                    embeddings = self._embed_passages(
+                        [u for text, chunks in plan for u in self._unit_texts(text, chunks)],
+                        batch_size=batch_size,
+                        pool=pool
+                    )
+                    records, batch_parents, passage_ids, next_id = self._assign_ids(plan, next_id)
+                    builder.add(embeddings, np.array([p["id"] for p in records], dtype=np.int64))
+                    
+                    spool.append(embeddings)
+                    passages.extend(records)
+                    parents.update(batch_parents)
+                    if deduper is not None:
+                        by_id = {r["id"]: r for r in records if "parent" not in r}
+                        for pid in passage_ids:
+                            record = batch_parents.get(pid) or by_id[pid]
+                            aliases = pending_aliases.get(len(canonical))
+                            if aliases:
+                                record["aliases"] = aliases
+                            canonical.append(record)
+                if progress_callback:
+                    progress_callback(done, total)
+            
+            if not passages:
+                raise ValueError(f"Corpus has no passages: {self.corpus_path}")
+            embeddings = spool.finish()
+        
+        index = builder.finish()
+        
+        seconds = time.perf_counter() - started
+        removed = deduper.duplicates if deduper is not None else 0
+        build = {
+            "passages": done,
+            "duplicates_removed": removed,
+            "indexed_units": len(passages),
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "passages_per_second": round(done / seconds, 1) if seconds > 0 else None,
+        }
+        with self._write_lock:
+            self._publish(
+                index, embeddings, passages, next_passage_id=next_id, reason="build", parents=parents, build=build
+            )
+        
+        logger.info(
+            f"Index built with {done - removed} passages ({len(passages)} indexed units, "
+            f"{removed} near-duplicates folded into aliases) in {build['seconds']}s "
+            f"({build['passages_per_second']} passages/s, {workers} worker(s))"
         )
         
-        # Create FAISS index
-        dim = embeddings.shape[1]
-        index = self.faiss.IndexFlatIP(dim)
+        return done - removed
+    
+    @staticmethod
+    def _drop_duplicates(
+        batch: List[Tuple[str, str]],
+        deduper: NearDuplicateIndex,
+        canonical: List[Dict]
+    ) -> Tuple[List[str], Dict[int, List[Dict]]]:
+        """
+        Split a batch of (source, text) into new passages and near-duplicates
+        
+        A duplicate of an already-indexed passage is recorded straight onto
+        that passage's 'aliases'; one whose original is earlier in this same
+        batch is returned by dedup key for the caller to attach once the
+        original has a record.
         
-        # Normalize for cosine similarity
-        self.faiss.normalize_L2(embeddings)
-        index.add(embeddings)
+        Returns:
+            (texts to index, dedup key -> aliases for passages in this batch)
+        """
+        kept: List[str] = []
+        pending: Dict[int, List[Dict]] = {}
+        for source, text in batch:
+            match = deduper.add_or_match(len(canonical) + len(kept), text)
+            if match is None:
+                kept.append(text)
+                continue
+            key, similarity = match
+            alias = {"source": source, "similarity": round(similarity, 4)}
+            if key < len(canonical):
+                canonical[key].setdefault("aliases", []).append(alias)
+            else:
+                pending.setdefault(key, []).append(alias)
+        return kept, pending
+    
+    @contextlib.contextmanager
+    def _encoder_pool(self, workers: int):
+        """
+        SentenceTransformer multi-process pool for a build (None for one worker)
+        
+        The pool is handed to _embed_passages explicitly rather than stored on
+        the engine: its queues must not be shared with concurrent add_passages
+        calls, whose results could otherwise be picked up by the build.
+        """
+        if workers <= 1:
+            yield None
+            return
+        pool = self.embeddings.start_multi_process_pool(target_devices=['cpu'] * workers)
+        try:
+            yield pool
+        finally:
+            self.embeddings.stop_multi_process_pool(pool)
+    
+    @staticmethod
+    def _passage_record(passage_id: int, text: str) -> Dict:
+        """Passage store record: id, text and parsed chapter/verse metadata"""
+        return {"id": passage_id, "text": text, **passage_metadata(text)}
+    
+    def _plan_chunks(self, texts: List[str]) -> List[Tuple[str, Optional[List[Dict]]]]:
+        """(passage text, its chunks or None when indexed whole) for each passage"""
+        plan = []
+        for text in texts:
+            chunks = self.chunking.chunk(text) if self.chunking else None
+            plan.append((text, chunks if chunks and len(chunks) > 1 else None))
+        return plan
+    
+    @staticmethod
+    def _unit_texts(text: str, chunks: Optional[List[Dict]]) -> List[str]:
+        """Texts that get embedded for one planned passage"""
+        return [c["text"] for c in chunks] if chunks else [text]
+    
+    def _assign_ids(
+        self,
+        plan: List[Tuple[str, Optional[List[Dict]]]],
+        next_id: int,
+        passage_ids: Optional[List[int]] = None
+    ) -> Tuple[List[Dict], Dict[int, Dict], List[int], int]:
+        """
+        Turn a chunk plan into indexed records
         
-        self.index = index
-        self.id_to_text = {i: text for i, text in enumerate(self.corpus)}
+        Passages and chunks draw ids from the same counter. A passage indexed
+        whole is a single record under its own id; a split passage gets a
+        parent record (kept out of the ANN index) and one record per chunk
+        pointing back at it.
         
-        logger.info(f"Index built with {len(self.corpus)} passages")
+        Args:
+            plan: Output of _plan_chunks
+            next_id: First free id
+            passage_ids: Fixed passage ids (updates); otherwise allocated
+            
+        Returns:
+            (indexed records in embedding order, parents, passage ids, next free id)
+        """
+        records: List[Dict] = []
+        parents: Dict[int, Dict] = {}
+        assigned: List[int] = []
+        for i, (text, chunks) in enumerate(plan):
+            if passage_ids is not None:
+                pid = passage_ids[i]
+            else:
+                pid, next_id = next_id, next_id + 1
+            assigned.append(pid)
+            if not chunks:
+                records.append(self._passage_record(pid, text))
+                continue
+            parents[pid] = self._passage_record(pid, text)
+            for chunk in chunks:
+                records.append({"id": next_id, "parent": pid, **chunk})
+                next_id += 1
+        return records, parents, assigned, next_id
+    
+    # Read-only views of the current snapshot (kept for existing callers)
+    @property
+    def index(self):
+        return self._snapshot.index if self._snapshot else None
+    
+    @property
+    def id_to_text(self) -> Dict[int, str]:
+        return self._snapshot.id_to_text if self._snapshot else {}
+    
+    @property
+    def snapshot(self) -> Optional[IndexSnapshot]:
+        """Current snapshot; read it once per request and use only that object"""
+        return self._snapshot
+    
+    def _index_fingerprint(self, corpus_sha256: Optional[str] = None, **extra) -> Dict:
+        """
+        Fields that must match for a persisted index to be reused
         
-        return len(self.corpus)
+        The corpus is hashed unless `corpus_sha256` is given (an edit carries
+        over the digest of the snapshot it applies to).
+        """
+        return {
+            "model_name": self.embeddings_model,
+            "corpus_sha256": corpus_sha256 or index_store.corpus_fingerprint(self.corpus_path),
+            "index_type": self.index_type,
+            "index_params": self._build_params(),
+            "chunking": self.chunking.to_dict() if self.chunking else None,
+            "dedup_threshold": self.dedup_threshold,
+            **extra
+        }
+    
+    def _build_params(self) -> Dict:
+        """Index params that change the index structure (search-time knobs excluded)"""
+        return {k: v for k, v in self.index_params.items() if k not in ('nprobe', 'ef_search')}
+    
+    def _apply_search_defaults(self, index) -> None:
+        """Apply configured nprobe/efSearch to a loaded index"""
+        base = ann_index.base_index(self.faiss, index)
+        if isinstance(base, self.faiss.IndexIVF):
+            base.nprobe = min(int(self.index_params['nprobe']), base.nlist)
+        elif isinstance(base, self.faiss.IndexHNSW):
+            base.hnsw.efSearch = int(self.index_params['ef_search'])
+    
+    def _next_version(self) -> str:
+        """Versions only move forward, even after a rollback"""
+        if self.snapshot_store:
+            return self.snapshot_store.next_version(self._latest_version)
+        return index_store.format_version(self._latest_version + 1)
+    
+    def _publish(
+        self,
+        index,
+        embeddings: np.ndarray,
+        passages: List[Dict],
+        next_passage_id: int,
+        reason: str,
+        lexical: Optional[BM25Index] = None,
+        parents: Optional[Dict[int, Dict]] = None,
+        build: Optional[Dict] = None,
+        delta: Optional[SnapshotDelta] = None
+    ) -> IndexSnapshot:
+        """
+        Wrap new state in a snapshot, flip the live pointer, then persist it
+        
+        Must be called with the write lock held. `lexical` is built from
+        `passages` when not supplied; `parents` holds the full text of
+        passages indexed as chunks; `build` is a full build's throughput report.
+        An edit passes the `delta` that produced the state from the live
+        snapshot, and only that delta is written to disk.
+        """
+        # Only builds hash the corpus; an edit keeps the digest of the version it edits
+        corpus_sha256 = None
+        if delta is not None and self._snapshot is not None:
+            corpus_sha256 = self._snapshot.manifest.get("corpus_sha256")
+        manifest = index_store.new_manifest(
+            **self._index_fingerprint(
+                corpus_sha256,
+                dim=int(embeddings.shape[1]),
+                count=len(passages),
+                passage_count=len(passages) - sum("parent" in p for p in passages) + len(parents or {}),
+                next_passage_id=next_passage_id
+            ),
+            reason=reason,
+            **({"build": build} if build else {})
+        )
+        snapshot = IndexSnapshot(self._next_version(), index, embeddings, passages, manifest, lexical, parents)
+        parent = self._snapshot.version if self._snapshot is not None else None
+        
+        # Readers see the new state before anything touches the disk
+        self._activate(snapshot)
+        
+        if self.snapshot_store:
+            try:
+                self._persist(snapshot, delta, parent)
+            except OSError as e:
+                logger.warning(f"Could not persist snapshot {snapshot.version}: {e}")
+        return snapshot
+    
+    def _persist(self, snapshot: IndexSnapshot, delta: Optional[SnapshotDelta], parent: Optional[str]) -> None:
+        """
+        Journal an edit (or save a full snapshot), then point CURRENT at it
+        
+        An edit costs one appended journal line. Once the chain of journaled
+        edits reaches compact_after_edits, the background compactor writes the
+        live version out in full so loading never replays a long chain.
+        """
+        store = self.snapshot_store
+        if delta is not None and parent is not None and store.read_manifest(parent) is not None:
+            store.append_delta(snapshot.version, parent, snapshot.manifest, delta)
+        else:
+            # First snapshot, a full build, or an edit on a version no longer on disk
+            store.prune(reserve=1)
+            store.save(self.faiss, snapshot)
+        store.set_current(snapshot.version)
+        store.prune()
+        if store.delta_depth(snapshot.version) >= self.compact_after_edits:
+            self._request_compaction()
+    
+    def _request_compaction(self) -> None:
+        """Ask the compactor thread to save the live version in full, starting it if idle"""
+        with self._compact_lock:
+            self._compact_requested = True
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._run_compactor, name="snapshot-compactor", daemon=True)
+                self._compactor.start()
+    
+    def _run_compactor(self) -> None:
+        # Requests that arrive during a save coalesce into one more pass over whatever is live then
+        store = self.snapshot_store
+        while True:
+            with self._compact_lock:
+                if not self._compact_requested:
+                    self._compactor = None
+                    return
+                self._compact_requested = False
+            snapshot = self._snapshot
+            if store.is_full(snapshot.version):
+                continue
+            try:
+                store.save(self.faiss, snapshot)
+                store.prune()
+            except OSError as e:
+                logger.warning(f"Could not compact snapshot {snapshot.version}: {e}")
+    
+    def _apply_deltas(self, base: IndexSnapshot, deltas: List[SnapshotDelta]) -> Tuple[Any, AppliedDeltas]:
+        """
+        ANN index and state of `base` after a run of edits
+        
+        The index is a copy of the base with only the changed rows removed
+        and added; HNSW, which cannot remove in place, is rebuilt from the
+        stored vectors instead.
+        """
+        applied = index_store.apply_deltas(base, deltas)
+        removed_ids = np.array([p["id"] for p in applied.removed], dtype=np.int64)
+        added_ids = np.array([p["id"] for p in applied.added], dtype=np.int64)
+        if len(removed_ids) and not ann_index.supports_removal(self.faiss, base.index):
+            ids = np.array([p["id"] for p in applied.passages], dtype=np.int64)
+            return self._rebuild_from_vectors(applied.embeddings, ids), applied
+        index = self._copy_index(base.index)
+        if len(removed_ids):
+            index.remove_ids(removed_ids)
+        if len(added_ids):
+            index.add_with_ids(applied.added_embeddings, added_ids)
+        return index, applied
+    
+    def _commit_delta(self, delta: SnapshotDelta) -> IndexSnapshot:
+        """Apply an edit to the live snapshot and publish the result (write lock held)"""
+        current = self._snapshot
+        index, applied = self._apply_deltas(current, [delta])
+        return self._publish(
+            index,
+            applied.embeddings,
+            applied.passages,
+            next_passage_id=applied.next_passage_id,
+            reason=delta.reason,
+            lexical=current.lexical.updated(added=applied.added, removed=applied.removed),
+            parents=applied.parents,
+            delta=delta
+        )
+    
+    def _activate(self, snapshot: IndexSnapshot) -> None:
+        """Single pointer flip; in-flight readers keep the snapshot they already hold"""
+        if self._snapshot is not None:
+            self._history.append(self._snapshot)
+        self._snapshot = snapshot
+        self._latest_version = max(self._latest_version, index_store.parse_version(snapshot.version) or 0)
+    
+    def load_index(self) -> bool:
+        """
+        Load the current persisted snapshot (memory-mapped) if it matches the
+        current embedding model and corpus
+        
+        Returns:
+            True if a persisted index was loaded, False if a rebuild is needed
+        """
+        if not self.embeddings_available or not self.snapshot_store:
+            return False
+        
+        corpus_reader.corpus_files(self.corpus_path)  # FileNotFoundError if missing
+        
+        version = self.snapshot_store.current_version()
+        if not version:
+            return False
+        
+        snapshot = self._load_version(version, self._index_fingerprint())
+        if snapshot is None:
+            return False
+        
+        with self._write_lock:
+            self._activate(snapshot)
+        return True
+    
+    def _load_version(self, version: str, expected: Optional[Dict] = None) -> Optional[IndexSnapshot]:
+        """
+        Load a persisted version, replaying its journaled edits onto the full
+        snapshot they were made on
+        
+        Args:
+            version: Snapshot version
+            expected: Fingerprint fields the full snapshot's manifest must match
+            
+        Returns:
+            IndexSnapshot, or None when missing or stale
+        """
+        resolved = self.snapshot_store.resolve(version)
+        if resolved is None:
+            logger.info(f"Snapshot {version}, or a version it was edited from, is missing")
+            return None
+        base_version, chain = resolved
+        snapshot = self.snapshot_store.load(self.faiss, base_version, expected)
+        if snapshot is None:
+            return None
+        if chain:
+            index, applied = self._apply_deltas(snapshot, [delta for _, _, delta in chain])
+            manifest = chain[-1][1]
+            if len(applied.passages) != manifest.get("count"):
+                logger.warning(f"Replaying the journal onto {base_version} does not reproduce {version}")
+                return None
+            snapshot = IndexSnapshot(
+                version, index, applied.embeddings, applied.passages, manifest,
+                snapshot.lexical.updated(added=applied.added, removed=applied.removed),
+                applied.parents
+            )
+            logger.info(f"Replayed {len(chain)} journaled edit(s) onto snapshot {base_version}")
+        self._apply_search_defaults(snapshot.index)
+        return snapshot
+    
+    def list_snapshots(self) -> List[Dict]:
+        """
+        Snapshots available for rollback, oldest first
+        
+        Returns:
+            Summary dicts with version, count, created_at, reason and current flag
+        """
+        current = self._snapshot.version if self._snapshot else None
+        if self.snapshot_store:
+            listed = self.snapshot_store.list()
+            for entry in listed:
+                entry["current"] = entry["version"] == current
+            return listed
+        return [
+            {**s.summary(), "current": s.version == current}
+            for s in list(self._history) + ([self._snapshot] if self._snapshot else [])
+        ]
+    
+    def rollback(self, version: str) -> IndexSnapshot:
+        """
+        Make an earlier snapshot live again
+        
+        Args:
+            version: Snapshot version to restore
+            
+        Returns:
+            The restored snapshot
+        """
+        with self._write_lock:
+            snapshot = next((s for s in self._history if s.version == version), None)
+            if snapshot is None and self.snapshot_store:
+                snapshot = self._load_version(version, {"model_name": self.embeddings_model})
+            if snapshot is None:
+                raise KeyError(f"Unknown snapshot version: {version}")
+            
+            if self.snapshot_store:
+                self.snapshot_store.set_current(snapshot.version)
+            self._activate(snapshot)
+        
+        logger.info(f"Rolled back index to snapshot {version}")
+        return snapshot
+    
+    def ensure_index(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Load the persisted index, or build one, if nothing is loaded yet
+        
+        A caller that arrives while another thread is building waits for that
+        build instead of starting a second one.
+        
+        Args:
+            progress_callback: Passed to build_embeddings_index if a build runs
+            
+        Returns:
+            Number of indexed passages
+        """
+        if self._snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None and not self.load_index():
+                    self.build_embeddings_index(progress_callback=progress_callback)
+        return self._snapshot.passage_count
+    
+    def _copy_index(self, index):
+        """
+        Owned, writable copy of an index
+        
+        Published snapshots are never mutated, and memory-mapped indexes are
+        read-only views, so every write starts from a copy.
+        """
+        copy = self.faiss.deserialize_index(self.faiss.serialize_index(index))
+        self._apply_search_defaults(copy)
+        return copy
+    
+    def _embed_passages(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        batch_size: int = 256,
+        pool: Optional[Dict] = None
+    ) -> np.ndarray:
+        """
+        L2-normalized float32 embeddings for passages, encoding only cache misses
+        
+        Args:
+            texts: Passage texts
+            progress_callback: Called as (passages_done, total) after each batch
+            batch_size: Passages encoded per batch (ignored with a pool, which
+                gets all misses in one sharded call)
+            pool: SentenceTransformer multi-process pool from _encoder_pool
+            
+        Returns:
+            Matrix with one row per text
+        """
+        total = len(texts)
+        keys = [passage_key(t) for t in texts]
+        cached = self.embedding_cache.get_many(self.embeddings_model, keys) if self.embedding_cache else {}
+        
+        # Encode each distinct missing passage once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        
+        key_counts = Counter(keys)
+        done = total - sum(key_counts[k] for k in missing)
+        if progress_callback:
+            progress_callback(done, total)
+        if total:
+            logger.debug(f"Embedding cache: {total - len(missing)} hits, {len(missing)} passages to encode")
+        
+        missing_keys = list(missing)
+        step = max(len(missing_keys), 1) if pool else batch_size
+        for start in range(0, len(missing_keys), step):
+            batch_keys = missing_keys[start:start + step]
+            texts_to_encode = [missing[k] for k in batch_keys]
+            if pool:
+                # One contiguous shard per worker; results come back in input order
+                vectors = self.embeddings.encode_multi_process(
+                    texts_to_encode,
+                    pool,
+                    chunk_size=math.ceil(len(texts_to_encode) / len(pool['processes']))
+                )
+            else:
+                vectors = self.embeddings.encode(
+                    texts_to_encode,
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            self.faiss.normalize_L2(vectors)
+            if self.embedding_cache:
+                self.embedding_cache.put_many(self.embeddings_model, batch_keys, vectors)
+            cached.update(zip(batch_keys, vectors))
+            done += sum(key_counts[k] for k in batch_keys)
+            if progress_callback:
+                progress_callback(done, total)
+        
+        if not total:
+            return np.zeros((0, self.embeddings.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.ascontiguousarray(np.vstack([cached[k] for k in keys]), dtype=np.float32)
+    
+    def add_passages(self, texts: List[str]) -> List[int]:
+        """
+        Encode and add new passages without rebuilding the index
+        
+        Args:
+            texts: Passage texts to add
+            
+        Returns:
+            Stable ids assigned to the new passages
+        """
+        if not self.embeddings_available:
+            raise RuntimeError("sentence_transformers/faiss not available")
+        texts = [t.strip() for t in texts if t and t.strip()]
+        if not texts:
+            raise ValueError("No passage text provided")
+        
+        self.ensure_index()
+        plan = self._plan_chunks(texts)
+        embeddings = self._embed_passages([u for text, chunks in plan for u in self._unit_texts(text, chunks)])
+        
+        with self._write_lock:
+            current = self._snapshot
+            added, parents, passage_ids, next_id = self._assign_ids(plan, current.next_passage_id)
+            self._commit_delta(SnapshotDelta(
+                "add",
+                records=tuple(added),
+                embeddings=embeddings,
+                parents=tuple(parents.values()),
+                next_passage_id=next_id
+            ))
+        
+        logger.info(f"Added {len(texts)} passages (ids {passage_ids[0]}-{passage_ids[-1]})")
+        return passage_ids
+    
+    def _rebuild_from_vectors(self, embeddings: np.ndarray, ids: np.ndarray):
+        """Rebuild the ANN structure from stored vectors (no re-encode)"""
+        return ann_index.build_index(
+            self.faiss,
+            embeddings,
+            index_type=self.index_type,
+            index_params=self.index_params,
+            ids=ids
+        )
+    
+    def remove_passages(self, passage_ids: List[int]) -> int:
+        """
+        Remove passages (with all their chunks) from the index by id
+        
+        Args:
+            passage_ids: Ids to remove
+            
+        Returns:
+            Number of passages removed
+        """
+        self.ensure_index()
+        
+        with self._write_lock:
+            current = self._snapshot
+            missing = [pid for pid in passage_ids if not current.has_passage(pid)]
+            if missing:
+                raise KeyError(f"Unknown passage id(s): {missing}")
+            
+            ids = current.record_ids(passage_ids)
+            removed_ids = set(passage_ids)
+            self._commit_delta(SnapshotDelta(
+                "remove",
+                removed_ids=tuple(ids),
+                removed_parents=tuple(removed_ids)
+            ))
+        
+        logger.info(f"Removed {len(removed_ids)} passages ({len(ids)} indexed units)")
+        return len(removed_ids)
+    
+    def update_passage(self, passage_id: int, text: str) -> int:
+        """
+        Replace a passage's text, keeping its id
+        
+        Args:
+            passage_id: Id of the passage to edit
+            text: New passage text
+            
+        Returns:
+            The passage id
+        """
+        text = (text or "").strip()
+        if not text:
+            raise ValueError("No passage text provided")
+        
+        self.ensure_index()
+        plan = self._plan_chunks([text])
+        embedding = self._embed_passages(self._unit_texts(*plan[0]))
+        
+        with self._write_lock:
+            current = self._snapshot
+            if not current.has_passage(passage_id):
+                raise KeyError(f"Unknown passage id: {passage_id}")
+            
+            old_ids = current.record_ids([passage_id])
+            new_records, new_parents, _, next_id = self._assign_ids(
+                plan, current.next_passage_id, passage_ids=[passage_id]
+            )
+            # A passage indexed whole before and after keeps its row; otherwise
+            # the old rows are dropped and the new ones appended
+            self._commit_delta(SnapshotDelta(
+                "update",
+                records=tuple(new_records),
+                embeddings=embedding,
+                removed_ids=tuple(old_ids),
+                parents=tuple(new_parents.values()),
+                removed_parents=(passage_id,),
+                next_passage_id=next_id
+            ))
+        
+        return passage_id
     
     def search_passages(
         self,
         query: str,
-        top_k: int = 3
+        top_k: int = 3,
+        search_params: Optional[Dict] = None,
+        mode: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        mmr_lambda: Optional[float] = None,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False,
+        expand_parents: bool = True
     ) -> List[str]:
         """
-        Search for relevant passages using semantic similarity
+        Search for relevant passages
         
         Args:
             query: Search query
             top_k: Number of top results to return
+            search_params: Per-call overrides, e.g. {'nprobe': 16} or {'ef_search': 128}
+            mode: 'dense', 'lexical' or 'hybrid' (defaults to retrieval_mode)
+            filters: Metadata filters - chapters, chapter_range, verse_range, speaker
+            mmr_lambda: Enable MMR diversification (1.0 = relevance only, 0.0 = diversity only)
+            min_score: Drop passages whose cosine similarity to the query is below this
+            adaptive_k: Stop at the largest score gap within the top_k
+            expand_parents: Return the full passage for chunk hits (False returns the chunk)
             
         Returns:
             List of relevant passages
         """
+        results = self._search(
+            query, top_k, search_params, mode, filters, mmr_lambda, min_score, adaptive_k,
+            expand_parents, with_scores=min_score is not None or adaptive_k
+        )
+        return [r["text"] for r in results]
+    
+    def search_scored(
+        self,
+        query: str,
+        top_k: int = 3,
+        search_params: Optional[Dict] = None,
+        mode: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        mmr_lambda: Optional[float] = None,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False,
+        expand_parents: bool = True
+    ) -> List[Dict]:
+        """
+        Like search_passages, but returns passage records with a 'score'
+        
+        The score is the cosine similarity between the query and the passage
+        embedding whenever the query was encoded anyway: dense retrieval, a
+        hybrid search that ran its dense pass, MMR, or a min_score/adaptive_k
+        cutoff (both are defined on cosine). When the ranking came from BM25
+        alone (lexical mode, or a hybrid search whose lexical ranking was
+        decisive) the query is not encoded just to score it, and the score is
+        the BM25 score relative to the top hit, in (0, 1]. Passages resolved
+        from an explicit verse reference score 1.0. For a passage indexed as
+        chunks, the score is that of its best chunk and 'matched_text' holds
+        that chunk.
+        
+        Returns:
+            Passage records ('id', 'text', 'score', metadata), best first
+        """
+        return self._search(
+            query, top_k, search_params, mode, filters, mmr_lambda, min_score, adaptive_k,
+            expand_parents, with_scores=True
+        )
+    
+    def _search(
+        self,
+        query: str,
+        top_k: int,
+        search_params: Optional[Dict],
+        mode: Optional[str],
+        filters: Optional[Dict],
+        mmr_lambda: Optional[float],
+        min_score: Optional[float],
+        adaptive_k: bool,
+        expand_parents: bool,
+        with_scores: bool
+    ) -> List[Dict]:
         if not self.embeddings_available:
             raise RuntimeError("Embeddings not available")
         
-        if self.index is None:
-            self.build_embeddings_index()
+        mode = (mode or self.retrieval_mode).lower()
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'. Choose from {', '.join(RETRIEVAL_MODES)}")
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda must be between 0 and 1")
         
-        # Encode query
-        query_embedding = self.embeddings.encode(
-            [query],
-            convert_to_numpy=True
-        )
-        self.faiss.normalize_L2(query_embedding)
+        passage_filter = PassageFilter.from_dict(filters)
+        
+        self.ensure_index()
+        
+        # One snapshot for the whole request: a concurrent swap cannot split index and passages
+        snapshot = self._snapshot
+        
+        # Explicit verse references ("2.47", "Chapter 3 Verse 19") are a direct lookup
+        verses = self._lookup_verses(snapshot, query)
+        if passage_filter:
+            verses = [v for v in verses if passage_filter.matches(v)]
+        if verses:
+            return [dict(v, score=1.0) for v in self._expand(snapshot, verses)]
+        
+        # Filters resolve to an id set that both retrievers search within
+        allowed = snapshot.filter_ids(passage_filter) if passage_filter else None
+        if allowed is not None and not len(allowed):
+            return []
+        
+        # MMR reranks an over-fetched pool with the query vector, which dense retrieval and
+        # scoring then share; without MMR the vector is only computed if a pass needs it
+        fetch_k = max(top_k * self.mmr_fetch_factor, top_k) if mmr_lambda is not None else top_k
+        if snapshot.parents:
+            # Several chunks of one passage can crowd the top: over-fetch, then keep the best per parent
+            fetch_k *= self.chunk_fetch_factor
+        query_embedding = self._encode_query(query) if mmr_lambda is not None else None
+        
+        if mode == 'dense':
+            ranked = self._dense_search(snapshot, query, fetch_k, search_params, allowed, query_embedding)
+            lexical_only = False
+        elif mode == 'lexical':
+            ranked = snapshot.lexical.search(query, fetch_k, self._allowed_set(allowed))
+            lexical_only = True
+        else:
+            ranked, lexical_only = self._hybrid_search(
+                snapshot, query, fetch_k, search_params, allowed, query_embedding
+            )
         
-        # Search
-        distances, indices = self.index.search(query_embedding, top_k)
+        ranked = self._best_chunk_per_parent(snapshot, ranked[:fetch_k])
         
-        results = []
-        for idx in indices[0]:
-            if idx >= 0 and idx in self.id_to_text:
-                results.append(self.id_to_text[int(idx)])
+        if mmr_lambda is not None:
+            ranked = self._mmr_rerank(snapshot, query_embedding, ranked, top_k, mmr_lambda)
         
+        ids = [pid for pid, _ in ranked[:top_k] if pid in snapshot.id_to_row]
+        records = [snapshot.passages[snapshot.id_to_row[pid]] for pid in ids]
+        if not with_scores:
+            return self._expand(snapshot, records) if expand_parents else records
+        
+        if lexical_only and query_embedding is None and min_score is None and not adaptive_k:
+            top = ranked[0][1] if ranked and ranked[0][1] > 0 else 1.0
+            bm25 = dict(ranked[:top_k])
+            scores = np.array([bm25[pid] / top for pid in ids], dtype=np.float32)
+        else:
+            # A dense pass left the vector in the query LRU, so this only encodes for cutoffs
+            if query_embedding is None:
+                query_embedding = self._encode_query(query)
+            scores = self._cosine_scores(snapshot, query_embedding, ids)
+        keep = score_cutoff(scores, min_score=min_score, adaptive=adaptive_k, min_gap=self.adaptive_min_gap)
+        records = [records[i] for i in keep]
+        results = self._expand(snapshot, records) if expand_parents else [dict(r) for r in records]
+        for result, i in zip(results, keep):
+            result["score"] = round(float(scores[i]), 4)
         return results
     
+    @staticmethod
+    def _best_chunk_per_parent(snapshot: IndexSnapshot, ranked: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """Drop every chunk ranked below another chunk of the same passage"""
+        if not snapshot.parents:
+            return ranked
+        seen = set()
+        best = []
+        for pid, score in ranked:
+            row = snapshot.id_to_row.get(pid)
+            if row is None:
+                continue
+            parent = snapshot.passages[row].get("parent", pid)
+            if parent not in seen:
+                seen.add(parent)
+                best.append((pid, score))
+        return best
+    
+    @staticmethod
+    def _expand(snapshot: IndexSnapshot, records: List[Dict]) -> List[Dict]:
+        """
+        Full passages for indexed records, de-duplicated by passage
+        
+        Chunk hits become their parent passage with the chunk in 'matched_text',
+        so retrieval stays precise while the LLM sees complete context.
+        """
+        expanded = []
+        seen = set()
+        for record in records:
+            parent = snapshot.parent_record(record)
+            if parent["id"] in seen:
+                continue
+            seen.add(parent["id"])
+            if parent is record:
+                expanded.append(dict(record))
+            else:
+                expanded.append(dict(parent, matched_text=record["text"]))
+        return expanded
+    
+    def lookup_verses(self, query: str) -> List[Dict]:
+        """
+        Resolve verse references in a query without embeddings or FAISS
+        
+        Args:
+            query: e.g. "what does 2.47 say" or "Chapter 3 Verse 19"
+            
+        Returns:
+            Passage records for the referenced verses found in the corpus
+        """
+        refs = parse_verse_query(query)
+        if not refs:
+            return []
+        self.ensure_index()
+        snapshot = self._snapshot
+        return self._expand(snapshot, self._lookup_verses(snapshot, query, refs))
+    
+    def _lookup_verses(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        refs: Optional[List[Tuple[int, int]]] = None
+    ) -> List[Dict]:
+        if refs is None:
+            refs = parse_verse_query(query)
+        found = []
+        for ref in refs:
+            row = snapshot.verse_index.get(ref)
+            if row is not None:
+                found.append(snapshot.passages[row])
+        return found
+    
+    def _dense_search(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        k: int,
+        search_params: Optional[Dict] = None,
+        allowed: Optional[np.ndarray] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Encode the query and search the ANN index; returns (id, cosine) pairs
+        
+        `allowed` restricts the search inside FAISS via an IDSelector, so
+        all k results come from matching passages. A precomputed
+        `query_embedding` (1 x d, normalized) skips the encoder.
+        """
+        selector = self.faiss.IDSelectorBatch(allowed) if allowed is not None else None
+        params = ann_index.make_search_params(self.faiss, snapshot.index, search_params, selector)
+        
+        if self.encoder_service is not None:
+            # Encode (on a query-cache miss) and search in one trip through the batcher;
+            # filtered searches carry their own selector and so cannot share a call
+            cached = query_embedding if query_embedding is not None else self.query_cache.get(query)
+            group_key = tuple(sorted((search_params or {}).items())) if selector is None else None
+            vector, distances, indices = self.encoder_service.search(
+                query, snapshot.index, k, params, group_key, cached
+            )
+            if cached is None:
+                self.query_cache.put(query, vector)
+        else:
+            if query_embedding is None:
+                query_embedding = self._encode_query(query)
+            distances, indices = snapshot.index.search(query_embedding, k, params=params)
+        
+        return [
+            (int(idx), float(score))
+            for idx, score in zip(indices[0], distances[0])
+            if idx >= 0
+        ]
+    
+    def _hybrid_search(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        top_k: int,
+        search_params: Optional[Dict] = None,
+        allowed: Optional[np.ndarray] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Tuple[List[Tuple[int, float]], bool]:
+        """
+        BM25 + dense retrieval fused with reciprocal-rank fusion
+        
+        When the lexical ranking is decisive (its top_k clearly separated from
+        the rest) the transformer pass is skipped entirely.
+        
+        Returns:
+            (ranked (id, score) pairs, True when the ranking is BM25's alone)
+        """
+        candidates = max(top_k * 4, 20)
+        lexical = snapshot.lexical.search(query, candidates, self._allowed_set(allowed))
+        
+        if self._lexical_is_decisive(lexical, top_k):
+            return lexical[:top_k], True
+        
+        dense = self._dense_search(snapshot, query, candidates, search_params, allowed, query_embedding)
+        return reciprocal_rank_fusion(
+            [[pid for pid, _ in dense], [pid for pid, _ in lexical]],
+            k=self.rrf_k
+        ), False
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Normalized float32 query embedding, shape (1, d); served from the LRU when cached"""
+        return self.query_cache.get_or_compute(query, self._run_query_encoder)
+    
+    def _run_query_encoder(self, query: str) -> np.ndarray:
+        if self.encoder_service is not None:
+            return self.encoder_service.encode(query)
+        return self._encode_texts([query])
+    
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Normalized float32 embeddings for a batch of queries"""
+        query_embeddings = self.query_encoder.encode(
+            texts,
+            batch_size=max(len(texts), 1),
+            convert_to_numpy=True
+        ).astype(np.float32)
+        self.faiss.normalize_L2(query_embeddings)
+        return query_embeddings
+    
+    def _mmr_rerank(
+        self,
+        snapshot: IndexSnapshot,
+        query_embedding: np.ndarray,
+        ranked: List[Tuple[int, float]],
+        top_k: int,
+        mmr_lambda: float
+    ) -> List[Tuple[int, float]]:
+        """
+        Diversify a candidate pool with MMR over the snapshot's stored embeddings
+        
+        Candidate vectors are gathered with one fancy-indexing call, so no
+        passage is re-encoded.
+        """
+        known = [(pid, score) for pid, score in ranked if pid in snapshot.id_to_row]
+        if len(known) <= 1:
+            return known[:top_k]
+        rows = np.fromiter((snapshot.id_to_row[pid] for pid, _ in known), dtype=np.int64, count=len(known))
+        order = mmr_select(query_embedding[0], snapshot.embeddings[rows], top_k, mmr_lambda)
+        return [known[i] for i in order]
+    
+    @staticmethod
+    def _cosine_scores(snapshot: IndexSnapshot, query_embedding: np.ndarray, ids: List[int]) -> np.ndarray:
+        """Query/passage cosine similarities from the snapshot's stored normalized embeddings"""
+        if not ids:
+            return np.empty(0, dtype=np.float32)
+        rows = np.fromiter((snapshot.id_to_row[pid] for pid in ids), dtype=np.int64, count=len(ids))
+        return snapshot.embeddings[rows] @ query_embedding[0]
+    
+    @staticmethod
+    def _allowed_set(allowed: Optional[np.ndarray]) -> Optional[set]:
+        return set(allowed.tolist()) if allowed is not None else None
+    
+    def _lexical_is_decisive(self, lexical: List[Tuple[int, float]], top_k: int) -> bool:
+        """
+        The k-th BM25 hit beats the next one by at least lexical_decisive_ratio
+        
+        With exactly top_k hits there is no next one to beat, and even a weak
+        one-term match would pass; the k-th score must then reach
+        lexical_decisive_score instead.
+        """
+        if not self.lexical_decisive_ratio or len(lexical) < top_k:
+            return False
+        kth = lexical[top_k - 1][1]
+        if len(lexical) == top_k:
+            return self.lexical_decisive_score is not None and kth >= self.lexical_decisive_score
+        return kth >= self.lexical_decisive_ratio * lexical[top_k][1]
+    
+    def embed_query(self, question: str) -> np.ndarray:
+        """
+        Query embedding as retrieval computes it (normalized, shape (1, d))
+        
+        Goes through the query LRU, so a search for the same question
+        afterwards reuses this vector instead of encoding again.
+        """
+        return self._encode_query(question)
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Normalized query-encoder embeddings for a batch of texts, shape (n, d)"""
+        return self._encode_texts(texts)
+    
+    def cached_answer(self, question: str, scope: str = "") -> Optional[Dict]:
+        """
+        Previously generated answer for a semantically equivalent question
+        
+        The question embedding goes through the query LRU, so the search that
+        follows a miss reuses it.
+        
+        Args:
+            question: User question
+            scope: cache_scope() of the settings the answer depends on
+            
+        Returns:
+            Cache entry ('answer', 'passages', 'scores', 'similarity', ...) or None
+        """
+        if self.answer_cache is None or not self.answer_cache.max_size:
+            return None
+        self.ensure_index()
+        snapshot = self._snapshot
+        entry = self.answer_cache.lookup(self._encode_query(question), scope, snapshot.version)
+        if entry:
+            logger.info(f"Answer cache hit ({entry['similarity']:.3f}) for: {question[:50]}")
+        return entry
+    
+    def store_answer(
+        self,
+        question: str,
+        answer: str,
+        passages: List[str],
+        scores: Optional[List[float]] = None,
+        scope: str = ""
+    ) -> None:
+        """Remember a generated answer for cached_answer()"""
+        if self.answer_cache is None or not self.answer_cache.max_size:
+            return
+        self.ensure_index()
+        self.answer_cache.store(
+            self._encode_query(question), scope, self._snapshot.version,
+            question, answer, passages, scores
+        )
+    
     def generate_answer(
         self,
         query: str,
@@ -238,7 +1474,9 @@ Please provide a thoughtful answer based on the Gita teachings:"""
         question: str,
         top_k: int = 3,
         max_tokens: int = 512,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        min_score: Optional[float] = None,
+        adaptive_k: bool = False
     ) -> Dict[str, any]:
         """
         Complete RAG pipeline: search + answer generation
@@ -248,29 +1486,51 @@ Please provide a thoughtful answer based on the Gita teachings:"""
             top_k: Number of passages to retrieve
             max_tokens: Max tokens for answer
             temperature: Sampling temperature
+            min_score: Minimum cosine similarity for a passage to be used
+            adaptive_k: Stop at the largest score gap within the top_k
             
         Returns:
-            Dict with retrieved passages and generated answer
+            Dict with retrieved passages, their scores and generated answer
         """
         if not question or not question.strip():
             raise ValueError("Question cannot be empty")
         
+        scope = cache_scope(top_k=top_k, max_tokens=max_tokens, min_score=min_score, adaptive_k=adaptive_k)
+        cached = self.cached_answer(question, scope)
+        if cached:
+            return {
+                "question": question,
+                "retrieved_passages": cached["passages"],
+                "scores": cached["scores"],
+                "answer": cached["answer"],
+                "passage_count": len(cached["passages"]),
+                "cached": True
+            }
+        
         # Search for relevant passages
-        retrieved = self.search_passages(question, top_k=top_k)
-        
-        # Generate answer
-        answer = self.generate_answer(
-            question,
-            retrieved,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
+        results = self.search_scored(question, top_k=top_k, min_score=min_score, adaptive_k=adaptive_k)
+        retrieved = [r["text"] for r in results]
+        
+        # Nothing cleared the threshold: don't pay for a generation call
+        if not retrieved:
+            answer = NO_RELEVANT_PASSAGES
+        else:
+            answer = self.generate_answer(
+                question,
+                retrieved,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            if answer != self._fallback_answer(retrieved):
+                self.store_answer(question, answer, retrieved, [r["score"] for r in results], scope)
         
         return {
             "question": question,
             "retrieved_passages": retrieved,
+            "scores": [r["score"] for r in results],
             "answer": answer,
-            "passage_count": len(retrieved)
+            "passage_count": len(retrieved),
+            "cached": False
         }
     
     def chat_mode(
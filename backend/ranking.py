@@ -0,0 +1,119 @@
+"""
+Ranking Helpers - Result fusion and diversification for the retrieval pipeline
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[int, float]]:
+    """
+    Fuse several ranked id lists with reciprocal-rank fusion
+
+    score(d) = sum_i weight_i / (k + rank_i(d)), ranks starting at 1.
+    Only ranks matter, so BM25 and cosine scores need no calibration.
+
+    Args:
+        rankings: Ranked id lists, best first
+        k: Damping constant (60 is the value from the original RRF paper)
+        weights: Optional per-ranking weights
+
+    Returns:
+        (id, fused_score) pairs, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Maximal-marginal-relevance selection over normalized embeddings
+
+    Relevance and pairwise redundancy come from two matrix products computed
+    once up front; each greedy step is then a vectorized max/argmax over
+    the candidate set.
+
+    Args:
+        query_vector: Normalized query embedding, shape (d,)
+        candidate_vectors: Normalized candidate embeddings, shape (n, d)
+        k: Number of candidates to select
+        lambda_mult: 1.0 = pure relevance, 0.0 = pure diversity
+
+    Returns:
+        Row indices into candidate_vectors, in selection order
+    """
+    n = candidate_vectors.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    relevance = candidate_vectors @ query_vector
+    similarity = candidate_vectors @ candidate_vectors.T
+
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of each candidate to anything already selected
+    max_sim = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, similarity[best], out=max_sim)
+
+    return selected
+
+
+def score_cutoff(
+    scores: Sequence[float],
+    min_score: Optional[float] = None,
+    adaptive: bool = False,
+    min_gap: float = 0.05
+) -> List[int]:
+    """
+    Positions of the results to keep
+
+    `min_score` drops every result below the threshold. Adaptive mode then
+    ranks the remaining scores high to low and cuts after the largest drop
+    between neighbours, provided that drop is at least `min_gap` (flat
+    score curves are kept whole). Scores need not arrive sorted: a fused
+    ranking can list a higher-scoring result after a lower one, and the
+    cut still keeps every result above the gap.
+
+    Args:
+        scores: Result scores in result order
+        min_score: Absolute cutoff (None disables)
+        adaptive: Cut at the largest score gap
+        min_gap: Smallest gap adaptive mode will cut at
+
+    Returns:
+        Kept positions, in result order
+    """
+    scores = np.asarray(scores, dtype=np.float32)
+    keep = np.arange(len(scores))
+    if min_score is not None:
+        keep = keep[scores >= min_score]
+    if adaptive and len(keep) > 1:
+        by_score = keep[np.argsort(-scores[keep], kind='stable')]
+        ranked_scores = scores[by_score]
+        gaps = ranked_scores[:-1] - ranked_scores[1:]
+        cut = int(np.argmax(gaps))
+        if gaps[cut] >= min_gap:
+            keep = np.sort(by_score[:cut + 1])
+    return keep.tolist()
@@ -0,0 +1,62 @@
+"""
+Test configuration - puts the backend modules on the import path
+The backend is run from its own directory (python main.py), so its modules
+import each other as top-level names. Engine tests encode with a hashing
+stand-in for the sentence-transformers model, so they need no download
+"""
+import os
+import sys
+import hashlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIM = 64
+
+
+class HashingEncoder:
+    """Bag-of-words hashing stand-in for a SentenceTransformer model"""
+
+    def __init__(self, model_name, device=None):
+        self.max_seq_length = 256
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.md5(word.strip('.,:;!?').encode('utf-8')).digest()
+                vectors[row, int.from_bytes(digest[:4], 'little') % DIM] += 1.0
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9
+        return vectors
+
+
+@pytest.fixture
+def engine_factory(tmp_path, monkeypatch):
+    """make(passages, index_type='flat', **kwargs): engine over a corpus file in tmp_path"""
+    pytest.importorskip("faiss")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    pytest.importorskip("google.generativeai")
+    from rag_engine import BhagavadGitaRAGEngine
+
+    monkeypatch.setattr(sentence_transformers, "SentenceTransformer", HashingEncoder)
+    corpus = tmp_path / "corpus.txt"
+
+    def make(passages, index_type='flat', **kwargs):
+        corpus.write_text("\n\n".join(passages) + "\n", encoding="utf-8")
+        return BhagavadGitaRAGEngine(
+            corpus_path=str(corpus),
+            use_gemini=False,
+            index_path=str(tmp_path / "faiss_index.faiss"),
+            index_type=index_type,
+            index_params={'nlist': 2},
+            encoder_max_wait_ms=0,
+            query_cache_size=0,
+            **kwargs
+        )
+    return make
@@ -0,0 +1,23 @@
+"""
+ANN index construction - id mapping across removals
+"""
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+import ann_index
+
+
+def test_ivf_ids_stay_correct_after_remove_then_add():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((64, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = ann_index.build_index(faiss, vectors[:48], 'ivf', {'nlist': 4, 'nprobe': 4})
+
+    index.remove_ids(np.arange(0, 48, 3, dtype=np.int64))
+    index.add_with_ids(vectors[48:], np.arange(48, 64, dtype=np.int64))
+
+    assert ann_index.supports_removal(faiss, index)
+    _, found = index.search(vectors[48:], 1)
+    assert found[:, 0].tolist() == list(range(48, 64))
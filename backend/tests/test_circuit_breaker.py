@@ -0,0 +1,90 @@
+"""
+Circuit breaker - availability from real call outcomes
+"""
+import time
+import threading
+
+from circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(lambda: False, failure_threshold=3, probe_interval=60)
+    try:
+        breaker.record_failure("timeout")
+        breaker.record_failure("timeout")
+        assert breaker.available
+
+        breaker.record_failure("timeout")
+
+        assert not breaker.available
+        stats = breaker.stats()
+        assert stats["trips"] == 1
+        assert stats["probing"]
+        assert stats["last_error"] == "timeout"
+    finally:
+        breaker.stop()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(lambda: False, failure_threshold=2, probe_interval=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.available
+    assert breaker.stats()["consecutive_failures"] == 1
+
+
+def test_success_closes_an_open_circuit():
+    breaker = CircuitBreaker(lambda: False, failure_threshold=1, probe_interval=60)
+    try:
+        breaker.record_failure()
+        assert not breaker.available
+
+        breaker.record_success()
+
+        assert breaker.available
+        assert breaker.stats()["consecutive_failures"] == 0
+    finally:
+        breaker.stop()
+
+
+def test_prober_closes_the_circuit_when_the_service_answers():
+    answered = threading.Event()
+
+    def probe():
+        answered.set()
+        return True
+
+    breaker = CircuitBreaker(probe, failure_threshold=1, probe_interval=0.01)
+    try:
+        breaker.record_failure()
+        assert answered.wait(5)
+        for _ in range(500):
+            if breaker.available and not breaker.stats()["probing"]:
+                break
+            time.sleep(0.01)
+
+        assert breaker.available
+        assert breaker.stats()["probes"] >= 1
+        assert not breaker.stats()["probing"]
+    finally:
+        breaker.stop()
+
+
+def test_prober_keeps_the_circuit_open_while_probes_fail():
+    probed = threading.Semaphore(0)
+
+    def probe():
+        probed.release()
+        raise ConnectionError("refused")
+
+    breaker = CircuitBreaker(probe, failure_threshold=1, probe_interval=0.01, max_probe_interval=0.02)
+    try:
+        breaker.record_failure()
+        assert probed.acquire(timeout=5) and probed.acquire(timeout=5)
+
+        assert not breaker.available
+        assert breaker.stats()["last_error"] == "refused"
+    finally:
+        breaker.stop()
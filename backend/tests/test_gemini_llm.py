@@ -0,0 +1,100 @@
+"""
+Gemini client - which errors count toward opening the circuit
+"""
+import types
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+google_exceptions = pytest.importorskip("google.api_core.exceptions")
+
+import gemini_llm
+from gemini_llm import GeminiLLMClient
+
+
+class FakeModel:
+    """GenerativeModel whose calls raise the queued errors, then answer"""
+
+    errors = []
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, prompt, **kwargs):
+        if FakeModel.errors:
+            raise FakeModel.errors.pop(0)
+        return types.SimpleNamespace(text="answer")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(gemini_llm.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(gemini_llm.genai, "GenerativeModel", FakeModel)
+    monkeypatch.setattr(gemini_llm.genai, "list_models", lambda: [])
+    monkeypatch.setattr(FakeModel, "errors", [])
+    client = GeminiLLMClient(api_key="test-key", failure_threshold=2, probe_interval=60)
+    yield client
+    client.breaker.stop()
+
+
+def fail_with(error, times=1):
+    FakeModel.errors.extend(error for _ in range(times))
+
+
+def test_outages_open_the_circuit(client):
+    fail_with(google_exceptions.ServiceUnavailable("down"), times=2)
+
+    for _ in range(2):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            client.generate("question")
+
+    assert not client.is_available()
+
+
+def test_rate_limits_and_connection_errors_are_outages(client):
+    fail_with(google_exceptions.ResourceExhausted("quota"))
+    fail_with(ConnectionError("reset"))
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        client.generate("question")
+    with pytest.raises(ConnectionError):
+        client.chat([{"role": "user", "content": "question"}])
+
+    assert not client.is_available()
+
+
+def test_refused_requests_do_not_count(client):
+    fail_with(google_exceptions.InvalidArgument("bad prompt"), times=5)
+
+    for _ in range(5):
+        with pytest.raises(google_exceptions.InvalidArgument):
+            client.generate("question")
+
+    assert client.is_available()
+    assert client.breaker_stats()["failures"] == 0
+
+
+def test_success_between_outages_keeps_the_circuit_closed(client):
+    fail_with(google_exceptions.ServiceUnavailable("down"))
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        client.generate("question")
+
+    assert client.generate("question") == "answer"
+    fail_with(google_exceptions.ServiceUnavailable("down"))
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        client.generate("question")
+
+    assert client.is_available()
+
+
+def test_check_records_only_outages(client):
+    fail_with(google_exceptions.InvalidArgument("bad key"))
+    assert not client.check()
+    assert client.breaker_stats()["failures"] == 0
+
+    fail_with(google_exceptions.ServiceUnavailable("down"))
+    assert not client.check()
+    assert client.breaker_stats()["failures"] == 1
+
+    assert client.check()
+    assert client.breaker_stats()["consecutive_failures"] == 0
@@ -0,0 +1,139 @@
+"""
+Incremental passage edits - add/update/remove without a rebuild
+Edits must show up in search at once and survive a reload from the snapshot
+store (full snapshot plus journaled deltas)
+"""
+import time
+import functools
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("google.generativeai")
+
+import index_store
+
+CORPUS = [
+    "Chapter 2, Verse 47:\nYou have a right to perform your prescribed duty, but never to the fruits of action.",
+    "Chapter 2, Verse 20:\nThe soul is never born and never dies; it is unborn, eternal and primeval.",
+    "Chapter 6, Verse 5:\nOne must elevate oneself by one's own mind, not degrade oneself.",
+    "Chapter 18, Verse 66:\nAbandon all varieties of religion and just surrender unto me.",
+]
+
+
+@pytest.fixture
+def make_engine(engine_factory):
+    return functools.partial(engine_factory, CORPUS)
+
+
+def reloaded(make, index_type='flat'):
+    engine = make(index_type)
+    assert engine.load_index()
+    return engine
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf', 'hnsw'])
+def test_add_is_searchable_and_persisted(make_engine, index_type):
+    engine = make_engine(index_type)
+    engine.build_embeddings_index()
+
+    [passage_id] = engine.add_passages(["Chapter 3, Verse 8:\nPerform your duty, for action is better than inaction."])
+
+    assert engine.snapshot.has_passage(passage_id)
+    assert "inaction" in engine.search_passages("action better than inaction", top_k=1)[0]
+    again = reloaded(make_engine, index_type)
+    assert again.snapshot.version == engine.snapshot.version
+    assert again.snapshot.id_to_text == engine.snapshot.id_to_text
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf', 'hnsw'])
+def test_update_keeps_id_and_replaces_text(make_engine, index_type):
+    engine = make_engine(index_type)
+    engine.build_embeddings_index()
+    passage_id = engine.snapshot.passages[0]["id"]
+
+    assert engine.update_passage(passage_id, "Chapter 2, Verse 47:\nWork without attachment to results.") == passage_id
+
+    snapshot = engine.snapshot
+    assert snapshot.passage_count == len(CORPUS)
+    assert "attachment" in snapshot.id_to_text[passage_id]
+    assert "attachment" in engine.search_passages("without attachment to results", top_k=1)[0]
+    assert reloaded(make_engine, index_type).snapshot.id_to_text == snapshot.id_to_text
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf', 'hnsw'])
+def test_remove_drops_passage_from_search(make_engine, index_type):
+    engine = make_engine(index_type)
+    engine.build_embeddings_index()
+    passage_id = next(p["id"] for p in engine.snapshot.passages if "surrender" in p["text"])
+
+    assert engine.remove_passages([passage_id]) == 1
+
+    assert not engine.snapshot.has_passage(passage_id)
+    assert all("surrender" not in text for text in engine.search_passages("surrender unto me", top_k=len(CORPUS)))
+    assert not reloaded(make_engine, index_type).snapshot.has_passage(passage_id)
+
+
+def test_unknown_ids_raise_key_error(make_engine):
+    engine = make_engine()
+    engine.build_embeddings_index()
+    version = engine.snapshot.version
+
+    with pytest.raises(KeyError):
+        engine.remove_passages([12345])
+    with pytest.raises(KeyError):
+        engine.update_passage(12345, "Some new text.")
+    assert engine.snapshot.version == version
+
+
+def test_edits_are_journaled_then_compacted(make_engine):
+    engine = make_engine(compact_after_edits=2)
+    engine.build_embeddings_index()
+    built = engine.snapshot.version
+    store = engine.snapshot_store
+
+    engine.add_passages(["Chapter 4, Verse 7:\nWhenever there is a decline in righteousness, I manifest myself."])
+    assert not store.is_full(engine.snapshot.version)
+    assert store.resolve(engine.snapshot.version)[0] == built
+
+    engine.add_passages(["Chapter 9, Verse 22:\nTo those who worship me with devotion, I carry what they lack."])
+    deadline = time.time() + 30
+    while not store.is_full(engine.snapshot.version) and time.time() < deadline:
+        time.sleep(0.05)
+    assert store.is_full(engine.snapshot.version)
+    assert reloaded(make_engine).snapshot.id_to_text == engine.snapshot.id_to_text
+
+
+def test_rollback_restores_previous_version(make_engine):
+    engine = make_engine()
+    engine.build_embeddings_index()
+    before = engine.snapshot
+    engine.add_passages(["Chapter 4, Verse 7:\nWhenever there is a decline in righteousness, I manifest myself."])
+
+    restored = engine.rollback(before.version)
+
+    assert restored.id_to_text == before.id_to_text
+    assert reloaded(make_engine).snapshot.id_to_text == before.id_to_text
+
+
+
+def test_edits_do_not_rehash_the_corpus(make_engine, monkeypatch):
+    engine = make_engine()
+    engine.build_embeddings_index()
+    digest = engine.snapshot.manifest["corpus_sha256"]
+    hashed = []
+    fingerprint = index_store.corpus_fingerprint
+
+    def counting_fingerprint(*args, **kwargs):
+        hashed.append(args)
+        return fingerprint(*args, **kwargs)
+    monkeypatch.setattr(index_store, "corpus_fingerprint", counting_fingerprint)
+
+    [passage_id] = engine.add_passages(["Chapter 4, Verse 7:\nWhenever there is a decline in righteousness, I manifest myself."])
+    engine.update_passage(passage_id, "Chapter 4, Verse 8:\nTo protect the good I appear age after age.")
+    engine.remove_passages([passage_id])
+
+    assert hashed == []
+    assert engine.snapshot.manifest["corpus_sha256"] == digest
+    assert reloaded(make_engine).snapshot.version == engine.snapshot.version
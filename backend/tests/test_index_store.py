@@ -0,0 +1,160 @@
+"""
+Snapshot store - full snapshots, journaled deltas and pruning
+"""
+import json
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+import ann_index
+import index_store
+from index_store import IndexSnapshot, SnapshotDelta, SnapshotStore, apply_deltas
+
+DIM = 8
+
+
+def vectors(count, seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((count, DIM)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def make_snapshot(version, passages, embeddings, **manifest):
+    ids = np.array([p["id"] for p in passages], dtype=np.int64)
+    index = ann_index.build_index(faiss, embeddings, 'flat', ids=ids)
+    manifest = index_store.new_manifest(count=len(passages), next_passage_id=int(ids.max()) + 1, **manifest)
+    return IndexSnapshot(version, index, embeddings, passages, manifest)
+
+
+def base_snapshot(version="v000001"):
+    passages = [{"id": i, "text": f"passage number {i}"} for i in range(4)]
+    return make_snapshot(version, passages, vectors(4, seed=1))
+
+
+def add_delta(record_id, seed):
+    return SnapshotDelta(
+        "add",
+        records=({"id": record_id, "text": f"added passage {record_id}"},),
+        embeddings=vectors(1, seed),
+        next_passage_id=record_id + 1
+    )
+
+
+def test_delta_round_trips_through_json():
+    delta = SnapshotDelta(
+        "update",
+        records=({"id": 2, "text": "new text"},),
+        embeddings=vectors(1, seed=3),
+        removed_ids=(2, 7),
+        parents=({"id": 9, "text": "parent"},),
+        removed_parents=(9,),
+        next_passage_id=10
+    )
+
+    restored = SnapshotDelta.from_dict(json.loads(json.dumps(delta.to_dict())))
+
+    assert restored._replace(embeddings=None) == delta._replace(embeddings=None)
+    assert np.array_equal(restored.embeddings, delta.embeddings)
+
+
+def test_apply_deltas_replaces_in_place_and_appends():
+    snapshot = base_snapshot()
+    update = SnapshotDelta(
+        "update", records=({"id": 1, "text": "edited"},), embeddings=vectors(1, seed=5), removed_ids=(1,)
+    )
+    remove = SnapshotDelta("remove", removed_ids=(2,))
+
+    applied = apply_deltas(snapshot, [add_delta(4, seed=4), update, remove])
+
+    assert [p["id"] for p in applied.passages] == [0, 1, 3, 4]
+    assert applied.passages[1]["text"] == "edited"
+    assert np.array_equal(applied.embeddings[1], update.embeddings[0])
+    assert np.array_equal(applied.embeddings[2], snapshot.embeddings[3])
+    assert [p["id"] for p in applied.added] == [1, 4]
+    assert [p["id"] for p in applied.removed] == [1, 2]
+    assert applied.next_passage_id == 5
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+    snapshot = base_snapshot()
+    store.save(faiss, snapshot)
+    store.set_current(snapshot.version)
+
+    loaded = store.load(faiss, store.current_version())
+
+    assert loaded.passages == snapshot.passages
+    assert np.array_equal(np.asarray(loaded.embeddings), snapshot.embeddings)
+    assert loaded.index.ntotal == len(snapshot)
+
+
+def test_load_rejects_stale_manifest(tmp_path):
+    store = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+    snapshot = make_snapshot("v000001", base_snapshot().passages, vectors(4, seed=1), corpus_sha256="abc")
+    store.save(faiss, snapshot)
+
+    assert store.load(faiss, "v000001", expected={"corpus_sha256": "abc"}) is not None
+    assert store.load(faiss, "v000001", expected={"corpus_sha256": "def"}) is None
+
+
+def test_journaled_versions_resolve_to_their_base(tmp_path):
+    store = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+    store.save(faiss, base_snapshot())
+    store.append_delta("v000002", "v000001", index_store.new_manifest(count=5), add_delta(4, seed=4))
+    store.append_delta("v000003", "v000002", index_store.new_manifest(count=6), add_delta(5, seed=5))
+
+    # A fresh store reads the chain back from the journal
+    reopened = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+    base, chain = reopened.resolve("v000003")
+
+    assert base == "v000001"
+    assert [version for version, _, _ in chain] == ["v000002", "v000003"]
+    assert reopened.delta_depth("v000003") == 2
+    assert reopened.read_manifest("v000003")["count"] == 6
+    assert reopened.versions() == ["v000001", "v000002", "v000003"]
+    applied = apply_deltas(reopened.load(faiss, base), [delta for _, _, delta in chain])
+    assert [p["id"] for p in applied.passages] == [0, 1, 2, 3, 4, 5]
+    assert reopened.resolve("v000009") is None
+
+
+def test_partial_journal_line_is_dropped(tmp_path):
+    store = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+    store.save(faiss, base_snapshot())
+    store.append_delta("v000002", "v000001", index_store.new_manifest(count=5), add_delta(4, seed=4))
+    journal = tmp_path / "faiss_index_snapshots" / SnapshotStore.JOURNAL_FILE
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"version": "v000003", "par')
+
+    reopened = SnapshotStore(str(tmp_path / "faiss_index.faiss"))
+
+    assert reopened.versions() == ["v000001", "v000002"]
+    reopened.append_delta("v000003", "v000002", index_store.new_manifest(count=6), add_delta(5, seed=5))
+    assert SnapshotStore(str(tmp_path / "faiss_index.faiss")).resolve("v000003")[0] == "v000001"
+
+
+def test_prune_keeps_the_chain_of_retained_versions(tmp_path):
+    store = SnapshotStore(str(tmp_path / "faiss_index.faiss"), keep=2)
+    store.save(faiss, base_snapshot("v000001"))
+    for number in range(2, 5):
+        store.append_delta(
+            index_store.format_version(number), index_store.format_version(number - 1),
+            index_store.new_manifest(count=3 + number), add_delta(2 + number, seed=number)
+        )
+    store.save(faiss, base_snapshot("v000005"))
+    store.append_delta("v000006", "v000005", index_store.new_manifest(count=5), add_delta(4, seed=6))
+    store.set_current("v000004")
+
+    store.prune()
+
+    # v000004 is current and replays from v000001; v000006 is the newest other version
+    assert store.versions() == ["v000001", "v000002", "v000003", "v000004", "v000005", "v000006"]
+
+    store.set_current("v000006")
+    store.prune()
+
+    assert store.versions() == ["v000005", "v000006"]
+    assert not (tmp_path / "faiss_index_snapshots" / "v000001").exists()
+    journal = (tmp_path / "faiss_index_snapshots" / SnapshotStore.JOURNAL_FILE).read_text(encoding='utf-8')
+    assert [json.loads(line)["version"] for line in journal.splitlines()] == ["v000006"]
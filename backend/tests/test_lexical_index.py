@@ -0,0 +1,61 @@
+"""
+Lexical index - BM25 ranking and copy-on-write updates
+"""
+from lexical_index import BM25Index, tokenize
+
+PASSAGES = [
+    {"id": 0, "text": "The soul is eternal and is never born."},
+    {"id": 1, "text": "Perform your duty without attachment to the fruits of action."},
+    {"id": 2, "text": "Action is better than inaction; perform your duty."},
+    {"id": 3, "text": "At Kurukshetra the armies stood ready for battle."},
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What does the Gita say about Duty, Arjuna?") == ["gita", "duty", "arjuna"]
+
+
+def test_search_ranks_by_bm25():
+    index = BM25Index.build(PASSAGES)
+
+    ranked = index.search("duty inaction", top_k=10)
+
+    assert [pid for pid, _ in ranked] == [2, 1]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_rare_term_outweighs_common_one():
+    index = BM25Index.build(PASSAGES)
+
+    assert index.search("kurukshetra duty", top_k=1)[0][0] == 3
+
+
+def test_search_only_returns_matching_passages():
+    index = BM25Index.build(PASSAGES)
+
+    assert index.search("krishna", top_k=10) == []
+    assert [pid for pid, _ in index.search("duty", top_k=10, allowed={1, 3})] == [1]
+
+
+def test_updated_matches_a_rebuild_and_leaves_the_original_alone():
+    index = BM25Index.build(PASSAGES)
+    before = index.search("duty", top_k=10)
+    added = {"id": 4, "text": "Surrender every duty unto me."}
+    edited = {"id": 2, "text": "Steady wisdom brings peace."}
+
+    updated = index.updated(added=[added, edited], removed=[PASSAGES[2]])
+
+    rebuilt = BM25Index.build([PASSAGES[0], PASSAGES[1], edited, PASSAGES[3], added])
+    assert updated.to_dict() == rebuilt.to_dict()
+    assert updated.search("duty", top_k=10) == rebuilt.search("duty", top_k=10)
+    assert index.search("duty", top_k=10) == before
+    assert index.search("wisdom", top_k=10) == []
+
+
+def test_round_trips_through_dict():
+    index = BM25Index.build(PASSAGES)
+
+    restored = BM25Index.from_dict(index.to_dict())
+
+    assert len(restored) == len(index)
+    assert restored.search("duty action", top_k=10) == index.search("duty action", top_k=10)
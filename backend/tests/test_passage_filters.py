@@ -0,0 +1,45 @@
+"""
+Passage filters - metadata conditions for filtered search
+"""
+import pytest
+
+from passage_filters import PassageFilter, metadata_columns
+
+PASSAGES = [
+    {"id": 0, "text": "...", "chapter": 1, "verse": 1, "speaker": "Dhritarashtra"},
+    {"id": 1, "text": "...", "chapter": 2, "verse": 11, "speaker": "Krishna"},
+    {"id": 2, "text": "...", "chapter": 2, "verse": 47},
+    {"id": 3, "text": "...", "chapter": 11, "verse": 15, "speaker": "Arjuna"},
+    {"id": 4, "text": "A passage without a header."},
+]
+
+
+@pytest.mark.parametrize("filters, ids", [
+    ({"chapters": [2]}, [1, 2]),
+    ({"chapter_range": [2, 11]}, [1, 2, 3]),
+    ({"verse_range": [10, 20]}, [1, 3]),
+    ({"speaker": "the Blessed Lord"}, [1]),
+    ({"chapters": [1, 2], "verse_range": [1, 11]}, [0, 1]),
+])
+def test_mask_and_matches_agree(filters, ids):
+    passage_filter = PassageFilter.from_dict(filters)
+
+    mask = passage_filter.mask(metadata_columns(PASSAGES))
+
+    assert [p["id"] for p, keep in zip(PASSAGES, mask) if keep] == ids
+    assert [p["id"] for p in PASSAGES if passage_filter.matches(p)] == ids
+
+
+def test_empty_filters_are_none():
+    assert PassageFilter.from_dict(None) is None
+    assert PassageFilter.from_dict({"chapters": [], "speaker": " "}) is None
+
+
+@pytest.mark.parametrize("filters", [
+    {"book": 2},
+    {"chapter_range": [5, 2]},
+    {"verse_range": [1]},
+])
+def test_invalid_filters_raise(filters):
+    with pytest.raises(ValueError):
+        PassageFilter.from_dict(filters)
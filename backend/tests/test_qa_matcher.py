@@ -0,0 +1,47 @@
+"""
+Pretrained Q&A matching - typo correction of keyword words
+"""
+import pytest
+
+from app.qa_matcher import TypoIndex
+
+
+@pytest.fixture
+def typos():
+    return TypoIndex(
+        ['anxiety', 'anger', 'attachment', 'depression', 'meditation'],
+        known_words=['angel']
+    )
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("anxeity", ("anxiety", 1)),          # transposition
+    ("anget", ("anger", 1)),              # substitution
+    ("depresion", ("depression", 1)),     # deletion
+    ("attachmnet", ("attachment", 1)),
+    ("medtaton", ("meditation", 2)),      # two edits from eight letters on
+])
+def test_corrects_misspellings(typos, word, expected):
+    assert typos.correct(word) == expected
+
+
+@pytest.mark.parametrize("word", [
+    "anxiety",      # already a keyword word
+    "angel",        # a known word one edit from "anger"
+    "angr",         # shorter than min_length
+    "xnxiety",      # the first letter never changes
+    "anegx",        # two edits on a short word
+    "calm",
+])
+def test_leaves_other_words_alone(typos, word):
+    assert typos.correct(word) is None
+
+
+def test_tie_between_topics_is_ambiguous():
+    assert TypoIndex(['anger', 'angst']).correct('angsr') is None
+
+
+def test_tie_within_a_topic_takes_the_first_word():
+    typos = TypoIndex(['anger', 'angst'], groups={'anger': 'anger', 'angst': 'anger'})
+
+    assert typos.correct('angsr') == ('anger', 1)
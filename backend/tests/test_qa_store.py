@@ -0,0 +1,111 @@
+"""
+Pretrained Q&A store - validation and hot reload of the JSON table
+"""
+import json
+import os
+
+import pytest
+
+from app.qa_store import PretrainedStore, load_table
+
+KARMA = {"keyword": "karma", "answer": "Act without attachment.", "phrases": ["karma"]}
+PEACE = {"keyword": "peace", "answer": "Peace comes from a steady mind.", "phrases": ["peace", "calm"]}
+
+_writes = 0
+
+
+def write_table(path, entries, **extra):
+    """Write a table and move its mtime forward, so a same-size edit is still seen as a change"""
+    global _writes
+    _writes += 1
+    path.write_text(json.dumps({"entries": entries, **extra}), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + _writes * 1_000_000_000))
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = tmp_path / "pretrained_qa.json"
+    write_table(path, [KARMA])
+    return path
+
+
+def test_load_table_reports_the_bad_entry(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps([KARMA, {"keyword": "peace", "answer": "..."}]), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="entry 1"):
+        load_table(str(path))
+
+
+def test_load_table_accepts_a_bare_list(tmp_path):
+    path = tmp_path / "list.json"
+    path.write_text(json.dumps([KARMA]), encoding="utf-8")
+
+    table, version = load_table(str(path))
+
+    assert table == {"entries": [KARMA], "known_words": []}
+    assert version
+
+
+def test_reload_publishes_an_edited_table(table_path):
+    store = PretrainedStore(str(table_path))
+    before = store.current
+    assert store.reload()["status"] == "unchanged"
+
+    write_table(table_path, [KARMA, PEACE])
+    result = store.reload()
+
+    assert result["status"] == "reloaded"
+    assert result["entries"] == 2
+    assert store.current is not before
+    assert store.current.keywords() == ["karma", "peace"]
+    assert store.current.answer(store.current.match("how do I find calm")[0]) == PEACE["answer"]
+    # A request holding the old version keeps a consistent view of it
+    assert before.match("how do I find calm")[0] is None
+    assert store.reloads == 1
+
+
+def test_invalid_table_keeps_the_current_version(table_path):
+    store = PretrainedStore(str(table_path))
+    before = store.current
+
+    table_path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        store.reload()
+
+    assert store.current is before
+    # The rejected file is reported once, not on every poll
+    assert store.reload()["status"] == "unchanged"
+
+    write_table(table_path, [PEACE])
+    assert store.reload()["status"] == "reloaded"
+    assert store.current.keywords() == ["peace"]
+
+
+def test_preparers_run_before_publishing(table_path):
+    store = PretrainedStore(str(table_path))
+    prepared = []
+    store.add_preparer(lambda candidate: prepared.append((candidate, store.current)))
+
+    write_table(table_path, [PEACE])
+    store.reload()
+
+    [(candidate, live_while_preparing)] = prepared
+    assert candidate is store.current
+    assert live_while_preparing is not candidate
+
+
+def test_failed_preparer_keeps_the_current_version(table_path):
+    store = PretrainedStore(str(table_path))
+    before = store.current
+
+    def fail(candidate):
+        raise RuntimeError("encoder unavailable")
+    store.add_preparer(fail)
+
+    write_table(table_path, [PEACE])
+    with pytest.raises(RuntimeError):
+        store.reload()
+
+    assert store.current is before
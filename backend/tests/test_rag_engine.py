@@ -0,0 +1,85 @@
+"""
+Retrieval pipeline - hybrid ranking, score cutoffs and the lexical short-circuit
+"""
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("google.generativeai")
+
+# Short verses whose fused (RRF) order differs from their cosine order for "soul eternal"
+VERSES = [
+    "battle duty action death mind yoga.",
+    "karma action soul battle.",
+    "devotion birth soul.",
+    "arjuna peace duty arjuna wisdom karma arjuna arjuna.",
+    "peace battle battle desire yoga self.",
+    "birth devotion peace devotion death arjuna yoga soul battle.",
+    "battle eternal battle.",
+    "wisdom fruit fruit battle fruit body peace devotion battle arjuna dharma.",
+    "dharma body arjuna birth.",
+    "death self mind wisdom yoga fruit wisdom body arjuna peace desire.",
+    "eternal self soul wisdom self duty dharma devotion arjuna.",
+    "devotion duty self peace battle body karma dharma desire yoga battle self.",
+]
+CORPUS = [f"Chapter 2, Verse {number}:\n{text}" for number, text in enumerate(VERSES, start=1)]
+
+
+@pytest.fixture
+def engine(engine_factory):
+    engine = engine_factory(CORPUS, dedup_threshold=None)
+    engine.build_embeddings_index()
+    return engine
+
+
+def test_hybrid_adaptive_k_keeps_every_result_above_the_cut(engine):
+    ranked = engine.search_scored("soul eternal", top_k=5, mode='hybrid', min_score=-1.0)
+    scores = [r["score"] for r in ranked]
+    assert scores != sorted(scores, reverse=True)
+
+    kept = engine.search_scored("soul eternal", top_k=5, mode='hybrid', adaptive_k=True)
+
+    kept_ids = {r["id"] for r in kept}
+    dropped = [r["score"] for r in ranked if r["id"] not in kept_ids]
+    assert max(scores) in [r["score"] for r in kept]
+    assert min(r["score"] for r in kept) > max(dropped)
+    # Kept results stay in the fused order
+    assert [r["id"] for r in kept] == [r["id"] for r in ranked if r["id"] in kept_ids]
+
+
+def test_dense_adaptive_k_keeps_the_head(engine):
+    ranked = engine.search_scored("soul eternal", top_k=5, mode='dense', min_score=-1.0)
+
+    kept = engine.search_scored("soul eternal", top_k=5, mode='dense', adaptive_k=True)
+
+    assert [r["id"] for r in kept] == [r["id"] for r in ranked[:len(kept)]]
+
+
+def test_lexical_short_circuit_needs_a_runner_up(engine):
+    # "eternal" appears in exactly two verses: with top_k=2 nothing ranks below them
+    assert len(engine.snapshot.lexical.search("eternal", 20)) == 2
+
+    _, lexical_only = engine._hybrid_search(engine.snapshot, "eternal", 2)
+
+    assert not lexical_only
+
+
+def test_lexical_short_circuit_with_a_score_floor(engine):
+    engine.lexical_decisive_score = 0.1
+
+    ranked, lexical_only = engine._hybrid_search(engine.snapshot, "eternal", 2)
+
+    assert lexical_only
+    assert len(ranked) == 2
+
+
+@pytest.mark.parametrize("scores, decisive", [
+    ([5.0, 4.0, 1.0], True),         # k-th hit at least twice the next
+    ([5.0, 4.0, 3.0], False),
+    ([5.0, 0.3], False),             # exactly top_k hits and no floor
+    ([5.0], False),                  # fewer hits than top_k
+])
+def test_lexical_is_decisive(engine, scores, decisive):
+    lexical = list(enumerate(scores))
+
+    assert engine._lexical_is_decisive(lexical, 2) is decisive
@@ -0,0 +1,75 @@
+"""
+Ranking helpers - fusion, diversification and score cutoffs
+"""
+import numpy as np
+import pytest
+
+from ranking import mmr_select, reciprocal_rank_fusion, score_cutoff
+
+
+def test_score_cutoff_drops_results_below_min_score():
+    assert score_cutoff([0.9, 0.4, 0.7, 0.2], min_score=0.5) == [0, 2]
+
+
+def test_adaptive_cut_at_the_largest_gap():
+    assert score_cutoff([0.9, 0.85, 0.5, 0.45], adaptive=True) == [0, 1]
+
+
+def test_adaptive_keeps_a_flat_curve_whole():
+    assert score_cutoff([0.5, 0.48, 0.46, 0.44], adaptive=True, min_gap=0.05) == [0, 1, 2, 3]
+
+
+def test_adaptive_cut_on_unsorted_scores_keeps_result_order():
+    # A fused ranking can list the best cosine match last
+    assert score_cutoff([0.343, 0.2265, 0.1839, 0.1187, 0.381], adaptive=True) == [0, 4]
+
+
+def test_adaptive_cut_after_min_score():
+    assert score_cutoff([0.2, 0.9, 0.6, 0.85], min_score=0.5, adaptive=True) == [1, 3]
+
+
+def test_score_cutoff_of_nothing():
+    assert score_cutoff([], min_score=0.5, adaptive=True) == []
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_rrf_breaks_ties_by_id():
+    assert [doc_id for doc_id, _ in reciprocal_rank_fusion([[5, 7], [7, 5]])] == [5, 7]
+
+
+def test_rrf_weights():
+    fused = reciprocal_rank_fusion([[1, 2], [2, 1]], weights=[1.0, 3.0])
+
+    assert [doc_id for doc_id, _ in fused] == [2, 1]
+
+
+def unit(*rows):
+    matrix = np.array(rows, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_mmr_with_lambda_one_is_relevance_order():
+    query = unit([1.0, 0.0, 0.0])[0]
+    candidates = unit([0.5, 1.0, 0.0], [1.0, 0.1, 0.0], [1.0, 0.0, 1.0])
+
+    assert mmr_select(query, candidates, 3, lambda_mult=1.0) == [1, 2, 0]
+
+
+def test_mmr_skips_near_duplicates():
+    query = unit([1.0, 0.0, 0.0])[0]
+    candidates = unit([1.0, 0.1, 0.0], [1.0, 0.11, 0.0], [1.0, 0.0, 1.0])
+
+    assert mmr_select(query, candidates, 2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_returns_at_most_the_candidates():
+    query = unit([1.0, 0.0])[0]
+
+    assert mmr_select(query, unit([1.0, 0.0]), 5) == [0]
+    assert mmr_select(query, np.zeros((0, 2), dtype=np.float32), 3) == []
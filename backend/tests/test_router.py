@@ -0,0 +1,100 @@
+"""
+Query router - route order and counters
+"""
+import json
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from app import router
+from app.qa_matcher import IntentMatch
+from app.qa_store import PretrainedStore
+from app.router import QueryRouter
+
+TABLE = {"entries": [
+    {"keyword": "anxiety", "answer": "Fix your mind on the work, not the outcome.", "phrases": ["anxiety", "anxious"]},
+    {"keyword": "grief", "answer": "The wise grieve neither for the living nor the dead.", "phrases": ["grief"]},
+]}
+VERSE = {"id": 7, "text": "Chapter 2, Verse 47:\nYou have a right to perform your prescribed duty."}
+
+
+@pytest.fixture(autouse=True)
+def qa_store(tmp_path, monkeypatch):
+    path = tmp_path / "pretrained_qa.json"
+    path.write_text(json.dumps(TABLE), encoding="utf-8")
+    monkeypatch.setattr(router, "QA_STORE", PretrainedStore(str(path)))
+
+
+def lookup_verses(question):
+    return [VERSE]
+
+
+def no_intent(question, pretrained):
+    return None
+
+
+@pytest.mark.parametrize("question, route", [
+    ("hello, I have anxiety", 'greeting'),
+    ("2.47", 'verse_lookup'),
+    ("show me BG 2.47", 'verse_lookup'),
+    ("what does 2.47 say about anxiety?", 'rag'),
+    ("I feel anxious", 'pretrained'),
+    ("I feel anxeity", 'pretrained_fuzzy'),
+    ("what is dharma", 'rag'),
+])
+def test_route_order(question, route):
+    assert QueryRouter().route(question, lookup_verses, no_intent).route == route
+
+
+def test_question_about_a_verse_carries_it_as_context():
+    decision = QueryRouter().route("what does 2.47 say about duty?", lookup_verses)
+
+    assert decision.needs_llm
+    assert decision.answer is None
+    assert decision.verses == (VERSE,)
+
+
+def test_verse_route_needs_a_lookup():
+    assert QueryRouter().route("2.47").route == 'rag'
+
+
+def test_semantic_route_only_without_a_keyword():
+    intents = []
+
+    def match_intent(question, pretrained):
+        intents.append(question)
+        return IntentMatch(1, "grief", 0.8)
+
+    query_router = QueryRouter()
+    assert query_router.route("I feel anxious", match_intent=match_intent).route == 'pretrained'
+    decision = query_router.route("my father passed away", match_intent=match_intent)
+
+    assert decision.route == 'pretrained_semantic'
+    assert TABLE["entries"][1]["answer"] in decision.answer
+    assert intents == ["my father passed away"]
+
+
+def test_counters_and_llm_avoided_fraction():
+    query_router = QueryRouter()
+    for question in ("hi", "I feel anxious", "what is dharma", "what is karma"):
+        query_router.route(question)
+    query_router.record_rag_outcome('llm')
+    query_router.record_rag_outcome('answer_cache')
+
+    stats = query_router.stats()
+
+    assert stats["requests"] == 4
+    assert stats["routes"]["greeting"] == 1
+    assert stats["routes"]["pretrained"] == 1
+    assert stats["routes"]["rag"] == 2
+    assert stats["rag_outcomes"]["llm"] == 1
+    assert stats["llm_avoided_fraction"] == 0.75
+
+    query_router.reset()
+    assert query_router.stats()["requests"] == 0
+
+
+def test_unknown_rag_outcome_raises():
+    with pytest.raises(ValueError):
+        QueryRouter().record_rag_outcome('gemini')
@@ -0,0 +1,59 @@
+"""
+Verse references - parsing references out of queries and passages
+"""
+import pytest
+
+from verse_refs import is_reference_only, parse_speaker, parse_verse_query, passage_metadata
+
+
+@pytest.mark.parametrize("query, refs", [
+    ("2.47", [(2, 47)]),
+    ("BG 2:47", [(2, 47)]),
+    ("Chapter 3 Verse 19", [(3, 19)]),
+    ("ch. 3, v. 19", [(3, 19)]),
+    ("verse 19 of chapter 3", [(3, 19)]),
+    ("chapter 2 verses 47-49", [(2, 47), (2, 48), (2, 49)]),
+    ("what does the gita say in 2.47 and 3.19?", [(2, 47), (3, 19)]),
+    ("2.47 and 2.47 again", [(2, 47)]),
+])
+def test_parse_verse_query(query, refs):
+    assert parse_verse_query(query) == refs
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "what is karma yoga",
+    "chapter 19 verse 1",                            # the Gita has 18 chapters
+    "I slept 7.5 hours and still feel tired today",  # a long query with no cue
+])
+def test_parse_verse_query_finds_nothing(query):
+    assert parse_verse_query(query) == []
+
+
+def test_ranges_are_capped():
+    assert len(parse_verse_query("chapter 2 verses 1-72")) == 20
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("2.47", True),
+    ("show me BG 2.47", True),
+    ("Chapter 2 Verse 47 and chapter 3 verse 19 please", True),
+    ("what does 2.47 say about duty?", False),
+    ("explain chapter 2 verse 47", False),
+    ("what is karma", False),
+])
+def test_is_reference_only(query, expected):
+    assert is_reference_only(query) is expected
+
+
+def test_speaker_needs_an_explicit_marker():
+    assert parse_speaker("Chapter 2, Verse 2:\nThe Blessed Lord said: Whence has this weakness come?") == "Krishna"
+    assert parse_speaker("Chapter 1, Verse 28:\nArjuna said: Seeing my kinsmen...") == "Arjuna"
+    assert parse_speaker("Chapter 2, Verse 47:\nYou have a right to perform your duty.") is None
+
+
+def test_passage_metadata():
+    assert passage_metadata("Chapter 1, Verse 1:\nDhritarashtra said: O Sanjaya...") == {
+        "chapter": 1, "verse": 1, "speaker": "Dhritarashtra"
+    }
+    assert passage_metadata("A passage without a header.") == {}
@@ -0,0 +1,156 @@
+"""
+Verse References - Parse "Chapter N, Verse M" structure out of passages and queries
+Lets references like "2.47" or "Chapter 3 Verse 19" be answered by a direct
+(chapter, verse) lookup instead of an embedding search, and tags passages with
+chapter/verse/speaker metadata for filtered search
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+GITA_CHAPTERS = 18
+MAX_RANGE_VERSES = 20
+
+# Corpus passages start with "Chapter 2, Verse 47:"
+_PASSAGE_HEADER = re.compile(r'^\s*Chapter\s+(\d+)\s*,\s*Verse\s+(\d+)\s*:', re.IGNORECASE)
+
+# Body opens with "Arjuna said:" / "The Blessed Lord said:"
+_SPEAKER_MARKER = re.compile(r'^\s*(?:the\s+)?([A-Za-z][A-Za-z ]{1,40}?)\s+said\s*:', re.IGNORECASE)
+
+# Epithets the translations use for Krishna
+_KRISHNA_EPITHETS = frozenset({
+    'krishna', 'lord', 'blessed lord', 'supreme lord', 'supreme blessed lord',
+    'supreme being', 'supreme personality of godhead', 'bhagavan', 'sri bhagavan',
+    'personality of godhead', 'govinda', 'madhava', 'keshava',
+})
+
+# "chapter 3 verse 19", "ch. 3, v. 19", "chapter 2 verses 47-48"
+_CHAPTER_VERSE = re.compile(
+    r'\b(?:chapter|ch\.?)\s*(\d{1,2})\s*[,:]?\s*(?:verses?|v\.?|shloka|sloka)\s*(\d{1,3})(?:\s*(?:-|to|–)\s*(\d{1,3}))?\b',
+    re.IGNORECASE
+)
+# "verse 19 of chapter 3"
+_VERSE_OF_CHAPTER = re.compile(
+    r'\b(?:verses?|v\.?|shloka|sloka)\s*(\d{1,3})\s*(?:of|in|from)\s*(?:chapter|ch\.?)\s*(\d{1,2})\b',
+    re.IGNORECASE
+)
+# "2.47", "BG 2:47", "2.47-49"
+_DOTTED = re.compile(r'(?<![\d.])(\d{1,2})\s*[.:]\s*(\d{1,3})(?:\s*-\s*(\d{1,3}))?(?![\d.]*\d)')
+# Bare "3.5" is only taken as a reference in short queries or next to one of these cues
+_DOTTED_CUE = re.compile(r'\b(?:gita|geeta|bg|verses?|shlokas?|slokas?|says?|said|mean|means|meaning)\b', re.IGNORECASE)
+_SHORT_QUERY_WORDS = 4
+# Words that can surround references in a request for just the verse text ("show me BG 2.47")
+_REFERENCE_ONLY_WORDS = frozenset({
+    'bg', 'bhagavad', 'gita', 'geeta', 'show', 'display', 'read', 'give', 'get', 'print', 'recite',
+    'quote', 'open', 'find', 'me', 'the', 'a', 'text', 'of', 'please', 'pls', 'and', 'chapter',
+    'verse', 'verses', 'shloka', 'sloka', 'ch', 'v',
+})
+_WORD = re.compile(r"[a-z]+")
+
+
+def parse_passage_header(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Chapter/verse from a passage's "Chapter N, Verse M:" header
+
+    Args:
+        text: Passage text
+
+    Returns:
+        (chapter, verse) or None if the passage has no header
+    """
+    match = _PASSAGE_HEADER.match(text)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def normalize_speaker(name: str) -> str:
+    """Canonical speaker name ("The Blessed Lord" -> "Krishna")"""
+    cleaned = ' '.join(name.lower().split())
+    if cleaned.startswith('the '):
+        cleaned = cleaned[4:]
+    if cleaned in _KRISHNA_EPITHETS:
+        return 'Krishna'
+    return cleaned.title()
+
+
+def parse_speaker(text: str) -> Optional[str]:
+    """
+    Speaker named by a passage's "<Name> said:" line
+
+    Only explicit markers count: chapters 2-18 include speeches by Arjuna
+    and Sanjaya's narration, so an unmarked verse is left unattributed
+    rather than guessed.
+
+    Args:
+        text: Passage text
+
+    Returns:
+        Canonical speaker name or None
+    """
+    body = _PASSAGE_HEADER.sub('', text, count=1)
+    match = _SPEAKER_MARKER.match(body)
+    if match:
+        return normalize_speaker(match.group(1))
+    return None
+
+
+def passage_metadata(text: str) -> Dict[str, Any]:
+    """Metadata fields parsed from a passage (chapter/verse/speaker when present)"""
+    ref = parse_passage_header(text)
+    metadata: Dict[str, Any] = {}
+    if ref is not None:
+        metadata.update(chapter=ref[0], verse=ref[1])
+    speaker = parse_speaker(text)
+    if speaker:
+        metadata["speaker"] = speaker
+    return metadata
+
+
+def _expand(chapter: int, start: int, end: Optional[int]) -> List[Tuple[int, int]]:
+    if not 1 <= chapter <= GITA_CHAPTERS or start < 1:
+        return []
+    end = start if end is None or end < start else min(end, start + MAX_RANGE_VERSES - 1)
+    return [(chapter, v) for v in range(start, end + 1)]
+
+
+def parse_verse_query(query: str) -> List[Tuple[int, int]]:
+    """
+    Verse references mentioned in a query
+
+    Args:
+        query: User question, e.g. "what does 2.47 say" or "Chapter 3 Verse 19"
+
+    Returns:
+        (chapter, verse) pairs in mention order, de-duplicated; empty if none
+    """
+    if not query:
+        return []
+
+    refs: List[Tuple[int, int]] = []
+    for match in _CHAPTER_VERSE.finditer(query):
+        end = int(match.group(3)) if match.group(3) else None
+        refs.extend(_expand(int(match.group(1)), int(match.group(2)), end))
+    for match in _VERSE_OF_CHAPTER.finditer(query):
+        refs.extend(_expand(int(match.group(2)), int(match.group(1)), None))
+    if not refs and (_DOTTED_CUE.search(query) or len(query.split()) <= _SHORT_QUERY_WORDS):
+        for match in _DOTTED.finditer(query):
+            end = int(match.group(3)) if match.group(3) else None
+            refs.extend(_expand(int(match.group(1)), int(match.group(2)), end))
+
+    return list(dict.fromkeys(refs))
+
+
+def is_reference_only(query: str) -> bool:
+    """
+    True when a query asks only for verse text ("BG 2.47", "show chapter 2 verse 47")
+
+    A query that also asks something about the verses ("what does 2.47 say
+    about duty?") is False: the verses are context for an answer, not the
+    answer.
+    """
+    if not parse_verse_query(query):
+        return False
+    rest = query
+    for pattern in (_CHAPTER_VERSE, _VERSE_OF_CHAPTER, _DOTTED):
+        rest = pattern.sub(' ', rest)
+    return all(word in _REFERENCE_ONLY_WORDS for word in _WORD.findall(rest.lower()))